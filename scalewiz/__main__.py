@@ -1,13 +1,25 @@
 """The entry point for the program."""
 
-import tkinter as tk
-
-import scalewiz
-from scalewiz.components.scalewiz import ScaleWiz
+import sys
 
 
 def main() -> None:
-    """The Tkinter entry point of the program; enters mainloop."""
+    """The entry point of the program.
+
+    With no arguments, launches the GUI and enters mainloop. Otherwise, hands the
+    arguments to the headless command line interface.
+    """
+    if len(sys.argv) > 1:
+        from scalewiz.cli import main as cli  # pylint: disable=import-outside-toplevel
+
+        sys.exit(cli(sys.argv[1:]))
+
+    # pylint: disable=import-outside-toplevel
+    import tkinter as tk
+
+    import scalewiz
+    from scalewiz.components.scalewiz import ScaleWiz
+
     root = tk.Tk()
     scalewiz.ROOT = root
     ScaleWiz(root).grid(sticky="nsew")
@@ -0,0 +1,454 @@
+"""A headless command line interface, for running tests without the GUI.
+
+::
+
+    python -m scalewiz run PROJECT PORT [PORT ...] --chemical "ABC 123" --rate 10 ...
+    python -m scalewiz convert PROJECT --to binary
+    python -m scalewiz catalog --chemical "ABC" --max-rate 10 --field "Permian"
+
+Nothing imported here may pull in tkinter or matplotlib, so that tests can be run
+from a scheduled task on a computer without a display.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import sqlite3
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import scalewiz
+from scalewiz.helpers.background_logging import drain, log_in_background
+from scalewiz.helpers.sort_nicely import sort_nicely
+from scalewiz.models.acquisition import (
+    Acquisition,
+    close_pumps,
+    make_log_handler,
+    open_pumps,
+)
+from scalewiz.models.catalog import Catalog
+from scalewiz.models.engine import get_engine_name
+from scalewiz.models.journal import ReadingJournal, find_unfinished, read_journal
+from scalewiz.models.prediction import FailurePredictor
+from scalewiz.models.reading import ReadingSeries, scorable, score_column
+from scalewiz.models.sidecar import convert, store_test
+
+if TYPE_CHECKING:
+    from argparse import Namespace
+    from typing import List, Optional
+
+    from scalewiz.models.reading import Reading
+
+LOGGER = logging.getLogger("scalewiz.cli")
+
+
+def make_parser() -> ArgumentParser:
+    """Returns the parser for the command line arguments."""
+    parser = ArgumentParser(
+        prog="scalewiz",
+        description="Run without arguments to launch the GUI.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser(
+        "run",
+        help="run a test without the GUI",
+        description="Runs a test and saves it to an existing project file.",
+    )
+    run.add_argument("project", type=Path, help="path to the project's JSON file")
+    run.add_argument(
+        "ports", nargs="+", metavar="port", help="the port of each pump, in order"
+    )
+    run.add_argument(
+        "--name", default="", help="defaults to the chemical and rate, if given"
+    )
+    run.add_argument("--blank", action="store_true", help="the test is a blank")
+    run.add_argument("--chemical", default="", help="the chemical being tested")
+    run.add_argument("--rate", type=float, default=0.0, help="treating rate in ppm")
+    run.add_argument(
+        "--label", default="", help="how to label the test, defaults to its name"
+    )
+    run.add_argument("--clarity", default="", help="required for trials")
+    run.add_argument("--notes", default="")
+    run.add_argument(
+        "--score",
+        help='which pressures to score, eg. "pump 2", "average", "max", or "median", '
+        "defaults to the project's",
+    )
+    run.add_argument(
+        "--include-on-report",
+        action="store_true",
+        help="include the test on the project's report",
+    )
+    recover = commands.add_parser(
+        "recover",
+        help="recover tests that weren't saved because of a crash",
+        description="Saves any tests left in a project's journals to the project.",
+    )
+    recover.add_argument("project", type=Path, help="path to the project's JSON file")
+    converter = commands.add_parser(
+        "convert",
+        help="change how a project file stores its readings",
+        description="Moves a project's readings into a compact binary file beside "
+        "it, or back into the project file for older versions of ScaleWiz.",
+    )
+    converter.add_argument("project", type=Path, help="path to the project's JSON file")
+    converter.add_argument("--to", choices=("binary", "json"), required=True)
+    finder = commands.add_parser(
+        "catalog",
+        help="search every project under a folder",
+        description="Updates the catalog of the projects under a folder, then lists "
+        "the tests that match every filter given.",
+    )
+    finder.add_argument(
+        "--root", type=Path, help="the folder to index, defaults to catalog.root"
+    )
+    finder.add_argument(
+        "--no-update", action="store_true", help="search without updating the index"
+    )
+    finder.add_argument("--chemical", default="", help="eg. ABC, ignoring case")
+    finder.add_argument("--field", default="")
+    finder.add_argument("--customer", default="", help="or production company")
+    finder.add_argument("--sample", default="")
+    finder.add_argument("--min-rate", type=float, help="the lowest rate in ppm")
+    finder.add_argument("--max-rate", type=float, help="the highest rate in ppm")
+    kind = finder.add_mutually_exclusive_group()
+    kind.add_argument(
+        "--blanks", dest="blank", action="store_true", default=None, help="only blanks"
+    )
+    kind.add_argument(
+        "--trials", dest="blank", action="store_false", help="only trials"
+    )
+    for command in (run, recover, converter, finder):
+        command.add_argument(
+            "-q", "--quiet", action="store_true", help="don't show progress"
+        )
+        command.add_argument(
+            "-v", "--verbose", action="store_true", help="show log messages on stderr"
+        )
+    return parser
+
+
+def main(argv: List[str] = None) -> int:
+    """Runs the command line interface, returning an exit code."""
+    args = make_parser().parse_args(argv)
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.INFO if args.verbose else logging.WARNING)
+    handler.setFormatter(logging.Formatter("%(levelname)s - %(name)s - %(message)s"))
+    logging.getLogger().addHandler(handler)
+    logging.getLogger("scalewiz").setLevel(logging.DEBUG)  # the log file gets it all
+    if args.command == "run":
+        return run_test(args)
+    if args.command == "recover":
+        return recover_tests(args)
+    if args.command == "convert":
+        return convert_project(args)
+    if args.command == "catalog":
+        return search_catalog(args)
+    return 2
+
+
+def load_project(path: Path) -> dict:
+    """Returns the parsed JSON of a project file."""
+    with path.open("r") as file:
+        return json.load(file)
+
+
+def get_param(project: dict, key: str, default: str) -> float:
+    """Returns a parameter of the project, falling back to the config's default."""
+    value = project["params"].get(key)
+    if value is None:
+        value = scalewiz.CONFIG["defaults"][default]
+    return float(value)
+
+
+def make_name(args: Namespace) -> str:
+    """Returns the test's name, made from the chemical and rate if not given."""
+    if args.name.strip() or args.blank:
+        return args.name.strip()
+    if args.chemical.strip() == "" or args.rate == 0:
+        return ""
+    if float(args.rate) == int(args.rate):
+        return f"{args.chemical.strip()} {args.rate:.0f} ppm"
+    return f"{args.chemical.strip()} {args.rate:.2f} ppm"
+
+
+def check(args: Namespace, name: str, project: Optional[dict]) -> List[str]:
+    """Returns a list of reasons the test can't be run, if any."""
+    issues = []
+    if project is None:
+        issues.append(f"Couldn't read a project file at {args.project}")
+    if name == "":
+        issues.append("Name the experiment, or give its chemical and rate")
+    elif project is not None and name in {t["name"] for t in project["tests"]}:
+        issues.append("A test with this name already exists in the project")
+    if args.clarity.strip() == "" and not args.blank:
+        issues.append("Water clarity cannot be blank")
+    if len(set(args.ports)) < len(args.ports):
+        issues.append("Select a unique port for each pump")
+    if args.score is not None and args.score not in scorable(len(args.ports)):
+        choices = ", ".join(scorable(len(args.ports)))
+        issues.append(f"Score one of {choices}, not {args.score}")
+    return issues
+
+
+def run_test(args: Namespace) -> int:
+    """Runs a test from the parsed arguments and saves it to the project."""
+    path: Path = args.project.resolve()
+    try:
+        project = load_project(path)
+    except (OSError, ValueError, KeyError) as err:
+        LOGGER.exception(err)
+        project = None
+    name = make_name(args)
+    issues = check(args, name, project)
+    if issues:
+        print("Couldn't start the test:", *issues, sep="\n  ", file=sys.stderr)
+        return 1
+
+    logger = logging.getLogger(f"scalewiz.{name}")
+    log_output, log_listener = log_in_background(logger)
+    log_handler = make_log_handler(path, name)
+    log_output.addHandler(log_handler)
+    logger.info("Starting a test for %s", project["info"]["name"])
+    pumps = open_pumps(
+        args.ports, get_param(project, "flowrate", "flowrate"), logger, issues
+    )
+    if issues:
+        close_pumps(*pumps)
+        print("Couldn't start the test:", *issues, sep="\n  ", file=sys.stderr)
+        return 1
+
+    interval = max(get_param(project, "interval", "reading_interval"), 0.1)
+    acquisition = Acquisition(
+        pumps,
+        interval=interval,
+        uptake=get_param(project, "uptake", "uptake_time"),
+        limit_minutes=get_param(project, "limitMin", "time_limit"),
+        limit_psi=get_param(project, "limitPSI", "pressure_limit"),
+        logger=logger,
+    )
+    if not args.blank:  # blanks always run to their limits
+        acquisition.predictor = FailurePredictor.from_config(
+            column_to_score(args, project),
+            acquisition.limit_psi,
+            acquisition.limit_minutes,
+        )
+    if not args.quiet:
+        acquisition.on_uptake = report_uptake
+        acquisition.on_reading = lambda reading: report_reading(acquisition, reading)
+
+    # a Ctrl+C or a scheduler ending the task stops the test, which is still saved
+    def request_stop(*args) -> None:
+        logger.warning("Stop requested")
+        acquisition.request_stop()
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, request_stop)
+
+    journal = None
+    if scalewiz.CONFIG["journal"]["enabled"]:
+        test = make_test(args, name, project, ReadingSeries(width=len(pumps)))
+        journal = ReadingJournal(path, test, interval)
+        acquisition.journal = journal
+
+    try:
+        if get_engine_name() == "asyncio":
+            completed = asyncio.run(acquisition.run_async())
+        else:
+            completed = acquisition.run()
+    finally:
+        # a pump that stopped answering may have been reconnected on a new worker
+        close_pumps(*acquisition.pumps)
+
+    try:
+        if completed:
+            test = make_test(args, name, project, acquisition.readings)
+            test["projectedFailMin"] = acquisition.projected_fail_min
+            test["gaps"] = acquisition.gaps
+            save_test(path, test, logger)
+            if not args.quiet:
+                print(f"Saved {name} to {path}")
+        else:
+            print(
+                "The test was stopped before any readings were taken", file=sys.stderr
+            )
+        if journal is not None:
+            journal.remove()
+    finally:
+        if journal is not None:
+            journal.close()  # if the save failed, leave it to be recovered
+    drain(log_listener)
+    log_output.removeHandler(log_handler)
+    log_handler.close()
+    return 0 if completed else 1
+
+
+def recover_tests(args: Namespace) -> int:
+    """Saves the tests from any unfinished journals to the project."""
+    path: Path = args.project.resolve()
+    if not path.is_file():
+        print(f"Couldn't find a project file at {path}", file=sys.stderr)
+        return 1
+    status = 0
+    for journal in find_unfinished(path):
+        try:
+            test = read_journal(journal)
+            note = f"(recovered from {journal.name})"
+            test["notes"] = " ".join((test["notes"], note)).strip()
+            readings = ReadingSeries()
+            readings.load_dicts(test["readings"])
+            column = score_column(test["toConsider"], readings.width)
+            pressures = readings.column(column) if readings else []
+            test["obsBaseline"] = round(sum(pressures[0:4]) / 4) if pressures else 0
+            test["maxPsi"] = max(pressures, default=0)
+            save_test(path, test, LOGGER)
+        except (OSError, ValueError, KeyError, TypeError) as err:
+            # leave it be, and go on to the rest
+            print(f"Couldn't recover {journal.name}: {err}", file=sys.stderr)
+            status = 1
+            continue
+        journal.unlink()
+        if not args.quiet:
+            print(f"Recovered {test['name']} with {len(test['readings'])} readings")
+    return status
+
+
+def convert_project(args: Namespace) -> int:
+    """Converts how a project file stores its readings."""
+    path: Path = args.project.resolve()
+    try:
+        converted = convert(path, args.to)
+    except (OSError, ValueError, KeyError) as err:
+        print(f"Couldn't convert {path}: {err}", file=sys.stderr)
+        return 1
+    if not args.quiet:
+        print(f"Converted {converted} tests in {path} to {args.to}")
+    return 0
+
+
+def search_catalog(args: Namespace) -> int:
+    """Updates the catalog, then prints the tests that match the filters."""
+    catalog = Catalog.from_config()
+    if args.root is not None:
+        catalog.root = args.root.resolve()
+    if not args.no_update:
+        try:
+            read, dropped = catalog.update()
+        except (OSError, sqlite3.Error) as err:
+            print(f"Couldn't update the catalog: {err}", file=sys.stderr)
+            return 1
+        if not args.quiet:
+            print(f"Indexed {catalog.root}: read {read} files, dropped {dropped}")
+    tests = catalog.search(
+        chemical=args.chemical,
+        field=args.field,
+        customer=args.customer,
+        sample=args.sample,
+        min_rate=args.min_rate,
+        max_rate=args.max_rate,
+        blank=args.blank,
+    )
+    for test in tests:
+        kind = "blank" if test["is_blank"] else f"{test['rate']:g} ppm"
+        date = test["completed_date"] or test["sample_date"]
+        print(
+            f"{test['test']} ({kind}), result {test['result']:.3f}, "
+            f"max {test['max_psi']} psi -- {test['project']}"
+            + (f" ({date})" if date else "")
+            + f": {test['path']}"
+        )
+    if not args.quiet:
+        print(f"{len(tests)} tests found")
+    return 0
+
+
+def report_uptake(i: int) -> None:
+    """Prints progress through the uptake cycle."""
+    if i % 10 == 0:
+        print(f"Uptake: {i}%", flush=True)
+
+
+def report_reading(acquisition: Acquisition, reading: Reading) -> None:
+    """Prints a Reading and progress through the test."""
+    print(
+        "@ {:.2f} min; {}, avg: {} ({} / {} readings)".format(
+            reading.elapsedMin,
+            ", ".join(
+                f"pump{number}: {psi}"
+                for number, psi in enumerate(reading.pressures, start=1)
+            ),
+            reading.average,
+            len(acquisition.readings),
+            acquisition.max_readings,
+        ),
+        flush=True,
+    )
+
+
+def column_to_score(args: Namespace, project: dict) -> str:
+    """Returns which pressures the test will be scored on.
+
+    The project's default pump is only used if the test has that pump, else the
+    average is.
+    """
+    if args.score:
+        return args.score
+    default = project.get("defaultPump", "Pump 1").lower()
+    return score_column(default, len(args.ports))
+
+
+def make_test(
+    args: Namespace, name: str, project: dict, readings: ReadingSeries
+) -> dict:
+    """Returns a dict representation of a Test, as stored in the project file."""
+    to_consider = column_to_score(args, project)
+    pressures = readings.column(to_consider)
+    return {
+        "name": name,
+        "isBlank": args.blank,
+        "chemical": args.chemical.strip(),
+        "rate": args.rate,
+        "reportAs": (args.label or name).strip(),
+        "clarity": args.clarity.strip(),
+        "notes": args.notes.strip(),
+        "toConsider": to_consider,
+        "includeOnRep": args.include_on_report,
+        "result": 0.0,
+        "obsBaseline": round(sum(pressures[0:4]) / 4) if pressures else 0,
+        "maxPsi": max(pressures, default=0),
+        "projectedFailMin": 0.0,
+        "gaps": [],
+        "readings": readings.to_dicts(),
+    }
+
+
+def save_test(path: Path, test: dict, logger: logging.Logger) -> None:
+    """Adds a test to the project file, keeping the tests sorted as the GUI does."""
+    # read it again, in case the project was edited while the test was running
+    project = load_project(path)
+    blanks = {}
+    trials = {}
+    for entry in (*project["tests"], test):
+        label = entry["reportAs"].lower()
+        while label in blanks or label in trials:  # make sure we don't overwrite
+            label = "".join((label, " - copy"))
+        if entry["isBlank"]:
+            blanks[label] = entry
+        else:
+            trials[label] = entry
+    project["tests"] = [blanks[label] for label in sort_nicely(list(blanks))]
+    project["tests"].extend(trials[label] for label in sort_nicely(list(trials)))
+    if project.get("readingsFile"):
+        store_test(test, path.with_name(project["readingsFile"]))
+    # write a copy then swap it in, so a crash can't leave a truncated file
+    temp = path.with_name(f"{path.name}.tmp")
+    with temp.open("w") as file:
+        json.dump(project, file, indent=4)
+    os.replace(temp, path)
+    logger.info("Saved %s to %s", test["name"], path)
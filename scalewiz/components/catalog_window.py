@@ -0,0 +1,176 @@
+"""A Toplevel for searching the catalog of every project under a folder."""
+
+from __future__ import annotations
+
+import sqlite3
+import tkinter as tk
+from pathlib import Path
+from threading import Thread
+from tkinter import ttk
+from typing import TYPE_CHECKING
+
+from scalewiz.helpers.set_icon import set_icon
+from scalewiz.helpers.update_bus import UpdateBus
+from scalewiz.models.catalog import Catalog
+
+if TYPE_CHECKING:
+    from typing import Dict, Optional, Set
+
+    from scalewiz.models.test_handler import TestHandler
+
+# filter name and label, in order
+FILTERS = (
+    ("chemical", "Chemical:"),
+    ("min_rate", "Min rate (ppm):"),
+    ("max_rate", "Max rate (ppm):"),
+    ("field", "Field:"),
+    ("customer", "Customer:"),
+    ("sample", "Sample:"),
+)
+# result column, heading, and width
+COLUMNS = (
+    ("test", "Test", 140),
+    ("rate", "Rate (ppm)", 70),
+    ("result", "Result", 60),
+    ("max_psi", "Max PSI", 60),
+    ("project", "Project", 200),
+    ("field", "Field", 100),
+    ("completed_date", "Completed", 80),
+)
+
+
+class CatalogWindow(tk.Toplevel):
+    """Searches every project under the catalog's folder, and loads one from it.
+
+    The catalog is updated on a background thread when the window opens, and
+    searched again once that's done.
+    """
+
+    def __init__(self, handler: TestHandler, loaded: Set[Path]) -> None:
+        super().__init__()
+        self.handler = handler
+        self.loaded = loaded  # the projects open in other systems
+        self.title("Find Tests")
+        self.bus = UpdateBus.get()
+        self.catalog = Catalog.from_config()
+        self.filters = {name: tk.StringVar() for name, _ in FILTERS}
+        self.kind = tk.StringVar(value="all")
+        self.status = tk.StringVar()
+        self.paths: Dict[str, str] = {}  # the project file of each row, by item id
+        self.build()
+        self.search()
+        self.update_catalog()
+
+    def build(self) -> None:
+        """Builds the UI."""
+        set_icon(self)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(1, weight=1)
+        form = ttk.Frame(self)
+        for i, (name, label) in enumerate(FILTERS):
+            row, column = divmod(i, 3)
+            ttk.Label(form, text=label).grid(row=row, column=column * 2, sticky="e")
+            ent = ttk.Entry(form, textvariable=self.filters[name], width=15)
+            ent.grid(row=row, column=column * 2 + 1, sticky="ew", padx=(0, 5))
+            ent.bind("<Return>", self.search)
+        kinds = ttk.Frame(form)
+        for i, kind in enumerate(("all", "blanks", "trials")):
+            ttk.Radiobutton(
+                kinds,
+                text=kind.capitalize(),
+                variable=self.kind,
+                value=kind,
+                command=self.search,
+            ).grid(row=0, column=i, padx=5)
+        kinds.grid(row=2, column=0, columnspan=4, sticky="w")
+        ttk.Button(form, text="Search", command=self.search).grid(
+            row=2, column=5, sticky="e"
+        )
+        form.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
+
+        self.table = ttk.Treeview(
+            self, columns=[name for name, _, _ in COLUMNS], show="headings", height=15
+        )
+        for name, heading, width in COLUMNS:
+            self.table.heading(name, text=heading)
+            self.table.column(name, width=width)
+        self.table.bind("<Double-1>", self.load_selected)
+        self.table.grid(row=1, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(self, command=self.table.yview)
+        self.table.configure(yscrollcommand=scrollbar.set)
+        scrollbar.grid(row=1, column=1, sticky="ns")
+        ttk.Label(self, textvariable=self.status).grid(
+            row=2, column=0, columnspan=2, sticky="w"
+        )
+
+    def update_catalog(self) -> None:
+        """Updates the catalog on a background thread, then searches again."""
+        if self.catalog.root is None:
+            self.status.set("Set catalog.root in the config file to find projects")
+            return
+        self.status.set(f"Looking for changes in {self.catalog.root}...")
+        Thread(target=self.run_update, name="catalog-update", daemon=True).start()
+
+    def run_update(self) -> None:
+        """Updates the catalog. Runs on a background thread."""
+        try:
+            read, dropped = self.catalog.update()
+        except (OSError, sqlite3.Error) as err:
+            self.bus.call(self.on_updated, f"Couldn't update the catalog: {err}")
+        else:
+            self.bus.call(
+                self.on_updated, f"Read {read} changed files, dropped {dropped}"
+            )
+
+    def on_updated(self, msg: str) -> None:
+        """Shows how an update went, and searches again."""
+        if self.winfo_exists():
+            self.search()
+            self.status.set(f"{self.status.get()} ({msg})")
+
+    def search(self, *args) -> None:
+        """Shows the tests that match the filters."""
+        # extra unused args may be passed in by tkinter
+        rates: Dict[str, Optional[float]] = {}
+        for name in ("min_rate", "max_rate"):
+            text = self.filters[name].get().strip()
+            try:
+                rates[name] = float(text) if text else None
+            except ValueError:
+                self.status.set(f"{text} isn't a rate")
+                return
+        blank = {"all": None, "blanks": True, "trials": False}[self.kind.get()]
+        try:
+            tests = self.catalog.search(
+                chemical=self.filters["chemical"].get().strip(),
+                field=self.filters["field"].get().strip(),
+                customer=self.filters["customer"].get().strip(),
+                sample=self.filters["sample"].get().strip(),
+                blank=blank,
+                **rates,
+            )
+        except sqlite3.Error as err:
+            self.status.set(f"Couldn't search the catalog: {err}")
+            return
+        self.table.delete(*self.table.get_children())
+        self.paths.clear()
+        for test in tests:
+            values = []
+            for name, _, _ in COLUMNS:
+                if name == "rate" and test["is_blank"]:
+                    values.append("blank")
+                elif name == "result":
+                    values.append(f"{test[name]:.3f}")
+                else:
+                    values.append(test[name])
+            item = self.table.insert("", "end", values=values)
+            self.paths[item] = test["path"]
+        self.status.set(f"{len(tests)} tests found")
+
+    def load_selected(self, *args) -> None:
+        """Loads the project of the selected test into the system."""
+        # extra unused args are passed in by tkinter
+        selection = self.table.selection()
+        if selection:
+            path = self.paths[selection[0]]
+            self.handler.load_project(path=path, loaded=self.loaded)
@@ -10,6 +10,8 @@ from typing import TYPE_CHECKING
 
 from scalewiz.components.evaluation_plot_view import EvaluationPlotView
 from scalewiz.helpers.score import score
+from scalewiz.helpers.tk_binding import bind
+from scalewiz.models.reading import scorable
 
 if TYPE_CHECKING:
     from typing import List
@@ -100,13 +102,15 @@ class EvaluationDataView(ttk.Frame):
         """Creates a row for the test and grids it."""
         cols: List[tk.Widget] = []
         vcmd = self.register(self.update_score)
+        # the rows are rebuilt often, so each widget owns the binding to its Value
         # col 0 - name
-        cols.append(ttk.Label(self, textvariable=test.name))
+        name = ttk.Label(self)
+        name.configure(textvariable=bind(name, test.name))
+        cols.append(name)
 
         # col 2 - duration
-        duration = round(
-            len(test.readings) * self.project.interval_seconds.get() / 60, 2
-        )
+        interval = self.project.interval_seconds.get()
+        duration = round(sum(test.readings.weights(interval)) * interval / 60, 2)
         cols.append(
             ttk.Label(
                 self,
@@ -117,45 +121,39 @@ class EvaluationDataView(ttk.Frame):
         # col 3 - pump to score
         to_score = ttk.Combobox(
             self,
-            textvariable=test.pump_to_score,
-            values=["pump 1", "pump 2", "average"],
+            values=scorable(test.readings.width),
             state="readonly",
             width=7,
             validate="all",
             validatecommand=vcmd,
         )
+        to_score.configure(textvariable=bind(to_score, test.pump_to_score))
         to_score.bind("<MouseWheel>", self.update_score)
         cols.append(to_score)
         # col 4 - obs baseline
-        cols.append(
-            ttk.Label(
-                self, textvariable=test.observed_baseline, anchor="center", width=5
-            )
-        )
+        baseline = ttk.Label(self, anchor="center", width=5)
+        baseline.configure(textvariable=bind(baseline, test.observed_baseline))
+        cols.append(baseline)
         # col 5 - max psi
-        cols.append(
-            ttk.Label(self, textvariable=test.max_psi, anchor="center", width=7)
-        )
+        max_psi = ttk.Label(self, anchor="center", width=7)
+        max_psi.configure(textvariable=bind(max_psi, test.max_psi))
+        cols.append(max_psi)
         # col 6 - clarity
-        cols.append(
-            ttk.Label(
-                self,
-                textvariable=test.clarity,
-                anchor="center",
-            )
-        )
+        clarity = ttk.Label(self, anchor="center")
+        clarity.configure(textvariable=bind(clarity, test.clarity))
+        cols.append(clarity)
         # col 7 - notes
-        cols.append(ttk.Entry(self, textvariable=test.notes, width=25))
+        notes = ttk.Entry(self, width=25)
+        notes.configure(textvariable=bind(notes, test.notes))
+        cols.append(notes)
         # col 8 - result
-        cols.append(ttk.Label(self, textvariable=test.result, width=5, anchor="center"))
+        result = ttk.Label(self, width=5, anchor="center")
+        result.configure(textvariable=bind(result, test.result))
+        cols.append(result)
         # col 9 - include on report
-        cols.append(
-            ttk.Checkbutton(
-                self,
-                variable=test.include_on_report,
-                command=self.update_score,
-            )
-        )
+        include = ttk.Checkbutton(self, command=self.update_score)
+        include.configure(variable=bind(include, test.include_on_report))
+        cols.append(include)
         # col 10 - delete
         cols.append(
             ttk.Button(
@@ -13,6 +13,8 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure, SubplotParams
 from matplotlib.ticker import MultipleLocator
 
+from scalewiz.helpers.tk_binding import bind
+
 if TYPE_CHECKING:
     from matplotlib.axis import Axis
 
@@ -67,7 +69,7 @@ class EvaluationPlotView(ttk.Frame):
         for i, test in enumerate(tests_on_report):
             label_ent = ttk.Entry(
                 label_frame,
-                textvariable=test.label,
+                textvariable=bind(label_frame, test.label),
                 validate="focusout",
                 validatecommand=vcmd,
                 width=25,
@@ -94,11 +96,8 @@ class EvaluationPlotView(ttk.Frame):
             # plot blanks
             for test in tests_on_report:
                 if test.is_blank.get():
-                    elapsed = []
-                    for reading in test.readings:
-                        elapsed.append(reading.elapsedMin)
                     self.axis.plot(
-                        elapsed,
+                        test.readings.elapsed,
                         test.get_readings(),
                         label=test.label.get(),
                         linestyle=("-."),
@@ -106,10 +105,11 @@ class EvaluationPlotView(ttk.Frame):
             # then plot trials
             for test in tests_on_report:
                 if not test.is_blank.get():
-                    elapsed = []
-                    for reading in test.readings:
-                        elapsed.append(reading.elapsedMin)
-                    self.axis.plot(elapsed, test.get_readings(), label=test.label.get())
+                    self.axis.plot(
+                        test.readings.elapsed,
+                        test.get_readings(),
+                        label=test.label.get(),
+                    )
 
             self.axis.set_xlabel("Time (min)")
             self.axis.set_ylabel("Pressure (psi)")
@@ -12,6 +12,7 @@ from scalewiz.components.handler_view_controls import TestControls
 from scalewiz.components.handler_view_devices_entry import DeviceBoxes
 from scalewiz.components.handler_view_info_entry import TestInfoEntry
 from scalewiz.components.handler_view_plot import LivePlot
+from scalewiz.helpers.tk_binding import bind
 
 if TYPE_CHECKING:
 
@@ -47,7 +48,9 @@ class TestHandlerView(ttk.Frame):
         frm.grid_columnconfigure(1, weight=1)
         lbl = ttk.Label(frm, text="        Project:")
         lbl.grid(row=0, column=0, sticky="nw")
-        proj = ttk.Label(frm, textvariable=self.handler.project.name, anchor="center")
+        proj = ttk.Label(
+            frm, textvariable=bind(frm, self.handler.project.name), anchor="center"
+        )
         proj.grid(row=0, column=1, sticky="ew")
         frm.grid(row=1, column=0, sticky="new")
 
@@ -1,15 +1,14 @@
 from __future__ import annotations
 
 import tkinter as tk
-from concurrent.futures import ThreadPoolExecutor
 from logging import Logger, getLogger
-from queue import Empty
-from time import sleep, time
 from tkinter import ttk
 from tkinter.scrolledtext import ScrolledText
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from typing import List
+
     from scalewiz.models.test_handler import TestHandler
 
 
@@ -22,10 +21,7 @@ class TestControls(ttk.Frame):
     def __init__(self, parent: tk.Widget, handler: TestHandler) -> None:
         super().__init__(parent)
         self.handler: TestHandler = handler
-        self.interval: int = round(handler.project.interval_seconds.get() * 1000)
-        self.pool = ThreadPoolExecutor(max_workers=1)
-        self.stop = tk.BooleanVar()
-        self.stop.set(True)
+        self.stop: bool = True  # polled by the rinse's worker, so not a tk variable
         # todo get this from project settings
         self.rinse_minutes = tk.IntVar()
         self.rinse_minutes.set(5)
@@ -82,73 +78,51 @@ class TestControls(ttk.Frame):
             self, background="white", height=5, width=44, state="disabled"
         )
         self.log_text.grid(row=3, column=0, columnspan=2, sticky="ew")
-        # enter polling loop
-        self.after(0, self.poll_log_queue)
+        # the handler passes us new lines until we're destroyed
+        if self.display_lines not in self.handler.log_views:
+            self.handler.log_views.append(self.display_lines)
+            self.bind("<Destroy>", self.stop_display, add="+")
 
     def request_rinse(self) -> None:
         """Try to start a rinse cycle if a test isn't running."""
         if self.handler.is_done or not self.handler.is_running:
-            self.stop.set(False)
-            self.pool.submit(self.rinse)
-
-    def rinse(self) -> None:
-        """Run the pumps and disable the button for the duration of a timer."""
-        self.handler.setup_pumps()
-        self.handler.pump1.run()
-        self.handler.pump2.run()
-
-        self.stop_btn.configure(state="disabled")
-        self.start_btn.configure(text="Stop Rinse", command=lambda: self.stop.set(True))
-        duration = round(self.rinse_minutes.get() * 60)
-        rinse_start = time()
-
-        for i in range(duration):
-            if not self.stop.get():
-                self.handler.progress.set(round((i + 1) / duration, 2) * 100)
-                self.handler.progress_msg.set(f"Rinsing: {i+1}/{duration} s")
-                sleep(1 - ((time() - rinse_start) % 1))
-            else:
-                break
+            self.stop = False
+            self.stop_btn.configure(state="disabled")
+            self.start_btn.configure(text="Stop Rinse", command=self.stop_rinse)
+            duration = round(self.rinse_minutes.get() * 60)
+            self.handler.start_rinse(
+                duration,
+                lambda i: self.update_rinse(i, duration),
+                lambda: self.stop,
+                self.finish_rinse,
+            )
+
+    def stop_rinse(self) -> None:
+        """Asks the rinse to stop at its next tick."""
+        self.stop = True
+
+    def update_rinse(self, i: int, duration: int) -> None:
+        """Shows the progress of a rinse."""
+        self.handler.progress.set(round(i / duration, 2) * 100)
+        self.handler.progress_msg.set(f"Rinsing: {i}/{duration} s")
+
+    def finish_rinse(self) -> None:
+        """Resets the buttons once a rinse is over."""
+        if not self.winfo_exists():
+            return
         self.bell()
-        self.end_rinse()
-        self.stop.set(True)
+        self.stop = True
         self.stop_btn.configure(state="normal", text="Rinse")
         self.make_start_btn()
 
-    def end_rinse(self) -> None:
-        """Stop the pumps if they are running, then close their ports."""
-        if self.handler.pump1.is_open:
-            self.handler.pump1.stop()
-            self.handler.pump1.close()
-            LOGGER.info(
-                "%s: Stopped and closed the device @ %s",
-                self.handler.name,
-                self.handler.pump1.serial.name,
-            )
-
-        if self.handler.pump2.is_open:
-            self.handler.pump2.stop()
-            self.handler.pump2.close()
-            LOGGER.info(
-                "%s: Stopped and closed the device @ %s",
-                self.handler.name,
-                self.handler.pump2.serial.name,
-            )
-
-    def poll_log_queue(self) -> None:
-        """Checks on an interval if there is a new message in the queue to display."""
-        while True:
-            try:
-                record = self.handler.log_queue.get(block=False)
-            except Empty:
-                break
-            else:
-                self.display(record)
-        self.after(self.interval, self.poll_log_queue)
-
-    def display(self, msg: str) -> None:
-        """Displays a message in the log."""
+    def display_lines(self, lines: List[str]) -> None:
+        """Displays new lines in the log, all at once."""
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", "".join((msg, "\n")))
+        self.log_text.insert("end", "".join(f"{line}\n" for line in lines))
         self.log_text.configure(state="disabled")
         self.log_text.yview("end")  # scroll to bottom
+
+    def stop_display(self, event: tk.Event) -> None:
+        """Stops taking lines for the log once this widget is destroyed."""
+        if event.widget is self and self.display_lines in self.handler.log_views:
+            self.handler.log_views.remove(self.display_lines)
@@ -5,7 +5,8 @@ from logging import Logger, getLogger
 from tkinter import ttk
 from typing import TYPE_CHECKING
 
-from serial.tools import list_ports
+from scalewiz.helpers.port_watcher import PortWatcher
+from scalewiz.models.test_handler import MAX_PUMPS
 
 if TYPE_CHECKING:
     from typing import List
@@ -23,9 +24,12 @@ class DeviceBoxes(ttk.Frame):
         self.parent: ttk.Frame = parent
         self.handler: TestHandler = handler
         self.devices_list: List[str] = []
-        self.dev1: tk.StringVar = handler.dev1
-        self.dev2: tk.StringVar = handler.dev2
+        self.entries: List[ttk.Combobox] = []  # one for each pump
+        # the ports are listed on a background thread, which passes us any changes
+        self.watcher = PortWatcher.get()
         self.build()
+        self.show_devices(self.watcher.subscribe(self.show_devices))
+        self.bind("<Destroy>", self.stop_watching, add="+")
 
     def build(self) -> None:
         """Builds the widget."""
@@ -38,51 +42,49 @@ class DeviceBoxes(ttk.Frame):
             state = "disabled"
         else:
             state = "normal"
-        self.device1_entry = ttk.Combobox(
+        count = ttk.Spinbox(
             self,
-            width=15,
-            textvariable=self.dev1,
-            values=self.devices_list,
-            validate="all",
-            validatecommand=self.update_devices_list,
-            state=state,
+            width=2,
+            from_=1,
+            to=MAX_PUMPS,
+            textvariable=self.handler.pump_count,
+            state="disabled" if state == "disabled" else "readonly",
         )
-        self.device2_entry = ttk.Combobox(
-            self,
-            width=15,
-            textvariable=self.dev2,
-            values=self.devices_list,
-            validate="all",
-            validatecommand=self.update_devices_list,
-            state=state,
-        )
-        # grid the widgets
+        self.entries = [
+            ttk.Combobox(
+                self,
+                width=15,
+                textvariable=device,
+                values=self.devices_list,
+                postcommand=self.watcher.refresh,
+                state=state,
+            )
+            for device in self.handler.devices
+        ]
+        # grid the widgets, two pumps to a row
         label.grid(row=0, column=0, sticky="ne")
-        self.device1_entry.grid(row=0, column=1, sticky="w")
-        self.device2_entry.grid(row=0, column=2, sticky="e")
-        self.update_devices_list()
+        count.grid(row=0, column=1, sticky="e")
+        for i, entry in enumerate(self.entries):
+            row, column = divmod(i, 2)
+            entry.grid(row=row, column=column + 2, sticky="w" if column == 0 else "e")
 
-    def update_devices_list(self, *args) -> None:
+    def show_devices(self, devices: List[str]) -> None:
         """Updates the devices list."""
-        # extra unused args are passed in by tkinter
-        self.devices_list = sorted([i.device for i in list_ports.comports()])
+        if not self.winfo_exists():
+            return
+        self.devices_list = devices
         if len(self.devices_list) < 1:
             self.devices_list = ["None found"]
 
-        self.device1_entry.configure(values=self.devices_list)
-        self.device2_entry.configure(values=self.devices_list)
-
-        # HACK: try to auto select the right devices
-        n = int(self.handler.name.split("System")[1])
-        n = n * 2  # two pumps per system
-        if len(self.devices_list) == n:
-            try:
-                self.device1_entry.current(n - 2)
-                self.device2_entry.current(n - 1)
-            except Exception:
-                pass
+        for entry in self.entries:
+            entry.configure(values=self.devices_list)
 
         if "None found" not in self.devices_list:
             LOGGER.debug(
                 "%s found devices: %s", self.parent.handler.name, self.devices_list
             )
+
+    def stop_watching(self, event: tk.Event) -> None:
+        """Stops taking the list of devices once this widget is destroyed."""
+        if event.widget is self:
+            self.watcher.unsubscribe(self.show_devices)
@@ -5,6 +5,7 @@ from logging import Logger, getLogger
 from tkinter import ttk
 from typing import TYPE_CHECKING
 
+from scalewiz.helpers.tk_binding import bind
 from scalewiz.helpers.validation import can_be_pos_float
 
 if TYPE_CHECKING:
@@ -38,10 +39,11 @@ class TestInfoEntry(ttk.Frame):
         radio_frm = ttk.Frame(self)
         radio_frm.grid_columnconfigure(0, weight=1)
         radio_frm.grid_columnconfigure(1, weight=1)
+        is_blank = bind(radio_frm, self.handler.test.is_blank)
         blank_btn = ttk.Radiobutton(
             radio_frm,
             text="Blank",
-            variable=self.handler.test.is_blank,
+            variable=is_blank,
             value=True,
             command=self.build,
             state=state,
@@ -50,7 +52,7 @@ class TestInfoEntry(ttk.Frame):
         trial_btn = ttk.Radiobutton(
             radio_frm,
             text="Trial",
-            variable=self.handler.test.is_blank,
+            variable=is_blank,
             value=False,
             command=self.build,
             state=state,
@@ -66,7 +68,9 @@ class TestInfoEntry(ttk.Frame):
             name_lbl = ttk.Label(test_frm, text="         Name:", anchor="e")
             name_lbl.grid(row=0, column=0, sticky="ew")
             name_ent = ttk.Entry(
-                test_frm, textvariable=self.handler.test.name, state=state
+                test_frm,
+                textvariable=bind(test_frm, self.handler.test.name),
+                state=state,
             )
             name_ent.grid(row=0, column=1, sticky="ew")
             # test_frm row 1 -----------------------------------------------------------
@@ -77,7 +81,9 @@ class TestInfoEntry(ttk.Frame):
             elif self.handler.is_done:
                 state = "disabled"
             notes_ent = ttk.Entry(
-                test_frm, textvariable=self.handler.test.notes, state=state
+                test_frm,
+                textvariable=bind(test_frm, self.handler.test.notes),
+                state=state,
             )
             notes_ent.grid(row=1, column=1, sticky="ew")
             # spacers
@@ -89,7 +95,9 @@ class TestInfoEntry(ttk.Frame):
             chem_lbl = ttk.Label(test_frm, text="Chemical:", anchor="e")
             chem_lbl.grid(row=0, column=0, sticky="e")
             chem_ent = ttk.Entry(
-                test_frm, textvariable=self.handler.test.chemical, state=state
+                test_frm,
+                textvariable=bind(test_frm, self.handler.test.chemical),
+                state=state,
             )
             chem_ent.grid(row=0, column=1, sticky="ew")
             # test_frm row 1 -----------------------------------------------------------
@@ -99,7 +107,7 @@ class TestInfoEntry(ttk.Frame):
             vcmd = self.register(lambda s: can_be_pos_float(s))
             rate_ent = ttk.Spinbox(
                 test_frm,
-                textvariable=self.handler.test.rate,
+                textvariable=bind(test_frm, self.handler.test.rate),
                 from_=1,
                 to=999999,
                 validate="key",
@@ -113,7 +121,7 @@ class TestInfoEntry(ttk.Frame):
             clarity_ent = ttk.Combobox(
                 test_frm,
                 values=["Clear", "Slightly hazy", "Hazy"],
-                textvariable=self.handler.test.clarity,
+                textvariable=bind(test_frm, self.handler.test.clarity),
                 state=state,
             )
             clarity_ent.current(0)  # default to 'Clear'
@@ -126,7 +134,9 @@ class TestInfoEntry(ttk.Frame):
             else:
                 state = "normal"
             notes_ent = ttk.Entry(
-                test_frm, textvariable=self.handler.test.notes, state=state
+                test_frm,
+                textvariable=bind(test_frm, self.handler.test.notes),
+                state=state,
             )
             notes_ent.grid(row=3, column=1, sticky="ew")
 
@@ -55,16 +55,11 @@ class LivePlot(ttk.Frame):
         # # we can just skip this if the test isn't running
         if len(self.handler.readings) > 0:
             if self.handler.is_running and not self.handler.is_done:
-                pump1 = []
-                pump2 = []
-                elapsed = []  # we will share this series as an axis
-                # cast to tuple in case the list changes during iteration
-                readings = tuple(self.handler.readings)
-                for reading in readings:
-                    pump1.append(reading.pump1)
-                    pump2.append(reading.pump2)
-                    elapsed.append(reading.elapsedMin)
-                max_psi = max((self.handler.max_psi_1, self.handler.max_psi_2))
+                # copy the columns in case readings are added while we plot
+                readings = self.handler.readings.snapshot()
+                elapsed = readings.elapsed  # we will share this series as an axis
+                pressures = readings.matrix()  # a column for each pump
+                max_psi = max(self.handler.max_psi, default=0)
                 self.axis.clear()
                 with plt.style.context("bmh"):
                     self.axis.grid(color="darkgrey", alpha=0.65, linestyle="-")
@@ -73,6 +68,6 @@ class LivePlot(ttk.Frame):
                     self.axis.set_ylabel("Pressure (psi)")
                     self.axis.set_ylim((0, max_psi + 50))
                     self.axis.margins(0, tight=True)
-                    self.axis.plot(elapsed, pump1, label="Pump 1")
-                    self.axis.plot(elapsed, pump2, label="Pump 2")
+                    for i in range(readings.width):
+                        self.axis.plot(elapsed, pressures[:, i], label=f"Pump {i + 1}")
                     self.axis.legend(loc="best")
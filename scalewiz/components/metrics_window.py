@@ -0,0 +1,75 @@
+"""A Toplevel that shows how each pump's commands are faring."""
+
+from __future__ import annotations
+
+import tkinter as tk
+from tkinter import ttk
+
+from scalewiz.helpers.metrics import PumpMetrics
+from scalewiz.helpers.set_icon import set_icon
+
+# column name, heading, and whether it's a duration to show in ms
+COLUMNS = (
+    ("port", "Port", False),
+    ("command", "Command", False),
+    ("count", "Count", False),
+    ("p50", "p50 (ms)", True),
+    ("p95", "p95 (ms)", True),
+    ("p99", "p99 (ms)", True),
+    ("max", "Max (ms)", True),
+    ("timeouts", "Timeouts", False),
+    ("errors", "Errors", False),
+)
+
+
+class MetricsWindow(tk.Toplevel):
+    """Shows latency percentiles and failures for each port's commands."""
+
+    REFRESH_MS: int = 1000
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.metrics = PumpMetrics.get()
+        self.title("Pump Metrics")
+        self.missed = tk.StringVar()
+        self.build()
+        self.refresh()
+
+    def build(self) -> None:
+        """Builds the UI."""
+        set_icon(self)
+        self.grid_columnconfigure(0, weight=1)
+        self.grid_rowconfigure(0, weight=1)
+        self.table = ttk.Treeview(
+            self, columns=[name for name, _, _ in COLUMNS], show="headings", height=8
+        )
+        for name, heading, _ in COLUMNS:
+            self.table.heading(name, text=heading)
+            self.table.column(name, width=80, anchor="e")
+        self.table.grid(row=0, column=0, columnspan=2, sticky="nsew")
+        ttk.Label(self, textvariable=self.missed).grid(row=1, column=0, sticky="w")
+        ttk.Button(self, text="Reset", command=self.metrics.reset).grid(
+            row=1, column=1, sticky="e"
+        )
+
+    def refresh(self) -> None:
+        """Shows the latest metrics, then does so again every REFRESH_MS."""
+        self.table.delete(*self.table.get_children())
+        for row in self.metrics.snapshot():
+            self.table.insert(
+                "",
+                "end",
+                values=[
+                    f"{row[name] * 1000:.1f}" if is_duration else row[name]
+                    for name, _, is_duration in COLUMNS
+                ],
+            )
+        missed = self.metrics.missed_slots()
+        if missed:
+            self.missed.set(
+                "Missed reading slots: "
+                + ", ".join(f"{system} {slots}" for system, slots in missed.items())
+            )
+        else:
+            self.missed.set("No missed reading slots")
+        self.after(self.REFRESH_MS, self.refresh)
@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING
 
 import tkcalendar as tkcal
 
+from scalewiz.helpers.tk_binding import bind
+
 if TYPE_CHECKING:
     from scalewiz.components.project_editor import ProjectWindow
     from scalewiz.models.project import Project
@@ -28,33 +30,33 @@ class ProjectInfo(ttk.Frame):
 
         # row 0 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Customer:")
-        ent = ttk.Entry(self, textvariable=project.customer)
+        ent = ttk.Entry(self, textvariable=bind(self, project.customer))
         lbl.grid(row=0, column=0, sticky="e")
         render(lbl, ent, 0)
 
         # row 1 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Submitted by:")
-        ent = ttk.Entry(self, textvariable=project.submitted_by)
+        ent = ttk.Entry(self, textvariable=bind(self, project.submitted_by))
         render(lbl, ent, 1)
 
         # row 2 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Production company:")
-        ent = ttk.Entry(self, textvariable=project.client)
+        ent = ttk.Entry(self, textvariable=bind(self, project.client))
         render(lbl, ent, 2)
 
         # row 3 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Field:")
-        ent = ttk.Entry(self, textvariable=project.field)
+        ent = ttk.Entry(self, textvariable=bind(self, project.field))
         render(lbl, ent, 3)
 
         # row 4 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Sample point:")
-        ent = ttk.Entry(self, textvariable=project.sample)
+        ent = ttk.Entry(self, textvariable=bind(self, project.sample))
         render(lbl, ent, 4)
 
         # row 5 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Project name:")
-        ent = ttk.Entry(self, textvariable=project.name)
+        ent = ttk.Entry(self, textvariable=bind(self, project.name))
         render(lbl, ent, 5)
 
         # row 6 -----------------------------------------------------------------------
@@ -63,7 +65,9 @@ class ProjectInfo(ttk.Frame):
         # this is to refresh the entry later (it inits with today's date)
         current_value = project.sample_date.get()
         ent = tkcal.DateEntry(
-            self, textvariable=project.sample_date, date_pattern="mm/dd/yyyy"
+            self,
+            textvariable=bind(self, project.sample_date),
+            date_pattern="mm/dd/yyyy",
         )
         lbl.bind("<Button-1>", lambda _: project.sample_date.set(""))
         project.sample_date.set(current_value)
@@ -75,7 +79,7 @@ class ProjectInfo(ttk.Frame):
         current_value = project.received_date.get()
         ent = tkcal.DateEntry(
             self,
-            textvariable=project.received_date,
+            textvariable=bind(self, project.received_date),
             date_pattern="mm/dd/yyyy",
         )
         project.received_date.set(current_value)
@@ -87,7 +91,7 @@ class ProjectInfo(ttk.Frame):
         current_value = project.completed_date.get()
         ent = tkcal.DateEntry(
             self,
-            textvariable=project.completed_date,
+            textvariable=bind(self, project.completed_date),
             date_pattern="mm/dd/yyyy",
         )
         project.completed_date.set(current_value)
@@ -95,17 +99,17 @@ class ProjectInfo(ttk.Frame):
 
         # row 9 -----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Analyst:")
-        ent = ttk.Entry(self, textvariable=project.analyst)
+        ent = ttk.Entry(self, textvariable=bind(self, project.analyst))
         render(lbl, ent, 9)
 
         # row 10 ----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Analysis number(s):")
-        ent = ttk.Entry(self, textvariable=project.numbers)
+        ent = ttk.Entry(self, textvariable=bind(self, project.numbers))
         render(lbl, ent, 10)
 
         # row 11 ----------------------------------------------------------------------
         lbl = ttk.Label(self, text="Notes:")
-        ent = ttk.Entry(self, textvariable=project.notes)
+        ent = ttk.Entry(self, textvariable=bind(self, project.notes))
         render(lbl, ent, 11)
 
         # row 12 ----------------------------------------------------------------------
@@ -5,6 +5,7 @@ from __future__ import annotations
 from tkinter import ttk
 from typing import TYPE_CHECKING
 
+from scalewiz.helpers.tk_binding import bind
 from scalewiz.helpers.validation import can_be_float, can_be_pos_float, can_be_pos_int
 
 if TYPE_CHECKING:
@@ -35,7 +36,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Bicarbonates (mg/L):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.bicarbs,
+            textvariable=bind(self, project.bicarbs),
             from_=0,
             to=999999,
             validate="key",
@@ -48,16 +49,17 @@ class ProjectParams(ttk.Frame):
         ent = ttk.Frame(self)
         ent.grid_columnconfigure(0, weight=1)
         ent.grid_columnconfigure(1, weight=1)
+        increased = bind(ent, project.bicarbs_increased)
         ttk.Radiobutton(
             ent,
             text="Yes",
-            variable=project.bicarbs_increased,
+            variable=increased,
             value=True,
         ).grid(row=0, column=0)
         ttk.Radiobutton(
             ent,
             text="No",
-            variable=project.bicarbs_increased,
+            variable=increased,
             value=False,
         ).grid(row=0, column=1)
         render(lbl, ent, 1)
@@ -66,7 +68,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Calcium (mg/L):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.calcium,
+            textvariable=bind(self, project.calcium),
             from_=0,
             to=999999,
             validate="key",
@@ -78,7 +80,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Chlorides (mg/L):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.chlorides,
+            textvariable=bind(self, project.chlorides),
             from_=0,
             to=999999,
             validate="key",
@@ -90,7 +92,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Test temperature (°F):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.temperature,
+            textvariable=bind(self, project.temperature),
             from_=0,
             to=9999,
             validate="key",
@@ -102,7 +104,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Baseline pressure (PSI):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.baseline,
+            textvariable=bind(self, project.baseline),
             from_=0,
             to=9999,
             validate="key",
@@ -114,7 +116,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Limiting pressure (PSI):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.limit_psi,
+            textvariable=bind(self, project.limit_psi),
             from_=0,
             to=9999,
             validate="key",
@@ -126,7 +128,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Time limit (min.):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.limit_minutes,
+            textvariable=bind(self, project.limit_minutes),
             from_=0,
             to=9999,
             validate="key",
@@ -138,7 +140,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Reading interval (s):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.interval_seconds,
+            textvariable=bind(self, project.interval_seconds),
             from_=1,
             to=9999,
             validate="key",
@@ -150,7 +152,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Flowrate (mL/min):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.flowrate,
+            textvariable=bind(self, project.flowrate),
             from_=1,
             to=10,
             validate="key",
@@ -162,7 +164,7 @@ class ProjectParams(ttk.Frame):
         lbl = ttk.Label(self, text="Uptake time (s):")
         ent = ttk.Spinbox(
             self,
-            textvariable=project.uptake_seconds,
+            textvariable=bind(self, project.uptake_seconds),
             from_=0,
             to=9999,
             validate="key",
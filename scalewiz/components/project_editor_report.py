@@ -5,6 +5,10 @@ from __future__ import annotations
 from tkinter import ttk
 from typing import TYPE_CHECKING
 
+from scalewiz import CONFIG
+from scalewiz.helpers.tk_binding import bind
+from scalewiz.models.reading import pump_index, scorable
+
 if TYPE_CHECKING:
     from scalewiz.components.project_editor import ProjectWindow
     from scalewiz.models.project import Project
@@ -27,16 +31,21 @@ class ProjectReport(ttk.Frame):
         ent = ttk.Combobox(
             self,
             values=["JSON", "CSV"],
-            textvariable=project.output_format,
+            textvariable=bind(self, project.output_format),
             state="readonly",
         )
         render(lbl, ent, 0)
 
+        # as many pumps as this system or a new one has, or the default pump if more
+        width = max(int(CONFIG["pumps"]["per_system"]), len(parent.handler.devices))
+        index = pump_index(project.default_pump.get().lower())
+        if index is not None:
+            width = max(width, index + 1)
         lbl = ttk.Label(self, text="Default pump:")
         ent = ttk.Combobox(
             self,
-            values=["Pump 1", "Pump 2", "Average"],
-            textvariable=project.default_pump,
+            values=[column.capitalize() for column in scorable(width)],
+            textvariable=bind(self, project.default_pump),
             state="readonly",
         )
         render(lbl, ent, 1)
@@ -2,10 +2,16 @@
 
 import logging
 from pathlib import Path
+from threading import Thread
 from tkinter import ttk
+from typing import Dict
 
 from scalewiz.components.handler_view import TestHandlerView
 from scalewiz.components.scalewiz_menu_bar import MenuBar
+from scalewiz.helpers.metrics_server import MetricsServer
+from scalewiz.helpers.pump_backend import list_ports
+from scalewiz.helpers.pump_identity import assign_ports, identify_pumps
+from scalewiz.helpers.update_bus import UpdateBus
 from scalewiz.models.test_handler import TestHandler
 
 LOGGER = logging.getLogger("scalewiz")
@@ -25,6 +31,8 @@ class MainFrame(ttk.Frame):
         self.tab_control: ttk.Notebook = ttk.Notebook(self)
         self.tab_control.grid(sticky="nsew")
         self.add_handler()
+        # find out which pumps are where without holding up the window
+        Thread(target=self.identify_pumps, name="pump-probe", daemon=True).start()
 
     def add_handler(self) -> None:
         """Adds a new tab with an associated test handler."""
@@ -34,6 +42,9 @@ class MainFrame(ttk.Frame):
             TestHandlerView(self.tab_control, handler), sticky="nsew", text=system_name
         )
         LOGGER.info("Added %s to main window", handler.name)
+        server = MetricsServer.get()
+        if server is not None:
+            server.add(handler)
         # if this is the first handler, open the most recent project
         if len(self.tab_control.tabs()) == 1:
             from scalewiz import CONFIG
@@ -44,6 +55,42 @@ class MainFrame(ttk.Frame):
                 if recent.is_file():
                     handler.load_project(recent)
 
+    def identify_pumps(self) -> None:
+        """Probes every port for its pump. Runs on its own thread."""
+        try:
+            found = identify_pumps(list_ports())
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.exception(err)
+            return
+        UpdateBus.get().call(self.assign_ports, found)
+
+    def assign_ports(self, found: Dict[str, str]) -> None:
+        """Selects the ports each system's pumps were last used on.
+
+        Args:
+            found (Dict[str, str]): pump identities by port
+        """
+        systems = assign_ports(found)
+        # add tabs until every system with a known pump has one
+        numbers = [name.rpartition(" ")[2] for name in systems]
+        numbers = [int(number) for number in numbers if number.isdigit()]
+        while len(self.tab_control.tabs()) < max(numbers, default=0):
+            self.add_handler()
+        handlers = {}
+        for tab in self.tab_control.tabs():
+            handler = self.nametowidget(tab).handler
+            handlers[handler.name] = handler
+        for system, ports in systems.items():
+            handler = handlers.get(system)
+            if handler is None or handler.is_running or handler.is_rinsing:
+                continue
+            if max(ports) > len(handler.devices):
+                handler.pump_count.set(max(ports))
+            for number, port in ports.items():
+                if number <= len(handler.devices):
+                    handler.devices[number - 1].set(port)
+            LOGGER.info("Selected %s for %s", ports, system)
+
     def close(self) -> None:
         """Closes the program if no tests are running."""
         for tab in self.tab_control.tabs():
@@ -54,4 +101,6 @@ class MainFrame(ttk.Frame):
                     widget.handler.name,
                 )
                 return
+        for tab in self.tab_control.tabs():
+            self.nametowidget(tab).handler.connections.close()
         self.quit()
@@ -10,7 +10,9 @@ from pathlib import Path
 from tkinter.messagebox import showinfo
 from typing import TYPE_CHECKING
 
+from scalewiz.components.catalog_window import CatalogWindow
 from scalewiz.components.evaluation_window import EvaluationWindow
+from scalewiz.components.metrics_window import MetricsWindow
 from scalewiz.components.project_editor import ProjectWindow
 from scalewiz.components.scalewiz_rinse_window import RinseWindow
 from scalewiz.helpers.show_help import show_help
@@ -18,6 +20,8 @@ from scalewiz.helpers.show_help import show_help
 LOGGER = logging.getLogger("scalewiz")
 
 if TYPE_CHECKING:
+    from typing import Set
+
     from scalewiz.components.handler_view import TestHandlerView
     from scalewiz.components.scalewiz_main_frame import MainFrame
 
@@ -37,6 +41,7 @@ class MenuBar:
         project_menu.add_command(
             label="Load existing", command=self.request_project_load
         )
+        project_menu.add_command(label="Find tests", command=self.spawn_catalog)
         menubar.add_cascade(label="Project", menu=project_menu)
         # resume making buttons
         menubar.add_command(label="Evaluation", command=self.spawn_evaluator)
@@ -44,6 +49,7 @@ class MenuBar:
         menubar.add_command(
             label="Log", command=self.parent.master.log_window.deiconify
         )
+        menubar.add_command(label="Metrics", command=MetricsWindow)
         menubar.add_command(label="Help", command=show_help)
         menubar.add_command(label="About", command=self.about)
 
@@ -66,19 +72,31 @@ class MenuBar:
         widget.handler.views.append(window)
         LOGGER.debug("Spawned an Evaluation window for %s", widget.handler.name)
 
-    def request_project_load(self) -> None:
-        """Request that the currently selected TestHandler load a Project."""
-        # build a list of currently loaded projects, and pass to the handler
+    def loaded_projects(self) -> Set[Path]:
+        """Returns the paths of the Projects loaded in every TestHandler."""
         currently_loaded = set()
         for tab in self.parent.tab_control.tabs():
             widget = self.parent.nametowidget(tab)
             currently_loaded.add(Path(widget.handler.project.path.get()))
+        return currently_loaded
+
+    def request_project_load(self) -> None:
+        """Request that the currently selected TestHandler load a Project."""
+        # build a list of currently loaded projects, and pass to the handler
+        currently_loaded = self.loaded_projects()
         # the handler will check to make sure we don't load a project in duplicate
         current_tab = self.parent.tab_control.select()
         widget = self.parent.nametowidget(current_tab)
         widget.handler.load_project(loaded=currently_loaded)
         widget.build()
 
+    def spawn_catalog(self) -> None:
+        """Shows a CatalogWindow that loads Projects into the selected TestHandler."""
+        current_tab = self.parent.tab_control.select()
+        widget: TestHandlerView = self.parent.nametowidget(current_tab)
+        CatalogWindow(widget.handler, self.loaded_projects())
+        LOGGER.debug("Spawned a Catalog window for %s", widget.handler.name)
+
     def spawn_rinse(self) -> None:
         """Shows a RinseFrame in a new Toplevel."""
         current_tab = self.parent.tab_control.select()
@@ -2,8 +2,6 @@
 
 import logging
 import tkinter as tk
-from concurrent.futures import ThreadPoolExecutor
-from time import sleep
 from tkinter import ttk
 
 from scalewiz.helpers.set_icon import set_icon
@@ -19,7 +17,6 @@ class RinseWindow(tk.Toplevel):
         tk.Toplevel.__init__(self)
         self.winfo_toplevel().protocol("WM_DELETE_WINDOW", self.close)
         self.handler: TestHandler = handler
-        self.pool = ThreadPoolExecutor(max_workers=1)
         self.stop = False
 
         set_icon(self)
@@ -42,46 +39,27 @@ class RinseWindow(tk.Toplevel):
     def request_rinse(self) -> None:
         """Try to start a rinse cycle if a test isn't running."""
         if self.handler.is_done or not self.handler.is_running:
-            self.pool.submit(self.rinse)
+            self.button.configure(state="disabled")
+            duration = round(self.rinse_minutes.get() * 60)
+            self.handler.start_rinse(
+                duration,
+                lambda i: self.update_rinse(i, duration),
+                lambda: self.stop,
+                self.finish_rinse,
+            )
 
-    def rinse(self) -> None:
-        """Run the pumps and disable the button for the duration of a timer."""
-        self.handler.setup_pumps()
-        self.handler.pump1.run()
-        self.handler.pump2.run()
+    def update_rinse(self, i: int, duration: int) -> None:
+        """Shows the progress of a rinse on the button."""
+        if self.winfo_exists():
+            self.button.configure(text=f"{i}/{duration} s")
 
-        self.button.configure(state="disabled")
-        duration = round(self.rinse_minutes.get() * 60)
-        for i in range(duration):
-            if not self.stop:
-                self.button.configure(text=f"{i+1}/{duration} s")
-                sleep(1)
-            else:
-                break
+    def finish_rinse(self) -> None:
+        """Resets the button once a rinse is over."""
+        if not self.winfo_exists():  # the window was closed during the rinse
+            return
         self.bell()
-        self.end_rinse()
         self.button.configure(state="normal", text="Rinse")
 
-    def end_rinse(self) -> None:
-        """Stop the pumps if they are running, then close their ports."""
-        if self.handler.pump1.is_open:
-            self.handler.pump1.stop()
-            self.handler.pump1.close()
-            LOGGER.info(
-                "%s: Stopped and closed the device @ %s",
-                self.handler.name,
-                self.handler.pump1.serial.name,
-            )
-
-        if self.handler.pump2.is_open:
-            self.handler.pump2.stop()
-            self.handler.pump2.close()
-            LOGGER.info(
-                "%s: Stopped and closed the device @ %s",
-                self.handler.name,
-                self.handler.pump2.serial.name,
-            )
-
     def close(self) -> None:
         """Stops the rinse cycle and closes the rinse Toplevel."""
         self.stop = True
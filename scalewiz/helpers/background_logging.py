@@ -0,0 +1,68 @@
+"""Moves a logger's handlers onto a background thread.
+
+Writing to a log file or the console can block for as long as the disk or terminal
+likes. Loggers used from timing-critical threads, like a test's readings loop and its
+pump workers, instead just put each record on a queue, and a QueueListener thread
+passes them on to the handlers.
+"""
+
+from __future__ import annotations
+
+import atexit
+from logging import Logger
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import LogRecord
+    from typing import Tuple
+
+
+class LocalQueueHandler(QueueHandler):
+    """A QueueHandler for a listener in the same process.
+
+    The record is queued as it is, so formatting it is left to the listener's thread
+    too. The record's arguments mustn't be changed after they are logged.
+    """
+
+    def prepare(self, record: LogRecord) -> LogRecord:
+        return record
+
+
+def log_in_background(logger: Logger) -> Tuple[Logger, QueueListener]:
+    """Sets a logger up to have its records handled on a background thread.
+
+    After this, the logger only queues its records. The listener passes them to an
+    unregistered twin of the logger, which propagates them to the logger's parents as
+    usual, so handlers for this logger should be added to the twin instead.
+
+    Args:
+        logger (Logger): the logger to set up
+
+    Returns:
+        Tuple[Logger, QueueListener]: the twin to add handlers to, and the listener
+    """
+    twin = Logger(logger.name)
+    twin.parent = logger.parent
+    for handler in logger.handlers[:]:  # anything already added moves to the twin
+        logger.removeHandler(handler)
+        twin.addHandler(handler)
+    queue = SimpleQueue()
+    logger.addHandler(LocalQueueHandler(queue))
+    logger.propagate = False
+    # the twin's handlers check their own levels, the listener doesn't need to
+    listener = QueueListener(queue, twin)
+    listener.start()
+    atexit.register(listener.stop)  # handle whatever is left in the queue on exit
+    return twin, listener
+
+
+def drain(listener: QueueListener) -> None:
+    """Waits for a listener to handle the records queued so far.
+
+    Call this before removing a handler from the twin, so that it gets every record
+    that was logged while it was attached.
+    """
+    listener.stop()  # which handles everything ahead of its sentinel
+    listener.start()
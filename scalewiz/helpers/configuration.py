@@ -5,10 +5,11 @@ from __future__ import annotations
 import os
 from logging import getLogger
 from pathlib import Path
+from threading import RLock
 from typing import Union
 
 from appdirs import user_config_dir
-from tomlkit import comment, document, dumps, loads, table
+from tomlkit import comment, document, dumps, item, loads, table
 
 import scalewiz
 
@@ -16,6 +17,9 @@ LOGGER = getLogger("scalewiz.config")
 
 CONFIG_DIR = Path(user_config_dir("ScaleWiz", "teauxfu"))
 CONFIG_FILE = Path(CONFIG_DIR, "config.toml")
+# held while the config file is read, changed and written back, which may happen
+# from worker threads as well as the Tk thread
+CONFIG_LOCK = RLock()
 
 
 def ensure_config() -> None:
@@ -118,6 +122,226 @@ def generate_default() -> document:
 
     doc["defaults"] = params
     doc["defaults"].comment("these will get used when making new projects")
+
+    # pump communication
+    pumps = table()
+    pumps["backend"] = "serial"
+    pumps["backend"].comment(
+        'choose from ("serial", "simulated", "simulated-pty"), '
+        "or set the SCALEWIZ_PUMP_BACKEND environment variable"
+    )
+    pumps["keep_open"] = item(True).comment(
+        "keep each system's ports open between tests and rinses"
+    )
+    pumps["ping_seconds"] = 30.0
+    pumps["ping_seconds"].comment(
+        "seconds an open pump may sit idle before its connection is checked"
+    )
+    pumps["per_system"] = 2
+    pumps["per_system"].comment(
+        "pumps each new system starts with, an integer from 1 to 8"
+    )
+    pumps["port_poll_seconds"] = 2.0
+    pumps["port_poll_seconds"].comment(
+        "seconds between checks for serial ports being plugged in or removed"
+    )
+    doc["pumps"] = pumps
+    doc["pumps"].comment("how ScaleWiz talks to the pumps")
+
+    # data collection
+    acquisition = table()
+    acquisition["engine"] = "threads"
+    acquisition["engine"].comment(
+        'choose from ("threads", "asyncio", "processes"); asyncio drives every '
+        "system from one event loop, processes runs each system in its own process"
+    )
+    acquisition["io_threads"] = 8
+    acquisition["io_threads"].comment(
+        "pump I/O threads shared by all systems with asyncio, a positive integer"
+    )
+    acquisition["read_timeout"] = 2.0
+    acquisition["read_timeout"].comment(
+        "seconds to wait for a pump's pressure before skipping the reading, "
+        "at most 80% of the reading interval"
+    )
+    acquisition["read_retries"] = 1
+    acquisition["read_retries"].comment(
+        "times to retry a pressure read that failed, if there's time left for it"
+    )
+    acquisition["stalls_to_reconnect"] = 3
+    acquisition["stalls_to_reconnect"].comment(
+        "missed reads in a row before a pump is reconnected, a positive integer"
+    )
+    doc["acquisition"] = acquisition
+    doc["acquisition"].comment("how readings are collected")
+
+    # adaptive sampling
+    sampling = table()
+    sampling["mode"] = "fixed"
+    sampling["mode"].comment(
+        'choose from ("fixed", "adaptive"); adaptive takes readings less often while '
+        "the pressure is flat, and more often while it is rising"
+    )
+    sampling["slow_factor"] = 4.0
+    sampling["slow_factor"].comment(
+        "multiplies the reading interval while the pressure is flat, a float >= 1.0"
+    )
+    sampling["fast_factor"] = 0.5
+    sampling["fast_factor"].comment(
+        "multiplies the reading interval while the pressure is rising, "
+        "a float between 0.0 and 1.0"
+    )
+    sampling["rising_psi_per_min"] = 50.0
+    sampling["rising_psi_per_min"].comment(
+        "psi/min, how fast the pressure must climb to count as rising"
+    )
+    sampling["baseline_band_psi"] = 25.0
+    sampling["baseline_band_psi"].comment(
+        "psi, how far above its starting pressure a test still counts as flat"
+    )
+    doc["sampling"] = sampling
+    doc["sampling"].comment(
+        "how often readings are taken; tests never take more readings than the "
+        "project's interval allows"
+    )
+
+    # early failure prediction
+    prediction = table()
+    prediction["stop_early"] = item(False).comment(
+        "stop a trial once it is certain to reach the pressure limit in time"
+    )
+    prediction["window_minutes"] = 2.0
+    prediction["window_minutes"].comment(
+        "minutes of the latest readings to fit a trend to, a positive float"
+    )
+    prediction["horizon_minutes"] = 10.0
+    prediction["horizon_minutes"].comment(
+        "only trust the trend to project this many minutes ahead, a positive float"
+    )
+    prediction["confidence"] = 0.99
+    prediction["confidence"].comment(
+        "how sure the trend must be that the trial will fail, between 0.5 and 1.0"
+    )
+    prediction["min_readings"] = 10
+    prediction["min_readings"].comment("the fewest readings to fit a trend to")
+    doc["prediction"] = prediction
+    doc["prediction"].comment(
+        "projecting when a trial will fail; blanks always run to their limits"
+    )
+
+    # logging from the readings loop
+    logs = table()
+    logs["latency_summary_seconds"] = 60.0
+    logs["latency_summary_seconds"].comment(
+        "seconds between summaries of how long pump reads took, a positive float"
+    )
+    logs["latency_sample_every"] = 0
+    logs["latency_sample_every"].comment(
+        "also log every nth pump read's time at debug level, 0 for none"
+    )
+    doc["logging"] = logs
+    doc["logging"].comment("what a test writes to its log")
+
+    # acquisition health over HTTP
+    metrics = table()
+    metrics["serve"] = item(False).comment(
+        "serve each system's metrics at http://host:port/metrics for Prometheus"
+    )
+    metrics["host"] = "127.0.0.1"
+    metrics["host"].comment('where to listen, "0.0.0.0" to allow other computers')
+    metrics["port"] = 9464
+    metrics["port"].comment("the port to listen on, a positive integer")
+    doc["metrics"] = metrics
+    doc["metrics"].comment("read when ScaleWiz starts")
+
+    # crash recovery
+    journal = table()
+    # a plain bool can't carry a comment, so wrap it as a toml item first
+    journal["enabled"] = item(True).comment(
+        "journal readings so that a crashed test can be recovered"
+    )
+    journal["sync_readings"] = 10
+    journal["sync_readings"].comment(
+        "readings between flushes of the journal to disk, a positive integer"
+    )
+    journal["sync_seconds"] = 5.0
+    journal["sync_seconds"].comment(
+        "the most seconds between flushes of the journal to disk, a positive float"
+    )
+    doc["journal"] = journal
+    doc["journal"].comment("a journal of each running test's readings, in logs/")
+
+    # how project files are written
+    storage = table()
+    storage["readings"] = "json"
+    storage["readings"].comment(
+        'choose from ("json", "binary") for new projects; binary keeps the readings '
+        "in a compact .readings file beside the project file"
+    )
+    doc["storage"] = storage
+    doc["storage"].comment("how new project files store their tests' readings")
+
+    # searching projects
+    catalog = table()
+    catalog["root"] = ""
+    catalog["root"].comment(
+        "the folder to index project files under, eg. a shared Dropbox folder"
+    )
+    catalog["database"] = ""
+    catalog["database"].comment(
+        'where to keep the index, "" for catalog.sqlite3 beside this file'
+    )
+    doc["catalog"] = catalog
+    doc["catalog"].comment("a searchable index of every project under a folder")
+
+    # reopening projects
+    cache = table()
+    cache["memory_mb"] = 256
+    cache["memory_mb"].comment(
+        "MB of parsed project files to keep in memory for reopening, 0 for none"
+    )
+    cache["disk"] = item(False).comment(
+        "whether to also keep them on disk, so they're quick to open after a restart"
+    )
+    cache["disk_mb"] = 1024
+    cache["disk_mb"].comment("MB of parsed project files to keep on disk")
+    doc["cache"] = cache
+    doc["cache"].comment("parsed project files, reused while they're unchanged")
+
+    # which pump goes with which system
+    identities = table()
+    doc["identities"] = identities
+    doc["identities"].comment(
+        "the system and pump each identified pump was last used as, "
+        'eg. "SIM Version 1.0 SIM1 (SIM1)" = "System 1 / pump 1"'
+    )
+
+    # simulated pumps, for running without hardware
+    sim = table()
+    sim["ports"] = 4
+    sim["ports"].comment("number of simulated pumps to offer, a positive integer")
+    sim["latency"] = 0.03
+    sim["latency"].comment("seconds for a simulated pump to respond, a float => 0.0")
+    sim["baseline"] = 30
+    sim["baseline"].comment("psi, the pressure of a clean system")
+    sim["noise"] = 2.0
+    sim["noise"].comment("psi, the standard deviation of pressure noise")
+    sim["onset_minutes"] = 5.0
+    sim["onset_minutes"].comment("minutes of running before scale starts to build")
+    sim["growth"] = 0.5
+    sim["growth"].comment("exponential rate of scale buildup, per minute")
+    sim["failure_rate"] = 0.0
+    sim["failure_rate"].comment(
+        "chance that a simulated pump ignores a command, between 0.0 and 1.0"
+    )
+    sim["stall_rate"] = 0.0
+    sim["stall_rate"].comment(
+        "chance that a simulated pump hangs before responding, between 0.0 and 1.0"
+    )
+    sim["stall_seconds"] = 5.0
+    sim["stall_seconds"].comment("seconds that a stalled simulated pump hangs for")
+    doc["simulation"] = sim
+    doc["simulation"].comment("used by the simulated pump backends")
     # all done
     return doc
 
@@ -131,12 +355,60 @@ def open_config() -> None:
 
 def get_config() -> dict[str, Union[float, int, str]]:
     """Returns the current configuration as a dict."""
-    ensure_config()
-    with CONFIG_FILE.open("r") as file:
-        config = loads(file.read())
+    with CONFIG_LOCK:
+        ensure_config()
+        with CONFIG_FILE.open("r") as file:
+            config = loads(file.read())
+        if merge_defaults(config):
+            CONFIG_FILE.write_text(dumps(config))
+            LOGGER.info("Added new default settings to %s", CONFIG_FILE)
     return config
 
 
+def merge_defaults(config: document) -> bool:
+    """Adds any tables or keys missing from an older config file.
+
+    Args:
+        config (document): the config to update in place
+
+    Returns:
+        bool: True if anything was added
+    """
+    changed = False
+    for name, defaults in generate_default().items():
+        if name not in config:
+            config[name] = defaults
+            changed = True
+            continue
+        for key, value in defaults.items():
+            if key not in config[name]:
+                config[name][key] = value
+                changed = True
+    return changed
+
+
+def update_table(table: str, values: dict[str, Union[float, int, str, None]]) -> None:
+    """Sets keys in a config table, adding any that are missing.
+
+    Args:
+        table (str): table to update
+        values (dict[str, Union[float, int, str, None]]): the new values, by key;
+            keys whose value is None are removed
+    """
+    with CONFIG_LOCK:
+        ensure_config()
+        doc = loads(CONFIG_FILE.open("r").read())
+        merge_defaults(doc)
+        for key, value in values.items():
+            if value is not None:
+                doc[table][key] = value
+            elif key in doc[table]:
+                del doc[table][key]
+        CONFIG_FILE.write_text(dumps(doc))
+        LOGGER.info("Updated %s with %s", table, values)
+        scalewiz.CONFIG = get_config()
+
+
 def update_config(table: str, key: str, value: Union[float, int, str]) -> None:
     """Update the config with the passed values.
 
@@ -145,12 +417,13 @@ def update_config(table: str, key: str, value: Union[float, int, str]) -> None:
         key (str): the key to update
         value (Union[float, int, str]): the new value of `key`
     """
-    ensure_config()
-    doc = loads(CONFIG_FILE.open("r").read())
-    if table in doc.keys() and key in doc[table].keys():
-        doc[table][key] = value
-        CONFIG_FILE.write_text(dumps(doc))
-        LOGGER.info("Updated %s.%s to %s", table, key, value)
-        scalewiz.CONFIG = get_config()
-    else:
-        LOGGER.info("Failed to update %s.%s to %s", table, key, value)
+    with CONFIG_LOCK:
+        ensure_config()
+        doc = loads(CONFIG_FILE.open("r").read())
+        if table in doc.keys() and key in doc[table].keys():
+            doc[table][key] = value
+            CONFIG_FILE.write_text(dumps(doc))
+            LOGGER.info("Updated %s.%s to %s", table, key, value)
+            scalewiz.CONFIG = get_config()
+        else:
+            LOGGER.info("Failed to update %s.%s to %s", table, key, value)
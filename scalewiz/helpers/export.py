@@ -65,7 +65,12 @@ def export(project: Project) -> Tuple[int, Path]:
     output_dict["chemical"] = [test.chemical.get() for test in tests]
     output_dict["rate"] = [test.rate.get() for test in tests]
     output_dict["duration"] = [
-        round(len(test.readings) * project.interval_seconds.get() / 60, 2)
+        round(
+            sum(test.readings.weights(project.interval_seconds.get()))
+            * project.interval_seconds.get()
+            / 60,
+            2,
+        )
         for test in tests
     ]
     output_dict["maxPsi"] = [test.max_psi.get() for test in tests]
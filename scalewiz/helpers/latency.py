@@ -0,0 +1,80 @@
+"""Summarizes how long repeated operations take, for logging from timing-critical code.
+
+Logging a line for every pump read costs more than the read is worth in the log. A
+LatencySummary collects the durations instead, and logs one line with their min, mean,
+95th percentile, and max every so often.
+"""
+
+from __future__ import annotations
+
+from array import array
+from math import ceil
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from typing import Sequence
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Returns a percentile of already sorted samples, by the nearest-rank method.
+
+    Args:
+        ordered (Sequence[float]): the samples, in ascending order
+        fraction (float): eg. 0.95 for the 95th percentile
+    """
+    if len(ordered) == 0:
+        return 0.0
+    rank = max(1, ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencySummary:
+    """Collects durations, and periodically logs a summary of them."""
+
+    def __init__(
+        self, label: str, logger: Logger, period: float = 60.0, sample_every: int = 0
+    ) -> None:
+        """Initializes a LatencySummary.
+
+        Args:
+            label (str): what was timed, eg. "Pump read from COM3"
+            logger (Logger): where the summaries are logged
+            period (float, optional): seconds between summaries. Defaults to 60.0.
+            sample_every (int, optional): also log every nth duration on its own, at
+                debug level. Defaults to 0, for none.
+        """
+        self.label = label
+        self.logger = logger
+        self.period = period
+        self.sample_every = sample_every
+        self.samples = array("d")  # seconds, since the last summary
+        self.count: int = 0  # durations added in total
+        self.started: float = monotonic()
+
+    def add(self, seconds: float) -> None:
+        """Adds a duration, logging a summary if one is due."""
+        self.samples.append(seconds)
+        self.count += 1
+        if self.sample_every > 0 and self.count % self.sample_every == 0:
+            self.logger.debug("%s took %.1f ms", self.label, seconds * 1000)
+        if monotonic() - self.started >= self.period:
+            self.flush()
+
+    def flush(self) -> None:
+        """Logs a summary of the durations added since the last one, if any."""
+        self.started = monotonic()
+        if len(self.samples) == 0:
+            return
+        ordered = sorted(self.samples)
+        del self.samples[:]
+        self.logger.info(
+            "%s: %s times, min %.1f ms, mean %.1f ms, p95 %.1f ms, max %.1f ms",
+            self.label,
+            len(ordered),
+            ordered[0] * 1000,
+            sum(ordered) / len(ordered) * 1000,
+            percentile(ordered, 0.95) * 1000,
+            ordered[-1] * 1000,
+        )
@@ -0,0 +1,199 @@
+"""Latency histograms and error counts for every command sent to a pump, by port.
+
+A failing USB adapter usually shows itself as slow or missing responses well before it
+drops off the bus entirely. Every PumpWorker records how long each of its commands
+took, and whether it timed out or failed, in the application's PumpMetrics. The
+readings loop adds the slots it missed. The numbers can be read back with `snapshot`,
+or looked at from the menu bar's Metrics window.
+
+Metrics are kept per process, so with `acquisition.engine = "processes"` the readings
+taken by a test's child process aren't included.
+"""
+
+from __future__ import annotations
+
+from math import ceil
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from py_hplc.pump_error import PumpError
+from serial import SerialTimeoutException
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple, Union
+
+# the PumpWorker functions that are timed, by the name of the command they send
+COMMANDS = {
+    "get_pressure": "pressure",
+    "run": "run",
+    "stop": "stop",
+    "set_flowrate": "flowrate",
+}
+
+
+def is_timeout(err: Exception) -> bool:
+    """Returns True if the exception means the pump didn't answer in time."""
+    if isinstance(err, (TimeoutError, SerialTimeoutException)):
+        return True
+    # py_hplc gives up with an empty response after its retries
+    return isinstance(err, PumpError) and not getattr(err, "response", None)
+
+
+class LatencyHistogram:
+    """A histogram of durations, with log-linear buckets like an HdrHistogram.
+
+    Durations are counted in whole microseconds. Each power of two is split into
+    SUB_BUCKETS / 2 linear buckets, so a value is never reported more than about
+    3 % away from what was recorded, however large, and the memory used only grows
+    with the logarithm of the largest value.
+    """
+
+    SUB_BITS: int = 6
+    SUB_BUCKETS: int = 1 << SUB_BITS  # values below this are counted exactly
+
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}  # by bucket index
+        self.count: int = 0
+        self.total: int = 0  # microseconds
+        self.min: int = 0
+        self.max: int = 0
+
+    def record(self, seconds: float) -> None:
+        """Adds a duration."""
+        value = max(round(seconds * 1_000_000), 0)
+        index = self.index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    @classmethod
+    def index(cls, value: int) -> int:
+        """Returns the bucket a value in microseconds is counted in."""
+        if value < cls.SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - cls.SUB_BITS
+        half = cls.SUB_BUCKETS // 2
+        # the top bits of the value are between half and SUB_BUCKETS - 1
+        return cls.SUB_BUCKETS + (shift - 1) * half + (value >> shift) - half
+
+    @classmethod
+    def highest(cls, index: int) -> int:
+        """Returns the largest value in microseconds counted in a bucket."""
+        if index < cls.SUB_BUCKETS:
+            return index
+        half = cls.SUB_BUCKETS // 2
+        shift, top = divmod(index - cls.SUB_BUCKETS, half)
+        shift += 1
+        return ((top + half + 1) << shift) - 1
+
+    @property
+    def mean(self) -> float:
+        """Returns the mean duration in seconds."""
+        if self.count == 0:
+            return 0.0
+        return self.total / self.count / 1_000_000
+
+    def percentile(self, fraction: float) -> float:
+        """Returns a percentile of the durations in seconds, eg. 0.99 for the p99."""
+        if self.count == 0:
+            return 0.0
+        rank = max(1, ceil(fraction * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.highest(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+
+class CommandStats:
+    """How one kind of command has fared on one port."""
+
+    def __init__(self) -> None:
+        self.latency = LatencyHistogram()  # of the commands that got an answer
+        self.timeouts: int = 0
+        self.errors: int = 0  # failures besides timeouts
+
+    def as_dict(self) -> Dict[str, Union[float, int]]:
+        """Returns the stats, in seconds, for display or export."""
+        return {
+            "count": self.latency.count,
+            "min": self.latency.min / 1_000_000,
+            "mean": self.latency.mean,
+            "p50": self.latency.percentile(0.50),
+            "p95": self.latency.percentile(0.95),
+            "p99": self.latency.percentile(0.99),
+            "max": self.latency.max / 1_000_000,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class PumpMetrics:
+    """The application's pump command metrics, shared by every thread."""
+
+    _instance: PumpMetrics = None
+    _instance_lock = Lock()
+
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.commands: Dict[Tuple[str, str], CommandStats] = {}  # by port and command
+        self.missed: Dict[str, int] = {}  # reading slots missed, by system
+
+    @classmethod
+    def get(cls) -> PumpMetrics:
+        """Returns the application's PumpMetrics."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def record(
+        self, port: str, command: str, seconds: float, err: Optional[Exception] = None
+    ) -> None:
+        """Records how a command went.
+
+        Args:
+            port (str): the pump's port
+            command (str): eg. "pressure", see COMMANDS
+            seconds (float): how long the command took
+            err (Optional[Exception], optional): what went wrong, if anything.
+                Defaults to None.
+        """
+        with self.lock:
+            stats = self.commands.setdefault((port, command), CommandStats())
+            if err is None:
+                stats.latency.record(seconds)
+            elif is_timeout(err):
+                stats.timeouts += 1
+            else:
+                stats.errors += 1
+
+    def add_missed(self, system: str, slots: int) -> None:
+        """Adds to the reading slots a system has missed."""
+        with self.lock:
+            self.missed[system] = self.missed.get(system, 0) + slots
+
+    def snapshot(self) -> List[Dict[str, Union[float, int, str]]]:
+        """Returns the stats for each port and command, sorted by port."""
+        with self.lock:
+            rows = [
+                {"port": port, "command": command, **stats.as_dict()}
+                for (port, command), stats in self.commands.items()
+            ]
+        return sorted(rows, key=lambda row: (row["port"], row["command"]))
+
+    def missed_slots(self) -> Dict[str, int]:
+        """Returns the reading slots each system has missed."""
+        with self.lock:
+            return dict(self.missed)
+
+    def reset(self) -> None:
+        """Forgets everything recorded so far."""
+        with self.lock:
+            self.commands.clear()
+            self.missed.clear()
@@ -0,0 +1,186 @@
+"""Serves each system's acquisition health over HTTP, in Prometheus' text format.
+
+With `metrics.serve` set, `http://<host>:<port>/metrics` can be scraped by Prometheus,
+or just opened in a browser, to check on every system of a PC from elsewhere.
+
+Each scrape reads plain attributes that the readings loop keeps up to date anyway, so
+it never takes a lock that the readings loop, or a pump worker, could be waiting on.
+The values may be a reading out of date with each other, which doesn't matter here.
+"""
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import getLogger
+from threading import Lock, Thread
+from typing import TYPE_CHECKING
+
+import scalewiz
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Union
+
+    from scalewiz.models.test_handler import TestHandler
+
+LOGGER = getLogger("scalewiz.metrics_server")
+
+# name, type, and help for each metric
+METRICS = (
+    ("scalewiz_readings", "gauge", "Readings collected by the current test"),
+    ("scalewiz_elapsed_minutes", "gauge", "Minutes into the current test"),
+    ("scalewiz_max_psi", "gauge", "Highest pressure each pump reached this test"),
+    ("scalewiz_interval_seconds", "gauge", "Seconds between readings"),
+    ("scalewiz_jitter_seconds", "gauge", "How late the last reading woke up"),
+    ("scalewiz_jitter_mean_seconds", "gauge", "How late readings woke up on average"),
+    ("scalewiz_missed_slots", "gauge", "Reading slots missed by the current test"),
+    ("scalewiz_read_latency_seconds", "gauge", "How long each pump's last read took"),
+    ("scalewiz_test_state", "gauge", "1 for the state each system is in"),
+    ("scalewiz_log_queue_depth", "gauge", "Log records waiting to be written"),
+)
+STATES = ("idle", "running", "done", "rinsing")
+
+
+def escape(value: str) -> str:
+    """Escapes a label value for the text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def get_state(handler: TestHandler) -> str:
+    """Returns which of STATES the handler is in."""
+    if handler.is_rinsing:
+        return "rinsing"
+    if handler.is_running and not handler.is_done:
+        return "running"
+    if handler.is_done:
+        return "done"
+    return "idle"
+
+
+def collect(handler: TestHandler) -> Dict[str, List[str]]:
+    """Returns the samples for a system, by metric name, without taking any locks."""
+    system = f'system="{escape(handler.name)}"'
+    samples: Dict[str, List[str]] = {name: [] for name, _, _ in METRICS}
+
+    def add(name: str, value: Union[float, int], labels: str = "") -> None:
+        samples[name].append(f"{name}{{{system}{labels}}} {float(value)!r}")
+
+    # hold on to the objects once, since the Tk thread may replace them
+    acquisition = handler.acquisition
+    add("scalewiz_readings", len(handler.readings))
+    for state in STATES:
+        add("scalewiz_test_state", state == get_state(handler), f',state="{state}"')
+    if acquisition is not None:
+        add("scalewiz_elapsed_minutes", acquisition.elapsed_min)
+        for number, psi in enumerate(list(acquisition.max_psi), start=1):
+            add("scalewiz_max_psi", psi, f',pump="{number}"')
+        scheduler = acquisition.scheduler
+        if scheduler is not None:
+            add("scalewiz_interval_seconds", scheduler.interval)
+            add("scalewiz_jitter_seconds", scheduler.last_jitter)
+            add("scalewiz_jitter_mean_seconds", scheduler.jitter.mean)
+            add("scalewiz_missed_slots", scheduler.missed)
+    for number, worker in enumerate(list(handler.pumps), start=1):
+        if worker is not None:
+            labels = f',pump="{number}",port="{escape(worker.port)}"'
+            add("scalewiz_read_latency_seconds", worker.last_latency, labels)
+    add("scalewiz_log_queue_depth", handler.log_listener.queue.qsize())
+    return samples
+
+
+def render(handlers: List[TestHandler]) -> str:
+    """Returns the metrics for every system in Prometheus' text format."""
+    samples: Dict[str, List[str]] = {name: [] for name, _, _ in METRICS}
+    for handler in handlers:
+        try:
+            collected = collect(handler)
+        except Exception as err:  # pylint: disable=broad-except
+            # eg. a handler caught halfway through setting up a test
+            LOGGER.debug("Skipped %s in a scrape: %s", handler.name, err)
+            continue
+        for name, lines in collected.items():
+            samples[name].extend(lines)
+    text = []
+    for name, kind, description in METRICS:
+        text.append(f"# HELP {name} {description}")
+        text.append(f"# TYPE {name} {kind}")
+        text.extend(samples[name])
+    return "\n".join(text) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Answers GET /metrics."""
+
+    server: MetricsHTTPServer
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Sends the metrics, or a 404 for any other path."""
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = render(list(self.server.handlers)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable=W0622
+        """Logs requests at debug level, rather than printing them to stderr."""
+        LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+class MetricsHTTPServer(ThreadingHTTPServer):
+    """An HTTP server that knows which TestHandlers to report on."""
+
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int) -> None:
+        super().__init__((host, port), MetricsRequestHandler)
+        # only ever appended to on the Tk thread, and copied by each scrape
+        self.handlers: List[TestHandler] = []
+
+
+class MetricsServer:
+    """Runs the application's metrics endpoint, if it's turned on."""
+
+    _instance: MetricsServer = None
+    _instance_lock = Lock()
+    _started: bool = False  # whether starting it has been tried
+
+    def __init__(self, host: str, port: int) -> None:
+        """Initializes a MetricsServer, serving on a daemon thread.
+
+        Raises:
+            OSError: if the address couldn't be bound, eg. if it's in use
+        """
+        self.httpd = MetricsHTTPServer(host, port)
+        self.thread = Thread(
+            target=self.httpd.serve_forever, name="metrics-server", daemon=True
+        )
+        self.thread.start()
+        LOGGER.info("Serving metrics at http://%s:%s/metrics", host, port)
+
+    @classmethod
+    def get(cls) -> MetricsServer:
+        """Returns the application's MetricsServer, or None if it isn't serving."""
+        with cls._instance_lock:
+            if not cls._started:
+                cls._started = True
+                settings = scalewiz.CONFIG["metrics"]
+                if settings["serve"]:
+                    try:
+                        cls._instance = cls(
+                            str(settings["host"]), int(settings["port"])
+                        )
+                    except OSError as err:
+                        LOGGER.error("Couldn't serve metrics: %s", err)
+            return cls._instance
+
+    def add(self, handler: TestHandler) -> None:
+        """Includes a system in the metrics."""
+        self.httpd.handlers.append(handler)
+
+    def close(self) -> None:
+        """Stops serving."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
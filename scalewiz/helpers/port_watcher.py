@@ -0,0 +1,96 @@
+"""Watches for serial ports coming and going, on a background thread.
+
+Listing the serial ports can take a noticeable amount of time, especially on Windows,
+so it mustn't be done on the Tk thread. A single PortWatcher lists them every so often
+and keeps the list cached. Whenever the list changes, it is passed to every subscriber
+through the UpdateBus.
+"""
+
+from __future__ import annotations
+
+from logging import getLogger
+from threading import Event, Lock, Thread
+from typing import TYPE_CHECKING
+
+import scalewiz
+from scalewiz.helpers.pump_backend import list_ports
+from scalewiz.helpers.update_bus import UpdateBus
+
+if TYPE_CHECKING:
+    from typing import Callable, List
+
+LOGGER = getLogger("scalewiz.port_watcher")
+
+
+class PortWatcher:
+    """Polls for serial ports on a daemon thread, and shares a cached list of them.
+
+    pyserial has no portable way to be told about hot-plugged devices, so the ports are
+    polled instead. Opening a combobox's dropdown can ask for an early poll with
+    `refresh`.
+    """
+
+    _instance: PortWatcher = None
+    _instance_lock = Lock()
+
+    def __init__(self, interval: float) -> None:
+        """Initializes a PortWatcher. Must be called from the Tk thread.
+
+        Args:
+            interval (float): seconds between polls
+        """
+        self.interval = max(interval, 0.1)
+        self.bus = UpdateBus.get()
+        self.lock = Lock()
+        self.ports: List[str] = []
+        self.subscribers: List[Callable[[List[str]], None]] = []
+        self.wake = Event()
+        self.thread = Thread(target=self.watch, name="port-watcher", daemon=True)
+        self.thread.start()
+
+    @classmethod
+    def get(cls) -> PortWatcher:
+        """Returns the application's PortWatcher, starting it if need be."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                interval = float(scalewiz.CONFIG["pumps"]["port_poll_seconds"])
+                cls._instance = cls(interval)
+            return cls._instance
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> List[str]:
+        """Has the callback passed the list of ports on the Tk thread when it changes.
+
+        Returns:
+            List[str]: the ports found so far
+        """
+        with self.lock:
+            self.subscribers.append(callback)
+            return list(self.ports)
+
+    def unsubscribe(self, callback: Callable[[List[str]], None]) -> None:
+        """Stops passing the list of ports to the callback."""
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def refresh(self) -> None:
+        """Asks for the ports to be listed again now, without waiting for them."""
+        self.wake.set()
+
+    def watch(self) -> None:
+        """Lists the ports until the program exits. Runs on the watcher's thread."""
+        while True:
+            try:
+                ports = list_ports()
+            except Exception as err:  # pylint: disable=broad-except
+                LOGGER.exception(err)
+                ports = self.ports
+            if ports != self.ports:
+                LOGGER.debug("Found devices: %s", ports)
+                with self.lock:
+                    self.ports = ports
+                    subscribers = list(self.subscribers)
+                for callback in subscribers:
+                    self.bus.post(callback, list(ports))
+            self.wake.wait(self.interval)
+            self.wake.clear()
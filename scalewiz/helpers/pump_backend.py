@@ -0,0 +1,122 @@
+"""Functions for making pump objects with the configured backend.
+
+The backend is read from the `pumps.backend` config setting, and may be overridden
+with the SCALEWIZ_PUMP_BACKEND environment variable.
+
+- "serial": real pumps on real serial ports (the default)
+- "simulated": in-process simulated pumps on ports named SIM1, SIM2, ...
+- "simulated-pty": simulated pumps served on pseudo-terminals (POSIX only)
+"""
+
+from __future__ import annotations
+
+import os
+from logging import getLogger
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from py_hplc import NextGenPump
+from serial import serial_for_url
+from serial.serialutil import EIGHTBITS, PARITY_NONE, STOPBITS_ONE
+from serial.tools import list_ports as serial_ports
+
+import scalewiz
+from scalewiz.models.simulated_pump import PtyPumpServer, SimulatedPump, SimulatedSerial
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from typing import Dict, List
+
+    from serial.serialutil import SerialBase
+
+LOGGER = getLogger("scalewiz.backend")
+
+BACKENDS = ("serial", "simulated", "simulated-pty")
+ENV_VAR = "SCALEWIZ_PUMP_BACKEND"
+
+_SIMULATED: Dict[str, SimulatedPump] = {}  # simulated pumps by name
+_PTY_SERVERS: Dict[str, PtyPumpServer] = {}  # pty servers by port path
+_LOCK = Lock()
+
+
+def get_backend() -> str:
+    """Returns the name of the pump backend in use."""
+    backend = os.environ.get(ENV_VAR) or scalewiz.CONFIG["pumps"]["backend"]
+    backend = str(backend).strip().lower()
+    if backend not in BACKENDS:
+        LOGGER.warning("Unknown pump backend %s, falling back to serial", backend)
+        backend = "serial"
+    return backend
+
+
+def is_simulated() -> bool:
+    """Returns True if the pumps are simulated."""
+    return get_backend() != "serial"
+
+
+def _simulated_pump(name: str) -> SimulatedPump:
+    """Returns the simulated pump of this name, making it if need be."""
+    if name not in _SIMULATED:
+        _SIMULATED[name] = SimulatedPump.from_config(
+            name, scalewiz.CONFIG["simulation"]
+        )
+    return _SIMULATED[name]
+
+
+def _ensure_pty_servers() -> None:
+    """Starts a pty server for each configured simulated port."""
+    for i in range(int(scalewiz.CONFIG["simulation"]["ports"])):
+        name = f"SIM{i + 1}"
+        if not any(srv.pump.name == name for srv in _PTY_SERVERS.values()):
+            server = PtyPumpServer(_simulated_pump(name))
+            _PTY_SERVERS[server.port] = server
+
+
+def list_ports() -> List[str]:
+    """Returns a sorted list of the ports that pumps might be found on."""
+    backend = get_backend()
+    if backend == "simulated":
+        count = int(scalewiz.CONFIG["simulation"]["ports"])
+        return [f"SIM{i + 1}" for i in range(count)]
+    if backend == "simulated-pty":
+        with _LOCK:
+            _ensure_pty_servers()
+            return sorted(_PTY_SERVERS.keys())
+    return sorted(port.device for port in serial_ports.comports())
+
+
+def make_device(port: str, write_timeout: float = None) -> SerialBase:
+    """Returns an unopened serial device for a port using the configured backend.
+
+    It's set up as a NextGenPump would set up its own, but writes to it can be given
+    up on, so that a port that never drains can't block forever.
+    """
+    if get_backend() == "simulated":
+        with _LOCK:
+            pump = _simulated_pump(port)
+        return SimulatedSerial(pump, timeout=0.1, write_timeout=write_timeout)
+    return serial_for_url(
+        port,
+        baudrate=9600,
+        bytesize=EIGHTBITS,
+        do_not_open=True,
+        parity=PARITY_NONE,
+        stopbits=STOPBITS_ONE,
+        timeout=0.1,
+        write_timeout=write_timeout,
+    )
+
+
+def make_pump(port: str, logger: Logger = None) -> NextGenPump:
+    """Returns a NextGenPump connected to the passed port using the configured backend.
+
+    Raises:
+        SerialException: if the port couldn't be opened
+        PumpError: if the pump didn't respond as expected
+    """
+    if get_backend() == "simulated":
+        with _LOCK:
+            pump = _simulated_pump(port)
+        device = SimulatedSerial(pump, timeout=0.1)
+        return NextGenPump(device, logger)
+    return NextGenPump(port, logger)
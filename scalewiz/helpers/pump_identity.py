@@ -0,0 +1,157 @@
+"""Identifies the pump on each port, so that each system gets the pumps it last used.
+
+Windows is free to renumber COM ports, and adding a rig shifts every port after it in
+the list, so a port's name says little about which pump is on it. A pump is instead
+identified by the serial number of its USB adapter (or the adapter's USB location, if
+it has no serial number), along with the version string the pump reports.
+
+The config file's `identities` table maps each identity to the system and pump it was
+last used as. At startup, `identify_pumps` probes every port at once, and
+`assign_ports` works out which ports each system should select.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from logging import getLogger
+from typing import TYPE_CHECKING
+
+from py_hplc import NextGenPump
+from serial.tools import list_ports as serial_ports
+
+import scalewiz
+from scalewiz.helpers.configuration import CONFIG_LOCK, update_table
+from scalewiz.helpers.pump_backend import get_backend, make_device
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Optional, Tuple
+
+LOGGER = getLogger("scalewiz.pump_identity")
+
+PROBE_TIMEOUT: float = 5.0  # seconds to wait for every port to answer
+WRITE_TIMEOUT: float = 0.5  # seconds a probe waits for a port to take a command
+SEPARATOR = " / pump "  # eg. "System 2 / pump 1"
+
+
+def hardware_ids() -> Dict[str, str]:
+    """Returns the USB serial number, or else location, of each port that has one."""
+    if get_backend() != "serial":
+        return {}
+    return {
+        port.device: port.serial_number or port.location
+        for port in serial_ports.comports()
+        if port.serial_number or port.location
+    }
+
+
+def make_identity(port: str, version: str, hardware: Dict[str, str]) -> str:
+    """Returns the identity of a pump from its version and the port it's on."""
+    return f"{version or 'unknown pump'} ({hardware.get(port, port)})"
+
+
+def probe(port: str) -> str:
+    """Opens the pump on a port just long enough to return its version string.
+
+    The port is closed again even if no pump answered on it.
+
+    Raises:
+        SerialException: if the port couldn't be opened, or didn't take a command
+        PumpError: if there wasn't a pump on the port
+    """
+    device = make_device(port, WRITE_TIMEOUT)
+    try:
+        return NextGenPump(device, LOGGER).version
+    finally:
+        if device.is_open:
+            device.close()
+
+
+def identify_pumps(ports: Iterable[str]) -> Dict[str, str]:
+    """Probes every port concurrently, giving up on any that take too long.
+
+    Args:
+        ports (Iterable[str]): the ports to probe, none of which may be open
+
+    Returns:
+        Dict[str, str]: the identity of the pump on each port that answered, by port
+    """
+    ports = list(ports)
+    if not ports:
+        return {}
+    hardware = hardware_ids()
+    pool = ThreadPoolExecutor(max_workers=len(ports), thread_name_prefix="probe")
+    futures = {pool.submit(probe, port): port for port in ports}
+    done, pending = wait(futures, timeout=PROBE_TIMEOUT)
+    # stragglers are given up on, but their writes and reads time out, so they're
+    # waited for to close their ports before anything else opens them
+    pool.shutdown(wait=True, cancel_futures=True)
+    found = {}
+    for future in done:
+        port = futures[future]
+        try:
+            found[port] = make_identity(port, future.result(), hardware)
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("No pump answered on %s: %s", port, err)
+    if pending:
+        LOGGER.warning(
+            "Gave up identifying the pumps on %s after %s s",
+            ", ".join(futures[future] for future in pending),
+            PROBE_TIMEOUT,
+        )
+    LOGGER.info("Identified pumps: %s", found)
+    return found
+
+
+def get_assignments() -> Dict[str, Tuple[str, int]]:
+    """Returns the system name and pump number each known pump was last used as."""
+    assignments = {}
+    for identity, value in scalewiz.CONFIG["identities"].items():
+        system, _, number = str(value).rpartition(SEPARATOR)
+        if system and number.strip().isdigit() and int(number) > 0:
+            assignments[identity] = (system, int(number))
+    return assignments
+
+
+def assign_ports(found: Dict[str, str]) -> Dict[str, Dict[int, str]]:
+    """Returns the port each system should use for each of its pumps.
+
+    Args:
+        found (Dict[str, str]): pump identities by port, from `identify_pumps`
+
+    Returns:
+        Dict[str, Dict[int, str]]: ports by pump number, by system name
+    """
+    assignments = get_assignments()
+    systems: Dict[str, Dict[int, str]] = {}
+    for port, identity in found.items():
+        if identity in assignments:
+            system, number = assignments[identity]
+            systems.setdefault(system, {})[number] = port
+    return systems
+
+
+def remember(system: str, versions: Dict[str, str]) -> None:
+    """Records which pumps a system is using, so they're assigned to it next time.
+
+    Safe to call from a worker thread.
+
+    Args:
+        system (str): the system's name, eg. "System 1"
+        versions (Dict[str, str]): each pump's version string, by port, in the order
+            of the system's pumps
+    """
+    hardware = hardware_ids()
+    values: Dict[str, Optional[str]] = {
+        make_identity(port, version, hardware): f"{system}{SEPARATOR}{number}"
+        for number, (port, version) in enumerate(versions.items(), start=1)
+    }
+    # so another system's pumps can't be recorded between reading and writing these
+    with CONFIG_LOCK:
+        known = scalewiz.CONFIG["identities"]
+        if all(known.get(identity) == value for identity, value in values.items()):
+            return
+        # whichever pumps used to be in these places aren't anymore
+        for identity, value in known.items():
+            if value in values.values() and identity not in values:
+                values[identity] = None
+        update_table("identities", values)
@@ -0,0 +1,176 @@
+"""A drift-free deadline scheduler for periodic loops, paced by a monotonic clock."""
+
+from __future__ import annotations
+
+import asyncio
+from math import sqrt
+from time import monotonic_ns, sleep
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Callable
+
+NS_PER_S = 1_000_000_000
+
+
+class JitterStats:
+    """Running statistics for how late each tick woke up relative to its deadline."""
+
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.mean: float = 0.0  # seconds
+        self._m2: float = 0.0  # sum of squared deviations, for Welford's algorithm
+        self.min: float = 0.0
+        self.max: float = 0.0
+
+    def add(self, jitter: float) -> None:
+        """Adds a sample, in seconds."""
+        self.count += 1
+        if self.count == 1:
+            self.min = self.max = jitter
+        else:
+            self.min = min(self.min, jitter)
+            self.max = max(self.max, jitter)
+        delta = jitter - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (jitter - self.mean)
+
+    @property
+    def stdev(self) -> float:
+        """Returns the sample standard deviation of the jitter, in seconds."""
+        if self.count < 2:
+            return 0.0
+        return sqrt(self._m2 / (self.count - 1))
+
+    def __str__(self) -> str:
+        return (
+            "jitter mean {:.1f} ms, sd {:.1f} ms, min {:.1f} ms, max {:.1f} ms".format(
+                self.mean * 1000, self.stdev * 1000, self.min * 1000, self.max * 1000
+            )
+        )
+
+
+class Scheduler:
+    """Paces a loop on explicit deadlines measured with `time.monotonic_ns`.
+
+    Tick `n` is due at `start + n * interval`. Deadlines are computed from the start
+    rather than from the previous wake-up, so sleep overshoot never accumulates. If a
+    tick overruns one or more deadlines, those slots are counted as missed and the
+    schedule skips ahead to the next future deadline instead of bunching up.
+    """
+
+    def __init__(self, interval: float) -> None:
+        """Initializes a Scheduler.
+
+        Args:
+            interval (float): seconds between ticks, must be positive
+        """
+        if interval <= 0:
+            raise ValueError("The interval must be positive")
+        self.interval_ns: int = round(interval * NS_PER_S)
+        self.start_ns: int = None
+        self.deadline_ns: int = None  # when the next tick is due
+        self.ticks: int = 0  # ticks that were kept
+        self.missed: int = 0  # slots that were skipped because a tick overran
+        self.jitter = JitterStats()
+        self.last_jitter: float = 0.0
+
+    @property
+    def interval(self) -> float:
+        """Returns the interval between ticks in seconds."""
+        return self.interval_ns / NS_PER_S
+
+    @interval.setter
+    def interval(self, interval: float) -> None:
+        """Changes the interval, so the next tick is due this long after the last one.
+
+        Each deadline still follows on from the one before it rather than from when
+        the tick woke up, so changing the interval doesn't cause drift either.
+        """
+        if interval <= 0:
+            raise ValueError("The interval must be positive")
+        self.interval_ns = round(interval * NS_PER_S)
+
+    def start(self) -> None:
+        """Starts the clock. The first tick is due immediately."""
+        self.start_ns = monotonic_ns()
+        self.deadline_ns = self.start_ns
+        self.ticks = 0
+        self.missed = 0
+        self.jitter = JitterStats()
+
+    @property
+    def elapsed(self) -> float:
+        """Returns the seconds elapsed since the scheduler was started."""
+        if self.start_ns is None:
+            return 0.0
+        return (monotonic_ns() - self.start_ns) / NS_PER_S
+
+    @property
+    def elapsed_min(self) -> float:
+        """Returns the minutes elapsed since the scheduler was started."""
+        return self.elapsed / 60
+
+    def _advance(self) -> None:
+        """Moves to the next deadline, counting any slots that were overrun."""
+        if self.start_ns is None:
+            self.start()
+        now = monotonic_ns()
+        self.deadline_ns += self.interval_ns
+        if now > self.deadline_ns:  # we overran at least one slot
+            skipped = (now - self.deadline_ns) // self.interval_ns + 1
+            self.missed += skipped
+            self.deadline_ns += skipped * self.interval_ns
+
+    def _remaining(self) -> float:
+        """Returns the seconds left until the current deadline."""
+        return (self.deadline_ns - monotonic_ns()) / NS_PER_S
+
+    def _tick(self) -> None:
+        """Records a tick that woke up at the current deadline."""
+        self.last_jitter = (monotonic_ns() - self.deadline_ns) / NS_PER_S
+        self.jitter.add(self.last_jitter)
+        self.ticks += 1
+
+    def wait(self, should_stop: Callable[[], bool] = None) -> bool:
+        """Sleeps until the next deadline.
+
+        Args:
+            should_stop (Callable[[], bool], optional): polled while sleeping, so that
+                long intervals can be interrupted. Defaults to None.
+
+        Returns:
+            bool: False if the wait was interrupted by `should_stop`, else True
+        """
+        self._advance()
+        # sleep in short slices if we need to stay responsive to stop requests
+        while (remaining := self._remaining()) > 0:
+            if should_stop is not None:
+                if should_stop():
+                    return False
+                sleep(min(remaining, 0.1))
+            else:
+                sleep(remaining)
+        self._tick()
+        return True
+
+    async def wait_async(self, should_stop: Callable[[], bool] = None) -> bool:
+        """Like `wait`, but yields to the event loop instead of blocking the thread."""
+        self._advance()
+        while (remaining := self._remaining()) > 0:
+            if should_stop is not None:
+                if should_stop():
+                    return False
+                await asyncio.sleep(min(remaining, 0.1))
+            else:
+                await asyncio.sleep(remaining)
+        self._tick()
+        return True
+
+    def summary(self) -> str:
+        """Returns a short description of how well the schedule was kept."""
+        return "{} ticks at {} s, {} missed slots, {}".format(
+            self.ticks, self.interval, self.missed, self.jitter
+        )
@@ -2,13 +2,12 @@
 """
 from __future__ import annotations
 
-import tkinter as tk
 from importlib.metadata import version
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from tkinter.scrolledtext import ScrolledText
-    from typing import List
+    from typing import List, Tuple
 
     from scalewiz.models.project import Project
     from scalewiz.models.test import Test
@@ -76,16 +75,18 @@ def score(project: Project, log_widget: ScrolledText = None, *args) -> None:
         log.append(f"Considering pump data: {blank.pump_to_score.get()}")
         readings = blank.get_readings()
         log.append(f"Total readings: {len(readings):,}")
+        intervals, int_psi = integrate(blank, interval_seconds)
+        log.append(f"Reading intervals covered: {intervals:,.2f}")
         log.append(f"Observed baseline: {blank.observed_baseline.get():,} PSI")
         log.append(f"Project baseline: {baseline} PSI")
-        log.append("Integral PSI: sum of all pressure readings")
-        int_psi = sum(readings)
-        log.append(f"Integral PSI: {int_psi:,}")
-        log.append("Area over blank: limit PSI * # of readings - integral PSI")
-        area = limit_psi * len(readings) - int_psi
         log.append(
-            f"Area over blank: {limit_psi:,} " f"* {len(readings):,} - {int_psi:,}"
+            "Integral PSI: sum of all pressure readings, "
+            "each times the reading intervals it covers"
         )
+        log.append(f"Integral PSI: {int_psi:,}")
+        log.append("Area over blank: limit PSI * reading intervals - integral PSI")
+        area = round(limit_psi * intervals - int_psi)
+        log.append(f"Area over blank: {limit_psi:,} * {intervals:,.2f} - {int_psi:,}")
         log.append(f"Area over blank: {area:,}")
         areas_over_blanks.append(area)
         log.append("-" * 40)
@@ -112,17 +113,41 @@ def score(project: Project, log_widget: ScrolledText = None, *args) -> None:
         log.append(f"Considering data: {trial.pump_to_score.get()}")
         readings = trial.get_readings()
         log.append(f"Total readings: {len(readings):,} / {max_readings}")
+        intervals, int_psi = integrate(trial, interval_seconds)
+        log.append(f"Reading intervals covered: {intervals:,.2f} / {max_readings}")
         log.append(f"Observed baseline: {trial.observed_baseline.get():,} PSI")
         log.append(f"Project baseline: {baseline} PSI")
         # int psi
-        log.append("Integral PSI: sum of all pressure readings")
-        int_psi = sum(readings)
+        log.append(
+            "Integral PSI: sum of all pressure readings, "
+            "each times the reading intervals it covers"
+        )
         log.append(f"Integral PSI: {int_psi:,}")
         # failure region
-        fail_psi = (max_readings - len(readings)) * limit_psi
-        log.append(f"Failure PSI: (# max readings - # readings) * max PSI")
+        projected = trial.projected_fail_min.get()
+        if projected > 0 and len(readings) > 0:
+            # stopped early, so ramp up to the limit at the projected time
+            last_psi = min(readings[-1], limit_psi)
+            ramp = min(projected * 60 / interval_seconds, max_readings) - intervals
+            ramp = max(ramp, 0)
+            ramp_psi = ramp * (last_psi + limit_psi) / 2
+            log.append(f"Stopped early, projected to fail at {projected:.2f} min")
+            log.append(
+                "Ramp PSI: reading intervals until projected failure "
+                "* (last PSI + max PSI) / 2"
+            )
+            log.append(f"Ramp PSI: {ramp:,.2f} * ({last_psi:,} + {limit_psi:,}) / 2")
+            log.append(f"Ramp PSI: {round(ramp_psi):,}")
+        else:
+            ramp, ramp_psi = 0, 0
+        fail_psi = round(ramp_psi + max(max_readings - intervals - ramp, 0) * limit_psi)
+        log.append(
+            f"Failure PSI: ramp PSI + "
+            "(# max readings - reading intervals - ramp intervals) * max PSI"
+        )
         log.append(
-            f"Failure PSI: ({max_readings:,} - {len(readings):,}) * {limit_psi:,}"
+            f"Failure PSI: {round(ramp_psi):,} + "
+            f"({max_readings:,} - {intervals:,.2f} - {ramp:,.2f}) * {limit_psi:,}"
         )
         log.append(f"Failure PSI: {fail_psi}")
 
@@ -153,9 +178,25 @@ def score(project: Project, log_widget: ScrolledText = None, *args) -> None:
 
 def to_log(log: list[str], log_widget: ScrolledText) -> None:
     """Adds the passed log messages to the passed Text widget."""
+    if log_widget is None:  # eg. scoring without the GUI
+        return
+    import tkinter as tk  # only here, so that scoring itself doesn't need tkinter
+
     if isinstance(log_widget, tk.Text) and log_widget.winfo_exists():
         log_widget.configure(state="normal")
         log_widget.delete(1.0, "end")
         for msg in log:
             log_widget.insert("end", "".join((msg, "\n")))
         log_widget.configure(state="disabled")
+
+
+def integrate(test: Test, interval_seconds: float) -> Tuple[float, int]:
+    """Returns the reading intervals a Test covers, and its pressures integrated over them.
+
+    Each pressure is weighted by the number of intervals its reading stands for, so
+    tests taken with adaptive sampling score on the same scale as fixed ones.
+    """
+    weights = test.readings.weights(interval_seconds)
+    pressures = test.get_readings()
+    integral = sum(psi * weight for psi, weight in zip(pressures, weights))
+    return sum(weights), round(integral)
@@ -0,0 +1,82 @@
+"""Binds the data models' Values to tkinter variables, for the widgets that show them.
+
+::
+
+    ttk.Entry(self, textvariable=bind(self, project.customer))
+
+Each binding makes a tkinter variable that follows its Value both ways for as long
+as its owner widget exists, and is dropped when the owner is destroyed. Only the
+Values on screen cost a Tcl variable, and a Value set from a worker thread reaches
+its widgets through the UpdateBus, on the Tk thread.
+"""
+
+from __future__ import annotations
+
+import tkinter as tk
+from logging import getLogger
+from threading import get_ident
+from typing import TYPE_CHECKING
+
+from scalewiz.helpers.update_bus import UpdateBus
+from scalewiz.models.value import BooleanValue, DoubleValue, IntValue, StringValue
+
+if TYPE_CHECKING:
+    from typing import Dict, Type
+
+    from scalewiz.models.value import Value
+
+LOGGER = getLogger("scalewiz.tk_binding")
+
+# the kind of tkinter variable to show each kind of Value with
+VARIABLES: Dict[Type[Value], Type[tk.Variable]] = {
+    StringValue: tk.StringVar,
+    IntValue: tk.IntVar,
+    DoubleValue: tk.DoubleVar,
+    BooleanValue: tk.BooleanVar,
+}
+
+
+def bind(owner: tk.Misc, value: Value) -> tk.Variable:
+    """Returns a tkinter variable that follows a Value until `owner` is destroyed.
+
+    Must be called from the Tk thread. Whatever is typed into a widget is only set on
+    the Value once it can be converted to the Value's type, eg. a number for an
+    IntValue, so a half-typed entry never reaches the model.
+    """
+    variable = VARIABLES.get(type(value), tk.StringVar)(master=owner, value=value.get())
+    bus, tk_thread = UpdateBus.get(), get_ident()
+
+    def to_variable(*args) -> None:
+        # extra unused args are passed in by the trace
+        if get_ident() != tk_thread:
+            bus.post(variable.set, value.get())
+            return
+        try:
+            if variable.get() == value.get():  # eg. set from this variable
+                return
+        except tk.TclError:  # eg. a half-typed number
+            pass
+        variable.set(value.get())
+
+    def to_value(*args) -> None:
+        # extra unused args are passed in by tkinter
+        try:
+            typed = variable.get()
+        except tk.TclError:  # eg. a blank entry for a number
+            return
+        if typed != value.get():
+            try:
+                value.set(typed)
+            except ValueError as err:
+                LOGGER.debug("Didn't set %r from a widget: %s", value, err)
+
+    value_trace = value.trace_add("write", to_variable)
+    variable_trace = variable.trace_add("write", to_value)
+
+    def unbind(event: tk.Event) -> None:
+        if str(event.widget) == str(owner):  # and not one of its children
+            value.trace_remove("write", value_trace)
+            variable.trace_remove("write", variable_trace)
+
+    owner.bind("<Destroy>", unbind, add="+")
+    return variable
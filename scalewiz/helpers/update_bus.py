@@ -0,0 +1,95 @@
+"""Carries state changes from worker threads to the Tk thread, a frame at a time.
+
+Tk isn't thread-safe, and setting a tkinter variable or configuring a widget from a
+worker costs a round trip through the Tcl interpreter each time. Workers instead post
+their changes to the UpdateBus, and the Tk thread applies them all at once on a fixed
+frame interval. Only the latest value posted to each setter is applied, so the
+mainloop does the same amount of work per frame no matter how many systems are
+running or how short their reading intervals are.
+"""
+
+from __future__ import annotations
+
+from logging import getLogger
+from threading import Lock
+from typing import TYPE_CHECKING
+
+import scalewiz
+
+if TYPE_CHECKING:
+    from tkinter import Tk
+    from typing import Any, Callable, Dict, List, Tuple
+
+LOGGER = getLogger("scalewiz.update_bus")
+
+
+class UpdateBus:
+    """Coalesces updates posted from any thread, and applies them on the Tk thread.
+
+    Updates are keyed by the callable that applies them, eg. a tkinter variable's
+    `set` method, so there's nothing to subscribe to ahead of time.
+    """
+
+    FRAME_MS: int = 50  # how often the Tk thread applies the posted updates
+
+    _instance: UpdateBus = None
+    _instance_lock = Lock()
+
+    def __init__(self, root: Tk) -> None:
+        self.root = root
+        self.lock = Lock()
+        self.latest: Dict[Callable[[Any], None], Any] = {}
+        self.batches: Dict[Callable[[List[Any]], None], List[Any]] = {}
+        self.calls: List[Tuple[Callable, tuple]] = []
+        self.root.after(self.FRAME_MS, self.drain)
+
+    @classmethod
+    def get(cls) -> UpdateBus:
+        """Returns the application's bus, starting it if need be.
+
+        Must first be called from the Tk thread, after `scalewiz.ROOT` is set.
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(scalewiz.ROOT)
+            return cls._instance
+
+    def post(self, setter: Callable[[Any], None], value: Any) -> None:
+        """Has `setter(value)` called on the next frame, replacing any older value."""
+        with self.lock:
+            self.latest[setter] = value
+
+    def extend(self, consumer: Callable[[List[Any]], None], *items: Any) -> None:
+        """Has `consumer` passed a list of every item added this frame, in order.
+
+        For updates that can't be coalesced, like lines for a log.
+        """
+        with self.lock:
+            self.batches.setdefault(consumer, []).extend(items)
+
+    def call(self, func: Callable, *args) -> None:
+        """Has `func(*args)` called once on the next frame, after any updates."""
+        with self.lock:
+            self.calls.append((func, args))
+
+    def drain(self) -> None:
+        """Applies everything posted since the last frame. Runs on the Tk thread."""
+        with self.lock:
+            latest, self.latest = self.latest, {}
+            batches, self.batches = self.batches, {}
+            calls, self.calls = self.calls, []
+        for setter, value in latest.items():
+            self.apply(setter, value)
+        for consumer, items in batches.items():
+            self.apply(consumer, items)
+        for func, args in calls:
+            self.apply(func, *args)
+        self.root.after(self.FRAME_MS, self.drain)
+
+    def apply(self, func: Callable, *args) -> None:
+        """Calls a function, logging rather than raising any errors."""
+        try:
+            func(*args)
+        except Exception as err:  # pylint: disable=broad-except
+            # probably a widget that was destroyed, which mustn't stop the others
+            LOGGER.exception(err)
@@ -0,0 +1,534 @@
+"""Runs a test's uptake cycle and readings loop, independent of any UI.
+
+The TestHandler drives an Acquisition from the GUI, and the command line runner drives
+one headless. Nothing here may import tkinter or matplotlib.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from datetime import date
+from logging import DEBUG, FileHandler, Formatter
+from pathlib import Path
+from threading import Thread
+from time import perf_counter, time
+from typing import TYPE_CHECKING
+
+import scalewiz
+from scalewiz.helpers.latency import LatencySummary
+from scalewiz.helpers.metrics import PumpMetrics
+from scalewiz.helpers.scheduler import Scheduler
+from scalewiz.models.pump_worker import PumpWorker
+from scalewiz.models.reading import Reading, ReadingSeries
+from scalewiz.models.sampling import AdaptiveSampler, get_sampling_mode
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from typing import Callable, Dict, List, Optional, Sequence, Union
+
+    from py_hplc import NextGenPump
+
+    from scalewiz.models.journal import ReadingJournal
+    from scalewiz.models.prediction import FailurePredictor
+
+
+def wait_for(*futures: Future) -> None:
+    """Waits for the passed futures to finish, ignoring their errors.
+
+    The pump workers log their own errors.
+    """
+    wait(futures, timeout=PumpWorker.COMMAND_TIMEOUT)
+
+
+def open_pumps(
+    ports: Sequence[str], flowrate: float, logger: Logger, issues: List[str]
+) -> List[PumpWorker]:
+    """Connects to a pump on each port and sets their flowrates.
+
+    Appends a message to `issues` for each pump that couldn't be reached.
+    """
+    # every worker opens its port concurrently
+    pumps = [PumpWorker(port, logger) for port in ports]
+    for pump in pumps:
+        try:
+            pump.connected.result(timeout=PumpWorker.CONNECT_TIMEOUT)
+        except Exception:  # pylint: disable=broad-except
+            issues.append(f"Couldn't connect to {pump.port}")
+            continue
+        pump.set_flowrate(flowrate)  # queued ahead of anything else we send
+    logger.info("Set flowrates to %s", flowrate)
+    return pumps
+
+
+def close_pumps(*pumps: Optional[PumpWorker]) -> None:
+    """Stops the passed pumps and closes their ports."""
+    closing = []
+    for pump in pumps:
+        if pump is None:
+            continue
+        if pump.is_open:
+            pump.stop()
+            pump.logger.info("Stopped and closed the device @ %s", pump.port)
+        closing.append(pump.close())  # also lets the worker thread exit
+    wait_for(*closing)
+
+
+def reopen(pump: PumpWorker) -> PumpWorker:
+    """Gives up on a pump's worker, and returns a new one connected to its port.
+
+    Raises:
+        Exception: whatever kept the port from opening again
+    """
+    pump.abort()
+    worker = PumpWorker(pump.port, pump.logger)
+    try:
+        worker.connected.result(timeout=PumpWorker.CONNECT_TIMEOUT)
+    except Exception:
+        worker.close()
+        raise
+    return worker
+
+
+def make_log_handler(project_path: Union[str, Path], test_name: str) -> FileHandler:
+    """Returns a FileHandler for a new log file in the project's `logs` directory."""
+    id = "".join(char for char in test_name if char.isalnum())
+    log_file = f"{time():.0f}_{id}_{date.today()}.txt"
+    logs_dir = Path(project_path).parent.resolve().joinpath("logs")
+    logs_dir.mkdir(exist_ok=True)
+    handler = FileHandler(logs_dir.joinpath(log_file).resolve())
+    handler.setFormatter(
+        Formatter(
+            "%(asctime)s - %(thread)d - %(levelname)s - %(message)s",
+            "%Y-%m-%d %H:%M:%S",
+        )
+    )
+    handler.setLevel(DEBUG)
+    return handler
+
+
+class Acquisition:
+    """Collects Readings from a system's pumps until a limit is reached or it's stopped.
+
+    Progress is reported through the `on_uptake` and `on_reading` callbacks, which are
+    called from whichever thread or event loop is running the acquisition.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        pumps: Sequence[PumpWorker],
+        interval: float,
+        uptake: float,
+        limit_minutes: float,
+        limit_psi: int,
+        logger: Logger,
+        readings: ReadingSeries = None,
+    ) -> None:
+        """Initializes an Acquisition.
+
+        Args:
+            pumps (Sequence[PumpWorker]): the system's pumps, already connected
+            interval (float): seconds between readings
+            uptake (float): seconds to run the pumps before collecting readings
+            limit_minutes (float): the test's time limit
+            limit_psi (int): the test stops once every pump reaches this pressure
+            logger (Logger): the system's logger
+            readings (ReadingSeries, optional): a series to collect readings into.
+                Defaults to a new one.
+        """
+        self.pumps: List[PumpWorker] = list(pumps)
+        self.interval = interval
+        self.uptake = uptake
+        self.limit_minutes = limit_minutes
+        self.limit_psi = limit_psi
+        self.logger = logger
+        if readings is None:
+            readings = ReadingSeries(width=len(self.pumps))
+        self.readings = readings
+        self.max_readings: int = round(limit_minutes * 60 / interval)
+        self.max_psi: List[int] = [0] * len(self.pumps)  # by pump
+        self.elapsed_min: float = 0.0
+        self.stop_requested: bool = False
+        self.issues: List[str] = []  # problems that kept the acquisition from running
+        self.scheduler: Scheduler = None  # paces the readings loop
+        self.sampler: AdaptiveSampler = None  # if set, picks each reading's interval
+        if get_sampling_mode() == "adaptive":
+            self.sampler = AdaptiveSampler.from_config(
+                interval, limit_minutes, self.max_readings
+            )
+        self.on_uptake: Callable[[int], None] = None  # passed the % of uptake done
+        self.on_reading: Callable[[Reading], None] = None
+        self.journal: ReadingJournal = None  # if set, each reading is written to it
+        self.predictor: FailurePredictor = None  # if set, projects when it will fail
+        self.stop_early: bool = bool(scalewiz.CONFIG["prediction"]["stop_early"])
+        self.projected_fail_min: float = 0.0  # set if the test was stopped early
+        # a read that takes too long is skipped, rather than holding up the loop
+        settings = scalewiz.CONFIG["acquisition"]
+        self.read_timeout = max(float(settings["read_timeout"]), 0.1)
+        self.read_retries = max(int(settings["read_retries"]), 0)
+        self.stalls_to_reconnect = max(int(settings["stalls_to_reconnect"]), 1)
+        self.gaps: List[float] = []  # when readings were skipped, in elapsed minutes
+        # missed reads in a row, by pump number
+        self.stalls: Dict[int, int] = {n: 0 for n in range(1, len(self.pumps) + 1)}
+        self.reconnecting: Dict[int, Future] = {}  # resolve to new workers, by pump
+        # replaces a stalled pump's worker with a new one, or raises
+        self.reconnect: Callable[[PumpWorker], PumpWorker] = reopen
+        # how long reads take is summarized in the log, rather than logged every time
+        settings = scalewiz.CONFIG["logging"]
+        self.latency_period = float(settings["latency_summary_seconds"])
+        self.latency_sample_every = int(settings["latency_sample_every"])
+        self.read_latency: Dict[str, LatencySummary] = {}  # by port
+        self.tick_latency = self.make_latency_summary("Reading every pump")
+
+    @property
+    def can_run(self) -> bool:
+        """Returns a bool indicating whether or not the test can keep running."""
+        return (
+            any(psi < self.limit_psi for psi in self.max_psi)
+            and self.elapsed_min < self.limit_minutes
+            and len(self.readings) < self.max_readings
+            and not self.stop_requested
+        )
+
+    def request_stop(self) -> None:
+        """Asks the acquisition to stop at its next tick."""
+        self.stop_requested = True
+
+    def start_uptake(self) -> Optional[Scheduler]:
+        """Starts the pumps, returning a Scheduler for the 100 uptake steps if any."""
+        self.logger.info("Starting an uptake cycle")
+        wait_for(*(pump.run() for pump in self.pumps))
+        step = self.uptake / 100  # we will sleep for 100 steps
+        if step > 0:
+            scheduler = Scheduler(step)
+            scheduler.start()
+            return scheduler
+        return None
+
+    def start_readings(self) -> None:
+        """Starts the clock for the readings loop."""
+        self.logger.info("Starting readings collection")
+        self.scheduler = Scheduler(self.interval)
+        self.scheduler.start()
+
+    def run(self) -> bool:
+        """Runs the uptake cycle and then collects readings on the calling thread.
+
+        Returns:
+            bool: False if the test was stopped during the uptake cycle, else True
+        """
+        scheduler = self.start_uptake()
+        if scheduler is not None:
+            for i in range(100):
+                if not self.can_run:
+                    return False
+                self.report_uptake(i)
+                scheduler.wait()
+
+        self.start_readings()
+        while self.can_run:
+            self.elapsed_min = self.scheduler.elapsed_min
+            t0 = perf_counter()
+            deadline = t0 + self.get_read_timeout()
+            # every read is queued before waiting on any, so they overlap
+            futures = [self.submit_read(n) for n in self.numbers]
+            pressures = [
+                self.collect_read(n, future, deadline)
+                for n, future in zip(self.numbers, futures)
+            ]
+            self.tick_latency.add(perf_counter() - t0)
+            self.take_reading(pressures)
+            self.adapt_interval()
+            # deadlines are fixed from the start, so a slow read can't cause drift
+            missed = self.scheduler.missed
+            self.scheduler.wait(lambda: self.stop_requested)
+            self.check_missed(missed)
+        self.finish_reconnects()
+        self.log_summaries()
+        return True
+
+    async def run_async(self) -> bool:
+        """Like `run`, but as a coroutine for the AcquisitionEngine's event loop."""
+        loop = asyncio.get_running_loop()
+        scheduler = await loop.run_in_executor(None, self.start_uptake)
+        if scheduler is not None:
+            for i in range(100):
+                if not self.can_run:
+                    return False
+                self.report_uptake(i)
+                await scheduler.wait_async()
+
+        self.start_readings()
+        while self.can_run:
+            self.elapsed_min = self.scheduler.elapsed_min
+            t0 = perf_counter()
+            deadline = t0 + self.get_read_timeout()
+            # every pump is queried concurrently by its own worker
+            pressures = await asyncio.gather(
+                *(
+                    self.collect_read_async(n, self.submit_read(n), deadline)
+                    for n in self.numbers
+                )
+            )
+            self.tick_latency.add(perf_counter() - t0)
+            self.take_reading(pressures)
+            self.adapt_interval()
+            missed = self.scheduler.missed
+            await self.scheduler.wait_async(lambda: self.stop_requested)
+            self.check_missed(missed)
+        await loop.run_in_executor(None, self.finish_reconnects)
+        self.log_summaries()
+        return True
+
+    def get_read_timeout(self) -> float:
+        """Returns how long this tick's reads may take, in seconds.
+
+        Some of the slot is left for recording the reading, so that a pump that never
+        answers can't make the loop miss its next deadline.
+        """
+        return min(self.read_timeout, 0.8 * self.scheduler.interval)
+
+    @property
+    def numbers(self) -> range:
+        """Returns the number of each pump, starting from 1."""
+        return range(1, len(self.pumps) + 1)
+
+    def get_pump(self, number: int) -> PumpWorker:
+        """Returns the worker of a pump by its number, starting from 1."""
+        return self.pumps[number - 1]
+
+    def submit_read(self, number: int) -> Optional[Future]:
+        """Queues a pressure read, unless the pump is being reconnected."""
+        if number in self.reconnecting:
+            return None
+        return self.get_pump(number).submit(self.get_pressure)
+
+    def collect_read(
+        self, number: int, future: Optional[Future], deadline: float
+    ) -> Optional[Union[float, int]]:
+        """Waits until the deadline for a read, retrying it if it fails.
+
+        Returns:
+            Optional[Union[float, int]]: the pressure, or None if there wasn't one
+        """
+        retries = self.read_retries
+        while future is not None:
+            try:
+                return future.result(timeout=max(deadline - perf_counter(), 0))
+            except FutureTimeoutError:
+                self.report_timeout(number, future)
+                return None
+            except Exception:  # pylint: disable=broad-except
+                # the worker has already logged it
+                if retries <= 0 or perf_counter() >= deadline:
+                    return None
+                retries -= 1
+                future = self.submit_read(number)
+        return None
+
+    async def collect_read_async(
+        self, number: int, future: Optional[Future], deadline: float
+    ) -> Optional[Union[float, int]]:
+        """Like `collect_read`, but as a coroutine."""
+        retries = self.read_retries
+        while future is not None:
+            try:
+                return await asyncio.wait_for(
+                    asyncio.wrap_future(future), max(deadline - perf_counter(), 0)
+                )
+            except asyncio.TimeoutError:
+                self.report_timeout(number, future)
+                return None
+            except Exception:  # pylint: disable=broad-except
+                if retries <= 0 or perf_counter() >= deadline:
+                    return None
+                retries -= 1
+                future = self.submit_read(number)
+        return None
+
+    def report_timeout(self, number: int, future: Future) -> None:
+        """Logs a read that didn't finish in time, dropping it if it hasn't started."""
+        future.cancel()  # so that reads can't pile up behind a hung one
+        self.logger.warning(
+            "Pump %s on %s didn't answer within %.2f s",
+            number,
+            self.get_pump(number).port,
+            self.get_read_timeout(),
+        )
+
+    def take_reading(
+        self, pressures: Sequence[Optional[Union[float, int]]]
+    ) -> Optional[Reading]:
+        """Records a Reading, or a gap if any pump didn't answer.
+
+        A pump that misses `stalls_to_reconnect` reads in a row is reconnected in the
+        background, and isn't read from until it's back.
+        """
+        for number, psi in zip(self.numbers, pressures):
+            if psi is not None:
+                self.stalls[number] = 0
+                continue
+            self.stalls[number] += 1
+            if (
+                self.stalls[number] >= self.stalls_to_reconnect
+                and number not in self.reconnecting
+            ):
+                self.start_reconnect(number)
+        self.check_reconnects()
+        if all(psi is not None for psi in pressures):
+            return self.add_reading(pressures)
+        # the reading before the gap covers it when the test is scored
+        self.gaps.append(self.elapsed_min)
+        self.logger.warning(
+            "Skipped the reading at %.2f min (%s in total), no answer from pump %s",
+            self.elapsed_min,
+            len(self.gaps),
+            " or ".join(
+                str(n) for n, psi in zip(self.numbers, pressures) if psi is None
+            ),
+        )
+        return None
+
+    def start_reconnect(self, number: int) -> None:
+        """Starts reconnecting to a pump on another thread."""
+        pump = self.get_pump(number)
+        self.logger.warning(
+            "Pump %s on %s missed %s reads in a row, reconnecting",
+            number,
+            pump.port,
+            self.stalls[number],
+        )
+        future = Future()
+
+        def reconnect() -> None:
+            try:
+                future.set_result(self.reconnect(pump))
+            except Exception as err:  # pylint: disable=broad-except
+                future.set_exception(err)
+
+        Thread(target=reconnect, name=f"reconnect-{pump.port}", daemon=True).start()
+        self.reconnecting[number] = future
+
+    def check_reconnects(self) -> None:
+        """Swaps in the workers of pumps that have finished reconnecting."""
+        for number, future in list(self.reconnecting.items()):
+            if not future.done():
+                continue
+            del self.reconnecting[number]
+            self.stalls[number] = 0  # a failed attempt is tried again after as many
+            try:
+                pump = future.result()
+            except Exception as err:  # pylint: disable=broad-except
+                self.logger.error("Couldn't reconnect to pump %s: %s", number, err)
+                continue
+            self.pumps[number - 1] = pump
+            pump.run()  # in case it lost track while it wasn't answering
+            self.logger.info("Reconnected to pump %s on %s", number, pump.port)
+
+    def finish_reconnects(self) -> None:
+        """Waits for any reconnects to finish, so their pumps can be closed."""
+        wait(list(self.reconnecting.values()), timeout=PumpWorker.CONNECT_TIMEOUT)
+        self.check_reconnects()
+
+    def get_pressure(self, pump: NextGenPump) -> Union[float, int]:
+        """Returns a pressure reading from the passed pump."""
+        t0 = perf_counter()
+        psi = pump.pressure
+        seconds = perf_counter() - t0
+        port = pump.serial.name
+        if port not in self.read_latency:
+            summary = self.make_latency_summary(f"Reading from {port}")
+            self.read_latency.setdefault(port, summary)
+        self.read_latency[port].add(seconds)
+        return psi
+
+    def make_latency_summary(self, label: str) -> LatencySummary:
+        """Returns a LatencySummary for this acquisition's logger, as configured."""
+        return LatencySummary(
+            label, self.logger, self.latency_period, self.latency_sample_every
+        )
+
+    def log_summaries(self) -> None:
+        """Logs how well the readings were kept to schedule, and how long they took."""
+        self.logger.info("Readings schedule: %s", self.scheduler.summary())
+        self.tick_latency.flush()
+        for summary in list(self.read_latency.values()):
+            summary.flush()
+
+    def report_uptake(self, i: int) -> None:
+        """Passes progress through the uptake cycle to the callback, if any."""
+        if self.on_uptake is not None:
+            self.on_uptake(i)
+
+    def add_reading(self, pressures: Sequence[Union[float, int]]) -> Reading:
+        """Records a Reading of each pump's pressure at the current elapsed time."""
+        reading = Reading(elapsedMin=self.elapsed_min, pressures=tuple(pressures))
+        self.readings.append(reading)
+        if self.journal is not None:
+            try:
+                self.journal.submit(reading)  # off this thread, or the event loop
+            except (OSError, ValueError) as err:
+                self.logger.warning("Stopped journaling readings: %s", err)
+                self.journal = None
+        for i, psi in enumerate(reading.pressures):
+            if psi > self.max_psi[i]:
+                self.max_psi[i] = psi
+        if self.on_reading is not None:
+            self.on_reading(reading)
+        self.predict_failure(reading)
+        return reading
+
+    def predict_failure(self, reading: Reading) -> None:
+        """Feeds the predictor, if any, stopping the test if it's certain to fail."""
+        if self.predictor is None or self.projected_fail_min > 0:
+            return
+        if not self.predictor.add(reading):
+            return
+        projected, latest = self.predictor.projected_min, self.predictor.latest_min
+        if not self.stop_early:
+            self.logger.info(
+                "Projected to reach %s psi at %.2f min (by %.2f min at the latest), "
+                "but stopping early is off",
+                self.limit_psi,
+                projected,
+                latest,
+            )
+            self.predictor = None  # once is enough
+            return
+        self.logger.warning(
+            "Stopping early after %.2f min, projected to reach %s psi at %.2f min "
+            "(by %.2f min at the latest)",
+            reading.elapsedMin,
+            self.limit_psi,
+            projected,
+            latest,
+        )
+        self.projected_fail_min = max(projected, reading.elapsedMin)
+        self.request_stop()
+
+    def adapt_interval(self) -> None:
+        """Lets the sampler, if any, set the interval until the next reading."""
+        if self.sampler is None:
+            return
+        interval = self.sampler.next_interval(self.readings)
+        if abs(interval - self.scheduler.interval) > 1e-3:
+            self.logger.debug(
+                "Reading every %.2f s after %.2f min", interval, self.elapsed_min
+            )
+            self.scheduler.interval = interval
+
+    def check_missed(self, missed: int) -> None:
+        """Logs a warning if the scheduler has missed slots since the passed count."""
+        if self.scheduler.missed > missed:
+            # eg. "System 1", from the logger "scalewiz.System 1"
+            system = self.logger.name.rpartition(".")[2]
+            PumpMetrics.get().add_missed(system, self.scheduler.missed - missed)
+            self.logger.warning(
+                "Missed %s reading slot(s) after %.2f min",
+                self.scheduler.missed - missed,
+                self.elapsed_min,
+            )
@@ -0,0 +1,217 @@
+"""Runs an Acquisition in its own process, so that its timing is isolated from the UI.
+
+The child process opens the pumps and runs the readings loop, writing each Reading to a
+ReadingRing in shared memory. The parent polls the ring and replays the readings into
+its own Acquisition state, which the GUI plots, reports, and saves as usual. Log
+records from the child are forwarded to the parent's logger over a queue.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from logging import getLogger
+from logging.handlers import QueueHandler, QueueListener
+from multiprocessing import get_context
+from threading import Thread
+from time import sleep
+from typing import TYPE_CHECKING
+
+from scalewiz.models.acquisition import Acquisition, close_pumps, open_pumps
+from scalewiz.models.reading_ring import DONE, FAILED, READING, UPTAKE, ReadingRing
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from multiprocessing.queues import Queue, SimpleQueue
+    from multiprocessing.synchronize import Event
+    from typing import List, Sequence
+
+    from scalewiz.models.reading import Reading, ReadingSeries
+
+
+class ProcessAcquisition(Acquisition):
+    """An Acquisition whose pumps and readings loop live in a child process.
+
+    The pumps are opened by the child, so the ports must not be open in this process.
+    """
+
+    POLL_SECONDS: float = 0.05  # how often the ring is checked for new readings
+    RING_SLOTS: int = 1024  # readings the child can get ahead of the parent by
+    JOIN_SECONDS: float = 10  # how long a child that's asked to stop is waited for
+
+    def __init__(
+        self,
+        ports: Sequence[str],
+        flowrate: float,
+        interval: float,
+        uptake: float,
+        limit_minutes: float,
+        limit_psi: int,
+        logger: Logger,
+        readings: ReadingSeries = None,
+    ) -> None:
+        """Initializes a ProcessAcquisition.
+
+        Args:
+            ports (Sequence[str]): the port of each pump
+            flowrate (float): the flowrate to set on the pumps, in mL/min
+            interval (float): seconds between readings
+            uptake (float): seconds to run the pumps before collecting readings
+            limit_minutes (float): the test's time limit
+            limit_psi (int): the test stops once every pump reaches this pressure
+            logger (Logger): the system's logger
+            readings (ReadingSeries, optional): a series to collect readings into.
+                Defaults to a new one.
+        """
+        # the pumps only exist in the child, but there's a place for each of them
+        pumps = [None] * len(ports)
+        super().__init__(
+            pumps, interval, uptake, limit_minutes, limit_psi, logger, readings
+        )
+        self.ports = tuple(ports)
+        self.flowrate = flowrate
+        # spawn rather than fork, which isn't safe with Tk and our threads running
+        self.context = get_context("spawn")
+        self.stop_event: Event = self.context.Event()
+
+    def request_stop(self) -> None:
+        """Asks the child process to stop at its next tick."""
+        super().request_stop()
+        self.stop_event.set()
+
+    def run(self) -> bool:
+        """Starts the child process and collects its readings until it exits.
+
+        Returns:
+            bool: False if the test was stopped or failed before taking readings
+        """
+        ring = ReadingRing(self.RING_SLOTS, width=len(self.ports))
+        log_queue: Queue = self.context.Queue()
+        issues: SimpleQueue = self.context.SimpleQueue()
+        gaps: SimpleQueue = self.context.SimpleQueue()
+        settings = {
+            "interval": self.interval,
+            "uptake": self.uptake,
+            "limit_minutes": self.limit_minutes,
+            "limit_psi": self.limit_psi,
+        }
+        process = self.context.Process(
+            target=acquire,
+            args=(
+                self.logger.name,
+                self.logger.getEffectiveLevel(),
+                self.ports,
+                self.flowrate,
+                settings,
+                ring.name,
+                ring.capacity,
+                self.stop_event,
+                log_queue,
+                issues,
+                gaps,
+            ),
+            name=f"acquisition-{self.logger.name}",
+            daemon=True,
+        )
+        # a Logger has a handle method too, so the records are dispatched as if they
+        # had been logged here
+        listener = QueueListener(log_queue, self.logger)
+        try:
+            listener.start()
+            try:
+                process.start()
+                self.logger.info("Started acquisition process %s", process.pid)
+                while process.is_alive():
+                    self.poll(ring)
+                    sleep(self.POLL_SECONDS)
+                process.join()
+                self.poll(ring)
+                if process.exitcode != 0:
+                    self.logger.error(
+                        "The acquisition process exited with code %s", process.exitcode
+                    )
+                completed = bool(ring.get("completed")) or ring.get("count") > 0
+            finally:
+                if process.is_alive():  # eg. replaying its readings failed
+                    self.stop_event.set()
+                    process.join(self.JOIN_SECONDS)
+                    if process.is_alive():
+                        process.terminate()
+                listener.stop()
+        finally:
+            ring.close()
+        while not issues.empty():
+            self.issues.append(issues.get())
+        while not gaps.empty():
+            self.gaps.extend(gaps.get())
+        return completed
+
+    async def run_async(self) -> bool:
+        """Like `run`, but awaits the child process from an event loop."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.run)
+
+    def poll(self, ring: ReadingRing) -> None:
+        """Replays any new readings from the ring, and reports uptake progress."""
+        if ring.get("state") == UPTAKE:
+            self.report_uptake(ring.get("uptake"))
+        readings, lost = ring.read_new()
+        if lost > 0:
+            self.logger.warning("Lost %s readings from the acquisition process", lost)
+        for reading in readings:
+            self.elapsed_min = reading.elapsedMin
+            self.add_reading(reading.pressures)
+
+
+def acquire(
+    name: str,
+    level: int,
+    ports: Sequence[str],
+    flowrate: float,
+    settings: dict,
+    ring_name: str,
+    capacity: int,
+    stop_event: Event,
+    log_queue: Queue,
+    issues: SimpleQueue,
+    gaps: SimpleQueue,
+) -> None:
+    """The child process's entry point. Runs an Acquisition into a ReadingRing."""
+    logger = getLogger(name)
+    logger.setLevel(level)  # don't send anything the parent would drop
+    logger.addHandler(QueueHandler(log_queue))
+    logger.propagate = False  # the parent decides where these end up
+    ring = ReadingRing(capacity, ring_name, len(ports))
+    found: List[str] = []
+    pumps = open_pumps(ports, flowrate, logger, found)
+    acquisition = None
+    try:
+        if found:
+            for issue in found:
+                issues.put(issue)
+            ring.set("state", FAILED)
+            return
+        acquisition = Acquisition(pumps, logger=logger, **settings)
+
+        def on_uptake(i: int) -> None:
+            ring.set("uptake", i)
+            ring.set("state", UPTAKE)
+
+        def on_reading(reading: Reading) -> None:
+            ring.set("state", READING)
+            ring.append(reading)
+
+        def watch_stop() -> None:
+            stop_event.wait()
+            acquisition.request_stop()
+
+        acquisition.on_uptake = on_uptake
+        acquisition.on_reading = on_reading
+        Thread(target=watch_stop, daemon=True).start()
+        completed = acquisition.run()
+        gaps.put(acquisition.gaps)
+        ring.set("completed", int(completed))
+        ring.set("state", DONE)
+    finally:
+        if acquisition is not None:  # any pump may have been reconnected
+            pumps = acquisition.pumps
+        close_pumps(*pumps)
+        ring.close()
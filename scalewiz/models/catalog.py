@@ -0,0 +1,336 @@
+"""A local SQLite catalog of every project file under a data root, for searching.
+
+Projects are standalone JSON files, usually spread over a shared folder. The catalog
+keeps a row for each project and each of its tests, so they can be searched without
+opening every file, eg. for every test of a chemical at 10 ppm or less in a field.
+
+Updating the catalog only stats the files under the root. A file is only read again
+if its size or modification time changed, and files that are gone are dropped, so an
+update of an unchanged tree takes about as long as listing it. Readings are never
+parsed, except to find the max psi of tests saved by versions that didn't store it.
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+from contextlib import closing
+from logging import getLogger
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import scalewiz
+from scalewiz.helpers.configuration import CONFIG_DIR
+from scalewiz.models.project import parse_project
+from scalewiz.models.test import Test
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+LOGGER = getLogger("scalewiz.catalog")
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    file_id INTEGER PRIMARY KEY REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT,
+    customer TEXT,
+    client TEXT,
+    field TEXT,
+    sample TEXT,
+    sample_date TEXT,
+    received_date TEXT,
+    completed_date TEXT,
+    analyst TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    name TEXT,
+    label TEXT,
+    chemical TEXT,
+    rate REAL,
+    is_blank INTEGER,
+    result REAL,
+    max_psi INTEGER,
+    include_on_report INTEGER
+);
+CREATE INDEX IF NOT EXISTS tests_by_file ON tests(file_id);
+CREATE INDEX IF NOT EXISTS tests_by_chemical ON tests(chemical COLLATE NOCASE, rate);
+CREATE INDEX IF NOT EXISTS projects_by_field ON projects(field COLLATE NOCASE);
+"""
+# info keys in a project file, by column
+PROJECT_COLUMNS = {
+    "name": "name",
+    "customer": "customer",
+    "client": "productionCo",
+    "field": "field",
+    "sample": "sample",
+    "sample_date": "sampleDate",
+    "received_date": "recDate",
+    "completed_date": "compDate",
+    "analyst": "analyst",
+}
+# the columns of each search result
+RESULT_COLUMNS = (
+    "path",
+    "project",
+    "customer",
+    "client",
+    "field",
+    "sample",
+    "sample_date",
+    "received_date",
+    "completed_date",
+    "test",
+    "chemical",
+    "rate",
+    "is_blank",
+    "result",
+    "max_psi",
+)
+
+
+def like(text: str) -> str:
+    """Returns a LIKE pattern matching any text that contains `text`."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class Catalog:
+    """A SQLite catalog of the projects under a root folder.
+
+    Every method opens a connection of its own, so a Catalog can be updated on one
+    thread while it's searched on another.
+    """
+
+    def __init__(self, path: Union[str, Path], root: Union[str, Path] = "") -> None:
+        """Initializes a Catalog, making its database if need be.
+
+        Args:
+            path (Union[str, Path]): the SQLite database file
+            root (Union[str, Path], optional): the folder to index. Defaults to "",
+                which can only be searched.
+        """
+        self.path = Path(path)
+        self.root = Path(root).resolve() if root else None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self.connect()) as connection, connection:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                # it's only an index, so an old one is rebuilt rather than migrated
+                for table in ("tests", "projects", "files"):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls) -> Catalog:
+        """Returns the Catalog set in the config's `catalog` table."""
+        settings = scalewiz.CONFIG["catalog"]
+        path = str(settings["database"]) or Path(CONFIG_DIR, "catalog.sqlite3")
+        return cls(path, str(settings["root"]))
+
+    def connect(self) -> sqlite3.Connection:
+        """Returns a new connection to the database."""
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA foreign_keys = ON")
+        # so that searches aren't held up by an update, and vice versa
+        connection.execute("PRAGMA journal_mode = WAL")
+        # it's only an index, so it needn't be synced after every file
+        connection.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    def update(self) -> Tuple[int, int]:
+        """Indexes the project files under the root that changed since last time.
+
+        Returns:
+            Tuple[int, int]: the number of files read, and of files dropped
+
+        Raises:
+            OSError: if the root isn't a folder
+            sqlite3.Error: if the database couldn't be written
+        """
+        if self.root is None:
+            raise NotADirectoryError("No folder to index, see catalog.root")
+        if not self.root.is_dir():
+            raise NotADirectoryError(f"Can't index {self.root}, it isn't a folder")
+        read, dropped = 0, 0
+        with closing(self.connect()) as connection:
+            known: Dict[str, Tuple[int, int, int]] = {
+                row["path"]: (row["id"], row["mtime_ns"], row["size"])
+                for row in connection.execute("SELECT * FROM files")
+            }
+            for path, stat in find_projects(self.root):
+                key = str(path)
+                file_id, mtime_ns, size = known.pop(key, (None, None, None))
+                if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                    continue
+                with connection:  # a transaction per file, kept if the update stops
+                    if file_id is not None:
+                        connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    index_file(connection, path, stat)
+                read += 1
+            with connection:
+                for file_id, _, _ in known.values():  # deleted, or moved
+                    connection.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    dropped += 1
+        LOGGER.info(
+            "Updated the catalog of %s: read %s files, dropped %s",
+            self.root,
+            read,
+            dropped,
+        )
+        return read, dropped
+
+    def search(
+        self,
+        chemical: str = "",
+        field: str = "",
+        customer: str = "",
+        sample: str = "",
+        min_rate: Optional[float] = None,
+        max_rate: Optional[float] = None,
+        blank: Optional[bool] = None,
+        limit: int = 1000,
+    ) -> List[Dict[str, Union[float, int, str]]]:
+        """Returns the tests that match every filter passed, with their projects.
+
+        Text filters match any text containing them, ignoring case. `customer`
+        matches either the customer or the production company.
+
+        Args:
+            chemical (str, optional): eg. "ABC". Defaults to "".
+            field (str, optional): the project's field. Defaults to "".
+            customer (str, optional): the project's customer. Defaults to "".
+            sample (str, optional): the project's sample. Defaults to "".
+            min_rate (Optional[float], optional): the lowest rate, in ppm.
+                Defaults to None.
+            max_rate (Optional[float], optional): the highest rate, in ppm.
+                Defaults to None.
+            blank (Optional[bool], optional): True for only blanks, False for only
+                trials, or None for both. Defaults to None.
+            limit (int, optional): the most tests to return. Defaults to 1000.
+
+        Returns:
+            List[Dict[str, Union[float, int, str]]]: a dict of RESULT_COLUMNS for
+                each test, sorted by project then test
+        """
+        conditions, params = [], []
+        for column, text in (
+            ("tests.chemical", chemical),
+            ("projects.field", field),
+            ("projects.sample", sample),
+        ):
+            if text:
+                conditions.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(like(text))
+        if customer:
+            conditions.append(
+                "(projects.customer LIKE ? ESCAPE '\\' "
+                "OR projects.client LIKE ? ESCAPE '\\')"
+            )
+            params.extend((like(customer), like(customer)))
+        if min_rate is not None:
+            conditions.append("tests.rate >= ?")
+            params.append(min_rate)
+        if max_rate is not None:
+            conditions.append("tests.rate <= ?")
+            params.append(max_rate)
+        if blank is not None:
+            conditions.append("tests.is_blank = ?")
+            params.append(int(blank))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT files.path, projects.name AS project, projects.customer,
+                projects.client, projects.field, projects.sample,
+                projects.sample_date, projects.received_date,
+                projects.completed_date, tests.name AS test, tests.chemical,
+                tests.rate, tests.is_blank, tests.result, tests.max_psi
+            FROM tests
+            JOIN projects ON projects.file_id = tests.file_id
+            JOIN files ON files.id = tests.file_id
+            {where}
+            ORDER BY projects.name COLLATE NOCASE, files.path, tests.is_blank DESC,
+                tests.chemical COLLATE NOCASE, tests.rate
+            LIMIT ?
+        """  # the filters are only ever passed as parameters
+        with closing(self.connect()) as connection:
+            rows = connection.execute(query, (*params, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+def find_projects(root: Path) -> Iterator[Tuple[Path, os.stat_result]]:
+    """Yields the path and stat of each JSON file under a folder."""
+    folders = [root]
+    while folders:
+        folder = folders.pop()
+        try:
+            entries = list(os.scandir(folder))
+        except OSError as err:  # eg. a folder that isn't shared with this user
+            LOGGER.debug("Skipped %s: %s", folder, err)
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(Path(entry.path))
+                elif entry.name.lower().endswith(".json"):
+                    yield Path(entry.path), entry.stat()
+            except OSError as err:  # eg. deleted since it was listed
+                LOGGER.debug("Skipped %s: %s", entry.path, err)
+
+
+def index_file(
+    connection: sqlite3.Connection, path: Path, stat: os.stat_result
+) -> None:
+    """Adds a file to the catalog, with its project and tests if it's a project."""
+    file_id = connection.execute(
+        "INSERT INTO files (path, mtime_ns, size) VALUES (?, ?, ?)",
+        (str(path), stat.st_mtime_ns, stat.st_size),
+    ).lastrowid
+    # files that aren't projects are still kept, so they aren't read again
+    try:
+        with path.open("r") as file:
+            obj, _ = parse_project(file.read())
+        info = obj["info"]
+        entries = obj["tests"]
+    except (OSError, ValueError, KeyError, TypeError) as err:
+        LOGGER.debug("%s isn't a project file: %s", path, err)
+        return
+    connection.execute(
+        f"INSERT INTO projects (file_id, {', '.join(PROJECT_COLUMNS)}) "
+        f"VALUES (?{', ?' * len(PROJECT_COLUMNS)})",
+        (file_id, *(str(info.get(key, "")) for key in PROJECT_COLUMNS.values())),
+    )
+    name = obj.get("readingsFile")
+    sidecar = path.with_name(name) if name else None
+    for entry in entries:
+        try:
+            test = Test(data=entry, sidecar=sidecar)
+            if not test.summarized:  # saved before maxPsi was, so read it
+                test.readings  # pylint: disable=pointless-statement
+        except (ValueError, KeyError, TypeError) as err:
+            LOGGER.debug("Skipped a test in %s: %s", path, err)
+            continue
+        connection.execute(
+            "INSERT INTO tests (file_id, name, label, chemical, rate, is_blank, "
+            "result, max_psi, include_on_report) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                file_id,
+                test.name.get(),
+                test.label.get(),
+                test.chemical.get(),
+                test.rate.get(),
+                test.is_blank.get(),
+                test.result.get(),
+                test.max_psi.get(),
+                test.include_on_report.get(),
+            ),
+        )
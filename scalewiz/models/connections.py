@@ -0,0 +1,189 @@
+"""Keeps a system's pumps connected between tests and rinses.
+
+Opening a port and reading a pump's details takes a few hundred milliseconds per
+pump, and is the step most likely to fail on a flaky USB hub. PumpConnections keeps
+the PumpWorkers for a system's selected ports open while the system is idle, checks on
+any that haven't been used in a while, and only opens a port again once its pump has
+stopped answering. Pumps handed out for a test or rinse are leased until they're
+released, and are never checked while leased.
+"""
+
+from __future__ import annotations
+
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import TYPE_CHECKING
+
+import scalewiz
+from scalewiz.models.acquisition import close_pumps, reopen
+from scalewiz.models.pump_worker import PumpWorker
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from logging import Logger
+    from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+
+class PumpConnections:
+    """The open PumpWorkers for a system, by port."""
+
+    def __init__(self, logger: Logger, ping_seconds: float = 30.0) -> None:
+        """Initializes PumpConnections.
+
+        Args:
+            logger (Logger): the system's logger
+            ping_seconds (float, optional): how long an open pump may go without a
+                command before it is checked with a pressure read. Defaults to 30.0.
+        """
+        self.logger = logger
+        self.ping_seconds = max(ping_seconds, 1.0)
+        self.lock = Lock()
+        self.workers: Dict[str, PumpWorker] = {}
+        self.leased: Set[str] = set()  # the ports of the pumps in use
+        self.pinger: Thread = None  # started with the first connection
+        self.stopped = Event()  # set to end the pinger
+
+    @classmethod
+    def from_config(cls, logger: Logger) -> PumpConnections:
+        """Returns PumpConnections using the settings from the config file."""
+        return cls(logger, float(scalewiz.CONFIG["pumps"]["ping_seconds"]))
+
+    def connect(
+        self, ports: Sequence[str], flowrate: float, issues: List[str]
+    ) -> Tuple[Optional[PumpWorker], ...]:
+        """Returns a connected PumpWorker for each port, opening only those needed.
+
+        The pumps are leased until `release` is called, so they aren't pinged while
+        they're in use. Pumps on any other ports are closed. Appends a message to
+        `issues` for each pump that couldn't be reached, which is None in the
+        returned tuple.
+
+        Args:
+            ports (Sequence[str]): the ports to connect to
+            flowrate (float): the flowrate to set on each pump, in mL/min
+            issues (List[str]): a list of problems to append to
+        """
+        with self.lock:
+            for port, worker in list(self.workers.items()):
+                if port not in ports or not worker.is_alive:
+                    self.drop(port)
+            # the new workers open their ports concurrently
+            opening = {
+                port: PumpWorker(port, self.logger)
+                for port in ports
+                if port not in self.workers
+            }
+            for port, worker in opening.items():
+                try:
+                    worker.connected.result(timeout=PumpWorker.CONNECT_TIMEOUT)
+                except Exception:  # pylint: disable=broad-except
+                    issues.append(f"Couldn't connect to {port}")
+                    worker.close()
+                    continue
+                self.workers[port] = worker
+            if len(opening) < len(ports):
+                self.logger.info(
+                    "Reusing the open connection(s) to %s",
+                    ", ".join(port for port in ports if port not in opening),
+                )
+            pumps = tuple(self.workers.get(port) for port in ports)
+            self.leased.update(pump.port for pump in pumps if pump is not None)
+        for pump in pumps:
+            if pump is not None:
+                pump.set_flowrate(flowrate)  # queued ahead of anything else we send
+        self.logger.info("Set flowrates to %s", flowrate)
+        if self.pinger is None:
+            self.stopped = Event()
+            self.pinger = Thread(
+                target=self.ping, args=(self.stopped,), name="pump-pinger", daemon=True
+            )
+            self.pinger.start()
+        return pumps
+
+    def release(self) -> None:
+        """Releases the pumps leased by `connect`, so they're checked while idle."""
+        with self.lock:
+            self.leased.clear()
+
+    def reconnect(self, pump: PumpWorker) -> PumpWorker:
+        """Replaces a pump's worker with a new one, eg. once it has stopped answering.
+
+        Raises:
+            Exception: whatever kept the port from opening again
+        """
+        with self.lock:
+            if self.workers.get(pump.port) is pump:
+                del self.workers[pump.port]
+        worker = reopen(pump)  # without the lock, since it can take a while
+        with self.lock:
+            if pump.port in self.workers:  # eg. it was opened for a rinse meanwhile
+                self.drop(pump.port)
+            self.workers[pump.port] = worker
+        return worker
+
+    def keep(self, ports: Sequence[str]) -> None:
+        """Closes the pumps on any ports besides these, eg. once others are selected."""
+        with self.lock:
+            for port in list(self.workers):
+                if port not in ports:
+                    self.drop(port)
+
+    def stop(self) -> List[Future]:
+        """Stops every pump, leaving their ports open for the next test or rinse."""
+        with self.lock:
+            workers = list(self.workers.values())
+        return [worker.stop() for worker in workers if worker.is_open]
+
+    def close(self) -> None:
+        """Stops every pump and closes its port, waiting for them to finish.
+
+        The pinger is stopped too, until the next connection.
+        """
+        with self.lock:
+            workers = list(self.workers.values())
+            self.workers.clear()
+            self.leased.clear()
+            self.stopped.set()
+            self.pinger = None
+        close_pumps(*workers)
+
+    def drop(self, port: str) -> None:
+        """Stops and closes a pump without waiting. The lock must be held."""
+        worker = self.workers.pop(port)
+        if worker.is_open:
+            worker.stop()
+        worker.close()
+        self.logger.info("Closed the connection to %s", port)
+
+    def ping(self, stopped: Event) -> None:
+        """Checks on idle pumps with a pressure read, closing any that don't answer.
+
+        Runs on its own thread until `stopped` is set. Leased pumps are never checked,
+        since they may be running a test, eg. through an uptake cycle that sends them
+        nothing for longer than `ping_seconds`.
+        """
+        while not stopped.wait(self.ping_seconds / 2):
+            with self.lock:
+                idle = [
+                    worker
+                    for port, worker in self.workers.items()
+                    if port not in self.leased
+                    and monotonic() - worker.last_ok >= self.ping_seconds
+                ]
+            for worker in idle:
+                try:
+                    worker.pressure().result(timeout=PumpWorker.COMMAND_TIMEOUT)
+                except Exception as err:  # pylint: disable=broad-except
+                    self.logger.warning(
+                        "Lost the connection to %s, it will be reopened when next "
+                        "used: %s",
+                        worker.port,
+                        err,
+                    )
+                    with self.lock:
+                        # unless it was leased while it was being checked
+                        if (
+                            self.workers.get(worker.port) is worker
+                            and worker.port not in self.leased
+                        ):
+                            self.drop(worker.port)
@@ -0,0 +1,79 @@
+"""An asyncio event loop, shared by every TestHandler, that drives pump I/O.
+
+By default each TestHandler runs its readings loop on its own worker threads. When the
+`acquisition.engine` setting is "asyncio", every system's loop instead runs as a
+coroutine on the one event loop thread managed here, so adding systems doesn't add
+loop threads. Pump queries are awaited concurrently on each pump's PumpWorker, and
+other blocking calls (opening ports, invoking callbacks) go to a small shared pool.
+With "processes", each system's loop runs in its own process instead; see
+`acquisition_process.py`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+from threading import Lock, Thread
+from typing import TYPE_CHECKING
+
+import scalewiz
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from typing import Any, Awaitable, Callable
+
+LOGGER = getLogger("scalewiz.engine")
+
+ENGINES = ("threads", "asyncio", "processes")
+
+
+def get_engine_name() -> str:
+    """Returns the name of the configured acquisition engine."""
+    name = str(scalewiz.CONFIG["acquisition"]["engine"]).strip().lower()
+    if name not in ENGINES:
+        LOGGER.warning("Unknown acquisition engine %s, falling back to threads", name)
+        name = "threads"
+    return name
+
+
+class AcquisitionEngine:
+    """Owns an event loop running on a daemon thread."""
+
+    _instance: AcquisitionEngine = None
+    _instance_lock = Lock()
+
+    def __init__(self, io_threads: int = 8) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.io_pool = ThreadPoolExecutor(
+            max_workers=io_threads, thread_name_prefix="pump-io"
+        )
+        self.loop.set_default_executor(self.io_pool)
+        self.thread = Thread(
+            target=self.loop.run_forever, name="acquisition-engine", daemon=True
+        )
+        self.thread.start()
+        LOGGER.info("Started the acquisition engine with %s I/O threads", io_threads)
+
+    @classmethod
+    def get(cls) -> AcquisitionEngine:
+        """Returns the process-wide engine, starting it if need be."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                io_threads = int(scalewiz.CONFIG["acquisition"]["io_threads"])
+                cls._instance = cls(max(1, io_threads))
+            return cls._instance
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedules a coroutine on the engine's loop from any thread."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def call(self, func: Callable, *args) -> Any:
+        """Runs a blocking callable on the shared I/O pool and awaits its result."""
+        return await self.loop.run_in_executor(None, func, *args)
+
+    def shutdown(self) -> None:
+        """Stops the loop and its I/O pool."""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=1)
+        self.io_pool.shutdown(wait=False)
@@ -0,0 +1,209 @@
+"""A crash-safe journal of the readings taken during a test.
+
+While a test runs, each Reading is appended to a journal file in the project's `logs`
+directory. The first line is a JSON header describing the project and the test, and
+every following line is a JSON array of `[elapsedMin, pump 1, ..., pump N, average]`.
+Readings are written by the journal's own thread, so a slow disk can't hold up the
+readings loop. The file is flushed after every reading and fsynced in batches, so a
+crash loses at most a batch of readings from the disk cache, and a torn final line is
+simply skipped.
+
+The journal is deleted once its test has been saved to the project. Any journal left
+behind by a crash can be recovered into a Test the next time its project is loaded.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from time import monotonic, time
+from typing import TYPE_CHECKING
+from uuid import uuid4
+
+import scalewiz
+from scalewiz.models.reading import pump_columns
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Set, Union
+
+    from scalewiz.models.reading import Reading
+
+LOGGER = getLogger("scalewiz.journal")
+
+SUFFIX = ".journal"
+VERSION = 1
+
+_ACTIVE: Set[Path] = set()  # journals being written by this process
+_ACTIVE_LOCK = Lock()
+
+
+def logs_dir(project_path: Union[str, Path]) -> Path:
+    """Returns the `logs` directory next to a project file."""
+    return Path(project_path).parent.resolve().joinpath("logs")
+
+
+class ReadingJournal:
+    """An append-only journal of a running test's readings."""
+
+    def __init__(
+        self,
+        project_path: Union[str, Path],
+        test: Dict,
+        interval: float,
+    ) -> None:
+        """Creates a journal file and writes its header.
+
+        Args:
+            project_path (Union[str, Path]): the project the test will be saved to
+            test (Dict): the test's metadata, as stored in the project file
+            interval (float): seconds between readings
+        """
+        settings = scalewiz.CONFIG["journal"]
+        self.sync_readings = max(1, int(settings["sync_readings"]))
+        self.sync_seconds = float(settings["sync_seconds"])
+        directory = logs_dir(project_path)
+        directory.mkdir(exist_ok=True)
+        id = "".join(char for char in test["name"] if char.isalnum())
+        # unique, since two systems can start tests of the same name in one second
+        unique = uuid4().hex[:8]
+        self.path = directory.joinpath(
+            f"{time():.0f}_{id}_{date.today()}_{unique}{SUFFIX}"
+        )
+        header = {
+            "version": VERSION,
+            "project": str(Path(project_path).resolve()),
+            "interval": interval,
+            "test": {key: value for key, value in test.items() if key != "readings"},
+        }
+        self.file = self.path.open("x", encoding="utf-8")  # never another's journal
+        self.file.write(json.dumps(header) + "\n")
+        self.unsynced: int = 0  # readings written since the last fsync
+        self.synced_at: float = monotonic()
+        self.sync()
+        # writes readings in the order they're submitted
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="journal")
+        self.error: Exception = None  # if set, the write that failed
+        with _ACTIVE_LOCK:
+            _ACTIVE.add(self.path)
+        LOGGER.info("Journaling readings to %s", self.path)
+
+    def submit(self, reading: Reading) -> None:
+        """Queues a Reading to be appended by the journal's thread.
+
+        If a write fails, it's logged and every later Reading is dropped.
+
+        Raises:
+            ValueError: if the journal has been closed
+        """
+        if self.file.closed:
+            raise ValueError(f"{self.path} is closed")
+        self.writer.submit(self.write_queued, reading)
+
+    def write_queued(self, reading: Reading) -> None:
+        """Appends a queued Reading, unless an earlier one couldn't be."""
+        if self.error is not None:
+            return
+        try:
+            self.write(reading)
+        except (OSError, ValueError) as err:
+            self.error = err
+            LOGGER.warning("Stopped journaling readings to %s: %s", self.path, err)
+
+    def write(self, reading: Reading) -> None:
+        """Appends a Reading, syncing to disk if a batch is due."""
+        row = (reading.elapsedMin, *reading.pressures, reading.average)
+        self.file.write(json.dumps(row) + "\n")
+        self.file.flush()  # into the OS, so it survives if we crash but the OS doesn't
+        self.unsynced += 1
+        if (
+            self.unsynced >= self.sync_readings
+            or monotonic() - self.synced_at >= self.sync_seconds
+        ):
+            self.sync()
+
+    def sync(self) -> None:
+        """Flushes the journal through to the disk."""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.unsynced = 0
+        self.synced_at = monotonic()
+
+    def close(self) -> None:
+        """Closes the journal, leaving it on disk to be recovered."""
+        self.writer.shutdown(wait=True)  # once every queued Reading is written
+        if not self.file.closed:
+            self.sync()
+            self.file.close()
+        with _ACTIVE_LOCK:
+            _ACTIVE.discard(self.path)
+
+    def remove(self) -> None:
+        """Closes and deletes the journal, once its test is safely saved."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+        LOGGER.info("Removed journal %s", self.path)
+
+
+def find_unfinished(project_path: Union[str, Path]) -> List[Path]:
+    """Returns the journals left behind for a project by tests that never got saved.
+
+    Journals still being written by this process, or that were written to recently
+    enough that another process might still be running the test, are skipped.
+    """
+    directory = logs_dir(project_path)
+    if not directory.is_dir():
+        return []
+    # match on the file name, since the project may have been synced from elsewhere
+    name = Path(project_path).name
+    found = []
+    for path in sorted(directory.glob(f"*{SUFFIX}")):
+        with _ACTIVE_LOCK:
+            if path in _ACTIVE:
+                continue
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                header = json.loads(file.readline())
+        except (OSError, ValueError) as err:
+            LOGGER.warning("Couldn't read journal %s: %s", path, err)
+            continue
+        # give a test running elsewhere a few missed readings' grace
+        grace = max(60.0, 3 * float(header.get("interval", 0)))
+        if time() - path.stat().st_mtime < grace:
+            continue
+        if Path(header.get("project", "")).name == name:
+            found.append(path)
+    return found
+
+
+def read_journal(path: Union[str, Path]) -> Dict:
+    """Returns the test in a journal as a dict, as it is stored in a project file."""
+    with Path(path).open("r", encoding="utf-8") as file:
+        header = json.loads(file.readline())
+        readings = []
+        for line in file:
+            try:
+                elapsed, *pressures, average = json.loads(line)
+            except ValueError:
+                break  # a torn write from the crash, nothing after it is trustworthy
+            readings.append(
+                {
+                    **dict(zip(pump_columns(len(pressures)), pressures)),
+                    "average": average,
+                    "elapsedMin": elapsed,
+                }
+            )
+    test = header["test"]
+    test["readings"] = readings
+    return test
+
+
+def discard(path: Union[str, Path]) -> None:
+    """Sets aside a journal that the user chose not to recover, without deleting it."""
+    path = Path(path)
+    path.rename(path.with_suffix(".discarded"))
+    LOGGER.info("Set aside journal %s", path)
@@ -0,0 +1,176 @@
+"""Predicts whether a running trial is going to fail, so that it can be stopped early.
+
+A trial fails when its scored pressure reaches the project's PSI limit before the time
+limit. A FailurePredictor fits a line to the scored pressures over the last few minutes
+of the test, and projects when the limit will be reached. The test is only called a
+failure when even the slowest rise its confidence bounds allow would reach the limit in
+time, and within a horizon that a short fit can be trusted over. Scale usually builds
+faster than linearly, so the projection errs late.
+
+With `prediction.stop_early` set, the Acquisition stops a trial as soon as it's certain
+to fail. The score treats the rest of the test as a ramp up to the limit at the
+projected time, then the limit until the time limit; see `score`.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from math import sqrt
+from statistics import NormalDist
+from typing import TYPE_CHECKING
+
+import scalewiz
+
+if TYPE_CHECKING:
+    from typing import Deque, Optional, Tuple
+
+    from scalewiz.models.reading import Reading
+
+
+class FailurePredictor:
+    """Fits a rolling regression to a test's pressures, and projects time to limit.
+
+    The sums the fit needs are kept up to date as readings come and go from the
+    window, so each reading costs the same however long the window is.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    CONFIRMATIONS: int = 3  # consecutive readings that must agree the test will fail
+
+    def __init__(
+        self,
+        column: str,
+        limit_psi: int,
+        limit_minutes: float,
+        window_minutes: float = 2.0,
+        horizon_minutes: float = 10.0,
+        confidence: float = 0.99,
+        min_readings: int = 10,
+    ) -> None:
+        """Initializes a FailurePredictor.
+
+        Args:
+            column (str): the pressures being scored, eg. "pump 1" or "average"
+            limit_psi (int): the pressure at which the test fails
+            limit_minutes (float): the test's time limit
+            window_minutes (float, optional): how many of the latest minutes of
+                readings are fitted. Defaults to 2.0.
+            horizon_minutes (float, optional): how far ahead the fit is trusted; a
+                limit projected further out than this doesn't count. Defaults to 10.0.
+            confidence (float, optional): how sure the prediction must be before the
+                test is called a failure, between 0.5 and 1.0. Defaults to 0.99.
+            min_readings (int, optional): the fewest readings to fit a line to.
+                Defaults to 10.
+        """
+        self.column = column
+        self.limit_psi = limit_psi
+        self.limit_minutes = limit_minutes
+        self.window_minutes = window_minutes
+        self.horizon_minutes = horizon_minutes
+        self.min_readings = max(3, min_readings)
+        # one-sided, since we only care how late the limit might be reached
+        self.z = NormalDist().inv_cdf(min(max(confidence, 0.5), 0.999999))
+        self.points: Deque[Tuple[float, float]] = deque()
+        # running sums of t, p, t^2, t * p, and p^2 over the window
+        self.sum_t = self.sum_p = self.sum_tt = self.sum_tp = self.sum_pp = 0.0
+        self.agreed: int = 0  # consecutive readings projecting a failure
+        self.projected_min: float = None  # when the limit should be reached, if known
+        self.latest_min: float = None  # the latest it could be reached, if known
+
+    @classmethod
+    def from_config(
+        cls, column: str, limit_psi: int, limit_minutes: float
+    ) -> FailurePredictor:
+        """Returns a FailurePredictor using the settings from the config file."""
+        settings = scalewiz.CONFIG["prediction"]
+        return cls(
+            column,
+            limit_psi,
+            limit_minutes,
+            window_minutes=float(settings["window_minutes"]),
+            horizon_minutes=float(settings["horizon_minutes"]),
+            confidence=float(settings["confidence"]),
+            min_readings=int(settings["min_readings"]),
+        )
+
+    @property
+    def failing(self) -> bool:
+        """Returns True once the test is certain to reach its limit in time."""
+        return self.agreed >= self.CONFIRMATIONS
+
+    def add(self, reading: Reading) -> bool:
+        """Adds a reading to the fit, and updates the projection.
+
+        Returns:
+            bool: whether the test is now certain to fail
+        """
+        time, psi = reading.elapsedMin, float(reading.get(self.column))
+        self.push(time, psi)
+        if psi >= self.limit_psi:
+            # already failed, though the test runs on until both pumps reach the limit
+            self.projected_min, self.latest_min = time, time
+            self.agreed = self.CONFIRMATIONS
+            return True
+        while self.points and self.points[0][0] < time - self.window_minutes:
+            self.pop()
+
+        projection = self.project(time)
+        if projection is None:
+            self.projected_min, self.latest_min = None, None
+            self.agreed = 0
+            return False
+        self.projected_min, self.latest_min = projection
+        horizon = min(self.limit_minutes, time + self.horizon_minutes)
+        if self.latest_min < horizon:
+            self.agreed += 1
+        else:
+            self.agreed = 0
+        return self.failing
+
+    def push(self, time: float, psi: float) -> None:
+        """Adds a point to the window."""
+        self.points.append((time, psi))
+        self.sum_t += time
+        self.sum_p += psi
+        self.sum_tt += time * time
+        self.sum_tp += time * psi
+        self.sum_pp += psi * psi
+
+    def pop(self) -> None:
+        """Removes the oldest point from the window."""
+        time, psi = self.points.popleft()
+        self.sum_t -= time
+        self.sum_p -= psi
+        self.sum_tt -= time * time
+        self.sum_tp -= time * psi
+        self.sum_pp -= psi * psi
+
+    def project(self, now: float) -> Optional[Tuple[float, float]]:
+        """Returns when the limit should be reached, and the latest it could be.
+
+        Returns None if there are too few readings, or the pressure isn't surely rising.
+        """
+        count = len(self.points)
+        if count < self.min_readings:
+            return None
+        mean_t = self.sum_t / count
+        mean_p = self.sum_p / count
+        spread_t = self.sum_tt - count * mean_t * mean_t
+        if spread_t <= 0:
+            return None
+        slope = (self.sum_tp - count * mean_t * mean_p) / spread_t
+        # the residual variance, which rounding could otherwise make negative
+        spread_p = self.sum_pp - count * mean_p * mean_p
+        variance = max(spread_p - slope * slope * spread_t, 0.0) / (count - 2)
+        # the slowest rise, and lowest current pressure, the fit allows
+        slow_slope = slope - self.z * sqrt(variance / spread_t)
+        if slow_slope <= 0:
+            return None
+        psi = mean_p + slope * (now - mean_t)
+        low_psi = psi - self.z * sqrt(
+            variance * (1 / count + (now - mean_t) ** 2 / spread_t)
+        )
+        projected = now + max(self.limit_psi - psi, 0) / slope
+        latest = now + max(self.limit_psi - low_psi, 0) / slow_slope
+        return projected, latest
@@ -1,61 +1,79 @@
-"""Model object for a project. Provides a JSON/Tk mapping."""
+"""Model object for a project. Provides a JSON mapping."""
 
 from __future__ import annotations
 
 import json
 import logging
-import tkinter as tk
+import os
+import re
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 from scalewiz import CONFIG
 from scalewiz.helpers.configuration import update_config
 from scalewiz.helpers.sort_nicely import sort_nicely
+from scalewiz.models.reading import InlineReadings
+from scalewiz.models.sidecar import StoredReadings, append, sidecar_for
 from scalewiz.models.test import Test
+from scalewiz.models.value import BooleanValue, DoubleValue, IntValue, StringValue
 
 if TYPE_CHECKING:
-    from typing import List
+    from typing import Any, Callable, Dict, List, Optional, Tuple
 
 LOGGER = logging.getLogger("scalewiz")
 
+DECODER = json.JSONDecoder()
+WHITESPACE = re.compile(r"\s*")
+INDENT = " " * 8  # of each test in the file's tests array
+
 
 class Project:
-    """Model object for a project. Provides a JSON/tkVar mapping."""
+    """Model object for a project. Provides a JSON mapping.
+
+    Made of Values rather than tkinter variables, so it can be used without a Tk
+    interpreter, from any thread. See `scalewiz.helpers.tk_binding` to show one.
+    """
 
     # pylint: disable=too-many-instance-attributes
 
     def __init__(self) -> None:
         self.tests: List[Test] = []
+        # each test's JSON as of the last load or save, and what it was made from,
+        # including the sidecar file its readingsRef points into
+        self.encoded_tests: Dict[Test, Tuple[tuple, str]] = {}
+        # the name of the sidecar file the readings are kept in, "" to keep them in
+        # the project file, or None if the project hasn't been saved or loaded yet
+        self.readings_file: Optional[str] = None
         # experiment parameters that affect score
-        self.baseline = tk.IntVar()
-        self.limit_minutes = tk.DoubleVar()
-        self.limit_psi = tk.IntVar()
-        self.interval_seconds = tk.DoubleVar()
-        self.flowrate = tk.DoubleVar()
-        self.uptake_seconds = tk.DoubleVar()
+        self.baseline = IntValue()
+        self.limit_minutes = DoubleValue()
+        self.limit_psi = IntValue()
+        self.interval_seconds = DoubleValue()
+        self.flowrate = DoubleValue()
+        self.uptake_seconds = DoubleValue()
         # report stuff
-        self.output_format = tk.StringVar()
+        self.output_format = StringValue()
         # metadata for reporting
-        self.customer = tk.StringVar()
-        self.submitted_by = tk.StringVar()
-        self.client = tk.StringVar()
-        self.field = tk.StringVar()
-        self.sample = tk.StringVar()
-        self.sample_date = tk.StringVar()
-        self.received_date = tk.StringVar()
-        self.completed_date = tk.StringVar()
-        self.name = tk.StringVar()  # identifier for the project
-        self.analyst = tk.StringVar()
-        self.numbers = tk.StringVar()
-        self.path = tk.StringVar()  # path to the project's JSON file
-        self.notes = tk.StringVar()
-        self.bicarbs = tk.DoubleVar()
-        self.bicarbs_increased = tk.BooleanVar()
-        self.calcium = tk.DoubleVar()
-        self.chlorides = tk.DoubleVar()
-        self.temperature = tk.DoubleVar()  # the test temperature
-        self.plot = tk.StringVar()  # path to plot local file
-        self.default_pump = tk.StringVar()
+        self.customer = StringValue()
+        self.submitted_by = StringValue()
+        self.client = StringValue()
+        self.field = StringValue()
+        self.sample = StringValue()
+        self.sample_date = StringValue()
+        self.received_date = StringValue()
+        self.completed_date = StringValue()
+        self.name = StringValue()  # identifier for the project
+        self.analyst = StringValue()
+        self.numbers = StringValue()
+        self.path = StringValue()  # path to the project's JSON file
+        self.notes = StringValue()
+        self.bicarbs = DoubleValue()
+        self.bicarbs_increased = BooleanValue()
+        self.calcium = DoubleValue()
+        self.chlorides = DoubleValue()
+        self.temperature = DoubleValue()  # the test temperature
+        self.plot = StringValue()  # path to plot local file
+        self.default_pump = StringValue()
         self.set_defaults()  # get default values from the config
         self.add_traces()  # these need to be cleaned up later
 
@@ -82,14 +100,20 @@ class Project:
         self.analyst.set(CONFIG["recents"]["analyst"])
 
     def add_traces(self) -> None:
-        """Adds tkVar traces where needed. Must be cleaned up with remove_traces."""
+        """Adds Value traces where needed. Can be removed with remove_traces."""
         self.customer.trace_add("write", self.update_proj_name)
         self.client.trace_add("write", self.update_proj_name)
         self.field.trace_add("write", self.update_proj_name)
         self.sample.trace_add("write", self.update_proj_name)
 
-    def dump_json(self, path: str = None) -> None:
-        """Dump a JSON representation of the Project at the passed path."""
+    def dump_json(self, path: str = None) -> bool:
+        """Dump a JSON representation of the Project at the passed path.
+
+        Returns:
+            bool: True if the file was written
+        """
+        from scalewiz.models.project_cache import ProjectCache
+
         if path is None:
             path = Path(self.path.get())
 
@@ -116,7 +140,7 @@ class Project:
         self.tests.clear()
         self.tests = [test for test in tests]
 
-        this = {
+        head = {
             "info": {
                 "customer": self.customer.get(),
                 "submittedBy": self.submitted_by.get(),
@@ -145,27 +169,94 @@ class Project:
                 "flowrate": self.flowrate.get(),
                 "uptake": self.uptake_seconds.get(),
             },
-            "tests": [test.to_dict() for test in self.tests],
+        }
+        tail = {
             "outputFormat": self.output_format.get(),
             "plot": str(Path(self.plot.get()).resolve()),
             "defaultPump": self.default_pump.get(),
         }
+        if self.readings_file is None:  # a new project, so the config decides
+            binary = CONFIG["storage"]["readings"] == "binary"
+            self.readings_file = sidecar_for(path).name if binary else ""
+        sidecar = None
+        if self.readings_file:
+            tail["readingsFile"] = self.readings_file
+            sidecar = Path(path).resolve().with_name(self.readings_file)
         try:
-            with Path(path).open("w") as file:
-                json.dump(this, file, indent=4)
+            # the same text json.dump(indent=4) would write, without re-encoding
+            # every test
+            text = "".join(
+                (
+                    "{\n",
+                    encode_members(head),
+                    ',\n    "tests": ',
+                    self.encode_tests(sidecar),
+                    ",\n",
+                    encode_members(tail),
+                    "\n}",
+                )
+            )
+            # write a copy then swap it in, so a crash can't leave a truncated file
+            temp = Path(path).with_name(f"{Path(path).name}.tmp")
+            with temp.open("w") as file:
+                file.write(text)
+            os.replace(temp, path)
+            ProjectCache.get().forget(path)
             LOGGER.info("Saved %s to %s", self.name.get(), path)
             update_config("recents", "analyst", self.analyst.get())
             update_config("recents", "project", str(Path(self.path.get()).resolve()))
         except Exception as err:
             LOGGER.exception(err)
+            return False
+        return True
+
+    def encode_tests(self, sidecar: Path = None) -> str:
+        """Returns the JSON array of the Project's tests, as it is written to file.
+
+        Only tests that are new, or have changed since the Project was loaded or last
+        saved, are encoded. The rest reuse their text from then, unless it points into
+        another sidecar file, eg. when the Project is saved to another folder.
+
+        Args:
+            sidecar (Path, optional): the sidecar file to append new readings to, if
+                they aren't kept in the project file. Defaults to None.
+        """
+        encoded = {}
+        for test in self.tests:
+            metadata = test.metadata()
+            key = (tuple(metadata.items()), test.reading_count, sidecar)
+            if test not in self.encoded_tests or self.encoded_tests[test][0] != key:
+                if sidecar is None:
+                    metadata["readings"] = test.readings.to_dicts()
+                else:
+                    source = test.source
+                    if (
+                        not isinstance(source, StoredReadings)
+                        or source.path != sidecar
+                        or source.count != test.reading_count
+                    ):
+                        test.source = append(sidecar, test.readings)
+                    metadata["readingsRef"] = test.source.to_ref()
+                text = json.dumps(metadata, indent=4).replace("\n", f"\n{INDENT}")
+                encoded[test] = (key, text)
+            else:
+                encoded[test] = self.encoded_tests[test]
+        self.encoded_tests = encoded  # forget any tests that were removed
+        if len(encoded) == 0:
+            return "[]"
+        texts = (text for _, text in encoded.values())
+        return "".join(("[\n", INDENT, f",\n{INDENT}".join(texts), "\n    ]"))
 
     def load_json(self, path: str) -> None:
         """Return a Project from a passed path to a JSON dump."""
+        # imported here, since the cache parses projects with this module
+        from scalewiz.models.project_cache import ProjectCache
+
         path = Path(path).resolve()
         if path.is_file():
             LOGGER.info("Loading from %s", path)
-            with path.open("r") as file:
-                obj = json.load(file)
+            # a file that hasn't changed since it was last opened isn't parsed again
+            obj, texts = ProjectCache.get().load(path)
 
         # we expect the data files to be shared over Dropbox, etc.
         if str(path) != obj["info"]["path"]:
@@ -206,14 +297,21 @@ class Project:
 
         self.plot.set(obj.get("plot"))
         self.default_pump.set(obj.get("defaultPump", "Pump 1"))
+        self.readings_file = obj.get("readingsFile", "")
+        sidecar = path.with_name(self.readings_file) if self.readings_file else None
 
         self.tests.clear()
-        for entry in obj["tests"]:
-            test = Test(data=entry)
+        self.encoded_tests.clear()
+        for entry, text in zip(obj["tests"], texts):
+            # readings in a sidecar file are only read once they're needed
+            test = Test(data=entry, sidecar=sidecar)
             self.tests.append(test)
+            # until it changes, the test can be saved as the text it was read from
+            key = (tuple(test.metadata().items()), test.reading_count, sidecar)
+            self.encoded_tests[test] = (key, text)
 
     def remove_traces(self) -> None:
-        """Remove tkVar traces to allow the GC to do its thing."""
+        """Removes the Value traces added by add_traces, and its tests'."""
         variables = (self.customer, self.client, self.field, self.sample)
         for var in variables:
             try:
@@ -235,3 +333,75 @@ class Project:
         if self.sample.get() != "":
             name = f"{name} ({self.sample.get().strip()})"
         self.name.set(name)
+
+
+def encode_members(obj: dict) -> str:
+    """Returns the members of a dict as they appear in it when indented as JSON."""
+    return json.dumps(obj, indent=4)[2:-2]  # without the braces and their newlines
+
+
+def parse_project(text: str) -> Tuple[dict, List[str]]:
+    """Parses a project file's JSON, keeping the text of each of its tests.
+
+    Each test's readings are left as InlineReadings, so opening a project only costs
+    as much as parsing its metadata until the readings are needed.
+
+    Returns:
+        Tuple[dict, List[str]]: the parsed project, and the text of each test
+    """
+    texts = []
+
+    def skip(i: int, separator: str = "") -> int:
+        """Returns the index past any whitespace and an optional separator."""
+        i = WHITESPACE.match(text, i).end()
+        if separator and text.startswith(separator, i):
+            i = WHITESPACE.match(text, i + 1).end()
+        return i
+
+    def parse_object(
+        i: int, parse_value: Callable[[str, int], Tuple[Any, int]]
+    ) -> Tuple[dict, int]:
+        """Parses the object at an index, parsing each value with `parse_value`."""
+        obj = {}
+        if not text.startswith("{", i):
+            raise json.JSONDecodeError("Expecting '{'", text, i)
+        i = skip(i + 1)
+        while not text.startswith("}", i):
+            key, i = DECODER.raw_decode(text, i)
+            i = skip(i)
+            if not text.startswith(":", i):
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, i)
+            obj[key], i = parse_value(key, skip(i + 1))
+            i = skip(i, ",")
+        return obj, i + 1
+
+    def parse_test_value(key: str, i: int) -> Tuple[Any, int]:
+        if key == "readings" and text.startswith("[", i):
+            # readings hold nothing but numbers, so the first ] closes the array
+            end = text.index("]", i) + 1
+            return InlineReadings(text, i, end), end
+        return DECODER.raw_decode(text, i)
+
+    def parse_value(key: str, i: int) -> Tuple[Any, int]:
+        if key != "tests" or not text.startswith("[", i):
+            return DECODER.raw_decode(text, i)
+        tests = []
+        i = skip(i + 1)
+        while not text.startswith("]", i):
+            try:
+                entry, end = parse_object(i, parse_test_value)
+            except ValueError:  # something unexpected, so parse all of it
+                entry, end = DECODER.raw_decode(text, i)
+            texts.append(text[i:end])
+            readings = entry.get("readings")
+            if isinstance(readings, InlineReadings):
+                # point into the test's own text, so the file's can be let go of
+                entry["readings"] = InlineReadings(
+                    texts[-1], readings.start - i, readings.stop - i, readings.count
+                )
+            tests.append(entry)
+            i = skip(end, ",")
+        return tests, i + 1
+
+    obj, _ = parse_object(skip(0), parse_value)
+    return obj, texts
@@ -0,0 +1,248 @@
+"""Keeps parsed project files for as long as they're unchanged, to reopen them quickly.
+
+Opening a project reads and parses its whole file, even if it was opened a moment ago
+in another system or window. The ProjectCache keeps what `parse_project` made of each
+file, keyed by its path, and checks the file's modification time and size, then a
+hash of its contents if those changed, before reusing it. Each caller is handed its
+own copy of the parsed dicts and lists, so loading a Project from it never changes
+what's kept. The text of each test, which holds its unparsed readings, is shared.
+
+The least recently used files are dropped once they take more memory than the
+config's `cache.memory_mb`. With `cache.disk` set, parsed files are also kept in the
+user's cache folder, so the first open after a restart needn't parse them either.
+They're stored with `marshal`, which only holds plain data and is fast to read, and
+dropped once they take more than `cache.disk_mb`.
+"""
+
+from __future__ import annotations
+
+import io
+import marshal
+import os
+from collections import OrderedDict
+from hashlib import blake2b
+from logging import getLogger
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from appdirs import user_cache_dir
+
+import scalewiz
+from scalewiz.models.project import parse_project
+from scalewiz.models.reading import InlineReadings
+
+if TYPE_CHECKING:
+    from typing import Any, List, Optional, Tuple, Union
+
+LOGGER = getLogger("scalewiz.project_cache")
+
+CACHE_DIR = Path(user_cache_dir("ScaleWiz", "teauxfu"), "projects")
+# changes whenever the layout of cached files, or the marshal format, does
+FORMAT = f"scalewiz-project-cache-1-{marshal.version}"
+MB = 1024 * 1024
+TEST_COST = 1024  # a rough size in bytes of a test's parsed metadata
+
+
+class Entry:
+    """A parsed project file, and the fingerprint of the file it was parsed from."""
+
+    __slots__ = ("mtime_ns", "size", "digest", "obj", "texts", "cost")
+
+    def __init__(
+        self, stat: os.stat_result, digest: str, obj: dict, texts: List[str]
+    ) -> None:
+        self.mtime_ns, self.size = stat.st_mtime_ns, stat.st_size
+        self.digest = digest
+        self.obj = obj
+        self.texts = texts
+        self.cost = sum(len(text) for text in texts) + TEST_COST * (len(texts) + 1)
+
+    def matches(self, stat: os.stat_result) -> bool:
+        """Returns whether a file looks unchanged since this was parsed from it."""
+        return (self.mtime_ns, self.size) == (stat.st_mtime_ns, stat.st_size)
+
+
+class ProjectCache:
+    """A process-wide cache of parsed project files. Safe to use from any thread."""
+
+    _instance: ProjectCache = None
+    _instance_lock = Lock()
+
+    def __init__(
+        self, memory_mb: float = 256, disk: bool = False, disk_mb: float = 1024
+    ) -> None:
+        """Initializes a ProjectCache.
+
+        Args:
+            memory_mb (float, optional): how much memory the parsed files can take,
+                0 to keep none in memory. Defaults to 256.
+            disk (bool, optional): whether to keep parsed files on disk too.
+                Defaults to False.
+            disk_mb (float, optional): how much disk they can take. Defaults to 1024.
+        """
+        self.budget = max(0, memory_mb) * MB
+        self.disk = disk
+        self.disk_budget = max(0, disk_mb) * MB
+        self.entries: OrderedDict[str, Entry] = OrderedDict()  # oldest use first
+        self.used = 0  # the cost of every entry
+        self.lock = Lock()
+
+    @classmethod
+    def get(cls) -> ProjectCache:
+        """Returns the application's cache, set up from the config's `cache` table."""
+        with cls._instance_lock:
+            if cls._instance is None:
+                settings = scalewiz.CONFIG["cache"]
+                cls._instance = cls(
+                    settings["memory_mb"], settings["disk"], settings["disk_mb"]
+                )
+            return cls._instance
+
+    def load(self, path: Union[str, Path]) -> Tuple[dict, List[str]]:
+        """Returns a project file as `parse_project` would, reusing it if unchanged.
+
+        Raises:
+            OSError: if the file can't be read
+            ValueError: if it isn't JSON
+        """
+        path = Path(path).resolve()
+        key = str(path)
+        stat = path.stat()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry.matches(stat):
+                self.entries.move_to_end(key)
+                LOGGER.debug("Reused %s, unchanged since it was parsed", path)
+                return copy_tree(entry.obj), list(entry.texts)
+        # it may only have been touched, eg. copied back in by a sync client
+        with path.open("rb") as file:
+            stat = os.fstat(file.fileno())  # of what's read, if it's being replaced
+            data = file.read()
+        digest = blake2b(data, digest_size=20).hexdigest()
+        if entry is not None and entry.digest == digest:
+            LOGGER.debug("Reused %s, modified but unchanged", path)
+            obj, texts = entry.obj, entry.texts
+        else:
+            cached = self.read_disk(key, digest) if self.disk else None
+            if cached is not None:
+                LOGGER.debug("Reused %s, parsed before this session", path)
+                obj, texts = cached
+            else:
+                # decoded as if the file were opened in text mode
+                obj, texts = parse_project(io.TextIOWrapper(io.BytesIO(data)).read())
+                if self.disk:
+                    self.write_disk(key, digest, obj, texts)
+        self.keep(key, Entry(stat, digest, obj, texts))
+        return copy_tree(obj), list(texts)
+
+    def keep(self, key: str, entry: Entry) -> None:
+        """Keeps an entry in memory, dropping the least recently used over budget."""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.used -= old.cost
+            if entry.cost > self.budget:  # it would push out everything else
+                return
+            self.entries[key] = entry
+            self.used += entry.cost
+            while self.used > self.budget:
+                _, dropped = self.entries.popitem(last=False)
+                self.used -= dropped.cost
+
+    def forget(self, path: Union[str, Path]) -> None:
+        """Drops a project file from memory, eg. once it's been saved over."""
+        with self.lock:
+            entry = self.entries.pop(str(Path(path).resolve()), None)
+            if entry is not None:
+                self.used -= entry.cost
+
+    def clear(self) -> None:
+        """Drops every project file from memory."""
+        with self.lock:
+            self.entries.clear()
+            self.used = 0
+
+    def read_disk(self, key: str, digest: str) -> Optional[Tuple[dict, List[str]]]:
+        """Returns a parsed project file from disk, or None if it isn't there."""
+        cached = cache_file(key)
+        try:
+            with cached.open("rb") as file:
+                tag, stored_digest, obj, texts = marshal.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as err:  # pylint: disable=broad-except
+            LOGGER.debug("Couldn't read %s: %s", cached, err)
+            return None
+        if tag != FORMAT or stored_digest != digest:  # out of date
+            return None
+        try:
+            os.utime(cached)  # so it's pruned last
+        except OSError:
+            pass
+        for test, text in zip(tests_of(obj), texts):
+            if isinstance(test, dict) and isinstance(test.get("readings"), tuple):
+                test["readings"] = InlineReadings(text, *test["readings"])
+        return obj, texts
+
+    def write_disk(self, key: str, digest: str, obj: dict, texts: List[str]) -> None:
+        """Keeps a parsed project file on disk, dropping the oldest over budget."""
+        frozen = copy_tree(obj)
+        for test in tests_of(frozen):
+            # only JSON's types can be in a project, so a tuple stands for readings
+            readings = test.get("readings") if isinstance(test, dict) else None
+            if isinstance(readings, InlineReadings):
+                test["readings"] = (readings.start, readings.stop, readings.count)
+        cached = cache_file(key)
+        temp = cached.with_name(f"{cached.name}.tmp")
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with temp.open("wb") as file:
+                marshal.dump((FORMAT, digest, frozen, texts), file)
+            os.replace(temp, cached)
+            self.prune_disk()
+        except OSError as err:
+            LOGGER.warning("Couldn't cache %s on disk: %s", key, err)
+
+    def prune_disk(self) -> None:
+        """Deletes the least recently used files on disk over the disk budget."""
+        files = []
+        for entry in os.scandir(CACHE_DIR):
+            try:
+                stat = entry.stat()
+            except OSError:  # eg. just replaced by another thread
+                continue
+            files.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        used = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if used <= self.disk_budget:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            used -= size
+
+
+def cache_file(key: str) -> Path:
+    """Returns the file a project file at a path is cached in on disk."""
+    return Path(CACHE_DIR, f"{blake2b(key.encode()).hexdigest()[:32]}.cache")
+
+
+def tests_of(obj: dict) -> List[dict]:
+    """Returns the tests of a parsed project file, or [] if it has none."""
+    tests = obj.get("tests")
+    return tests if isinstance(tests, list) else []
+
+
+def copy_tree(value: Any) -> Any:
+    """Returns a copy of a parsed JSON value's dicts and lists, sharing the rest.
+
+    Everything else in a parsed project, including InlineReadings, is never changed
+    once parsed, so it needn't be copied.
+    """
+    if isinstance(value, dict):
+        return {key: copy_tree(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_tree(item) for item in value]
+    return value
@@ -0,0 +1,166 @@
+"""A dedicated I/O thread for a pump, which owns its serial port."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future
+from queue import Queue
+from threading import Thread
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING
+
+from scalewiz.helpers.metrics import COMMANDS, PumpMetrics
+from scalewiz.helpers.pump_backend import make_pump
+
+if TYPE_CHECKING:
+    from logging import Logger
+    from typing import Any, Callable, Optional, Tuple, Union
+
+    from py_hplc import NextGenPump
+
+
+class PumpWorker:
+    """Owns a pump on a dedicated thread, which processes an ordered command queue.
+
+    Every command sent to the pump -- pressure polls as well as `run`, `stop`, and
+    flowrate changes -- goes through the queue, so they never contend for the serial
+    port and are executed in the order they were submitted. Each submission returns a
+    Future for its result, so callers can pipeline commands without waiting on them.
+    """
+
+    CONNECT_TIMEOUT: float = 10.0  # seconds to wait for a port to open
+    COMMAND_TIMEOUT: float = 5.0  # seconds to wait for a control command
+
+    def __init__(self, port: str, logger: Logger) -> None:
+        self.port = port
+        self.logger = logger
+        self.pump: NextGenPump = None
+        self.queue: Queue[Optional[Tuple[Callable, tuple, Future, float]]] = Queue()
+        self.connected: Future = Future()  # resolves to the pump once it is open
+        self.last_latency: float = 0.0  # seconds, queue wait plus I/O
+        self.last_ok: float = monotonic()  # when a command last succeeded
+        self.metrics = PumpMetrics.get()
+        self.thread = Thread(target=self.work, name=f"pump-{port}", daemon=True)
+        self.thread.start()
+
+    def work(self) -> None:
+        """Opens the pump, then processes commands until told to stop."""
+        try:
+            self.pump = make_pump(self.port, self.logger)
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.exception(err)
+            self.connected.set_exception(err)
+        else:
+            self.connected.set_result(self.pump)
+
+        while True:
+            item = self.queue.get()
+            if item is None:  # sentinel from close()
+                break
+            func, args, future, submitted = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            if self.pump is None:
+                future.set_exception(ConnectionError(f"No pump is open at {self.port}"))
+                continue
+            command = COMMANDS.get(func.__name__)
+            started = perf_counter()
+            try:
+                result = func(self.pump, *args)
+            except Exception as err:  # pylint: disable=broad-except
+                self.logger.warning(
+                    "%s failed on %s: %s", func.__name__, self.port, err
+                )
+                if command is not None:
+                    self.metrics.record(
+                        self.port, command, perf_counter() - started, err
+                    )
+                future.set_exception(err)
+            else:
+                if command is not None:
+                    self.metrics.record(self.port, command, perf_counter() - started)
+                self.last_ok = monotonic()
+                future.set_result(result)
+            finally:
+                self.last_latency = monotonic() - submitted
+
+    def submit(self, func: Callable[[NextGenPump], Any], *args) -> Future:
+        """Queues a callable that takes the pump as its first argument."""
+        future = Future()
+        self.queue.put((func, args, future, monotonic()))
+        return future
+
+    def pressure(self) -> Future:
+        """Queues a pressure poll."""
+        return self.submit(get_pressure)
+
+    def run(self) -> Future:
+        """Queues a command to run the pump."""
+        return self.submit(run)
+
+    def stop(self) -> Future:
+        """Queues a command to stop the pump."""
+        return self.submit(stop)
+
+    def set_flowrate(self, flowrate: float) -> Future:
+        """Queues a command to set the pump's flowrate in mL/min."""
+        return self.submit(set_flowrate, flowrate)
+
+    def close(self) -> Future:
+        """Queues closing the port, after which the worker thread exits."""
+        future = self.submit(close)
+        self.queue.put(None)
+        return future
+
+    def abort(self) -> None:
+        """Gives up on the pump, eg. once it has stopped answering.
+
+        Queued commands are cancelled, and the port is closed from this thread, which
+        interrupts a read that has hung. The worker thread exits once it's free.
+        """
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None:
+                item[2].cancel()
+        self.queue.put(None)
+        if self.pump is not None:
+            try:
+                self.pump.serial.close()
+            except Exception as err:  # pylint: disable=broad-except
+                self.logger.warning("Couldn't close %s: %s", self.port, err)
+
+    @property
+    def is_open(self) -> bool:
+        """Returns True if the pump's port is open."""
+        return self.pump is not None and self.pump.is_open
+
+    @property
+    def is_alive(self) -> bool:
+        """Returns True if the worker is still taking commands for an open port."""
+        return self.thread.is_alive() and self.is_open
+
+
+# these get run on the worker thread --------------------------------------------------
+def get_pressure(pump: NextGenPump) -> Union[float, int]:
+    """Returns the pump's pressure."""
+    return pump.pressure
+
+
+def run(pump: NextGenPump) -> str:
+    """Runs the pump."""
+    return pump.run()
+
+
+def stop(pump: NextGenPump) -> str:
+    """Stops the pump."""
+    return pump.stop()
+
+
+def set_flowrate(pump: NextGenPump, flowrate: float) -> None:
+    """Sets the pump's flowrate."""
+    pump.flowrate = flowrate
+
+
+def close(pump: NextGenPump) -> None:
+    """Closes the pump's port."""
+    if pump.is_open:
+        pump.close()
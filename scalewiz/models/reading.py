@@ -0,0 +1,341 @@
+"""Model objects for a Reading, and a compact series of them."""
+
+from __future__ import annotations
+
+import json
+from array import array
+from dataclasses import dataclass
+from statistics import median
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+# series computed across every pump's pressure at each reading
+AGGREGATES = ("average", "max", "median")
+
+
+def pump_columns(width: int) -> List[str]:
+    """Returns the name of each pump's column, eg. ["pump 1", "pump 2"]."""
+    return [f"pump {number}" for number in range(1, width + 1)]
+
+
+def scorable(width: int) -> List[str]:
+    """Returns the columns a test with this many pumps can be scored on."""
+    return pump_columns(width) + list(AGGREGATES)
+
+
+def score_column(name: str, width: int) -> str:
+    """Returns the column to score a test with this many pumps on, given the one named.
+
+    A pump the test doesn't have, eg. "pump 3" of a test with two, falls back to the
+    average.
+    """
+    index = pump_index(name)
+    if name in AGGREGATES or (index is not None and index < width):
+        return name
+    return "average"
+
+
+def pump_index(name: str) -> Optional[int]:
+    """Returns the 0-based index of a column like "pump 2" or "pump2", else None."""
+    number = name.replace(" ", "")[len("pump") :]  # noqa: E203
+    if name.startswith("pump") and number.isdigit() and int(number) > 0:
+        return int(number) - 1
+    return None
+
+
+@dataclass
+class Reading:
+    """The pressure of every pump in a system at one point in a test."""
+
+    elapsedMin: float
+    pressures: Tuple[Union[float, int], ...]
+
+    @property
+    def average(self) -> int:
+        """Returns the mean pressure, rounded."""
+        return round(sum(self.pressures) / len(self.pressures))
+
+    @property
+    def max(self) -> Union[float, int]:
+        """Returns the highest pressure."""
+        return max(self.pressures)
+
+    @property
+    def median(self) -> int:
+        """Returns the median pressure, rounded."""
+        return round(median(self.pressures))
+
+    def get(self, column: str) -> Union[float, int]:
+        """Returns a pump's pressure or an aggregate, eg. "pump 2" or "average"."""
+        index = pump_index(column)
+        if index is not None:
+            return self.pressures[index]
+        if column == "elapsedMin":
+            return self.elapsedMin
+        if column in AGGREGATES:
+            return getattr(self, column)
+        raise KeyError(column)
+
+
+class ReadingSeries:
+    """A compact collection of Readings.
+
+    Each reading is stored as a fixed-width row of pressures, one per pump, in a flat
+    `array`, with the elapsed times in a column of their own. A long test costs a few
+    bytes per reading instead of a few hundred, and the rows can be viewed as a 2-D
+    numpy array so that the aggregate series are computed in one pass.
+
+    Pressures are stored as C ints, and widened to doubles if a pump ever reports a
+    fractional pressure (eg. in units other than psi).
+
+    Appending is safe to do from one thread while others read. The elapsed time is
+    appended after the pressures, so `len` only counts complete readings, and every
+    method that reads the pressures copies only that many rows. Nothing keeps a
+    buffer exported from the arrays, which would keep them from growing.
+    """
+
+    __slots__ = ("width", "elapsed", "pressures")
+
+    def __init__(self, readings: Iterable[Reading] = (), width: int = 2) -> None:
+        """Initializes a ReadingSeries.
+
+        Args:
+            readings (Iterable[Reading], optional): readings to start with.
+            width (int, optional): how many pumps each reading has. An empty series
+                takes the width of the first readings added to it. Defaults to 2.
+        """
+        self.width = width
+        self.elapsed = array("d")
+        self.pressures = array("i")
+        self.extend(readings)
+
+    def add(self, elapsed: float, pressures: Sequence[Union[float, int]]) -> None:
+        """Appends a reading from its values."""
+        if len(self) == 0:
+            self.width = len(pressures)
+        elif len(pressures) != self.width:
+            raise ValueError(f"Expected {self.width} pressures, got {len(pressures)}")
+        if self.pressures.typecode == "i" and not all(
+            float(psi).is_integer() for psi in pressures
+        ):
+            self.pressures = array("d", self.pressures)
+        if self.pressures.typecode == "i":
+            self.pressures.extend(int(psi) for psi in pressures)
+        else:
+            self.pressures.extend(pressures)
+        self.elapsed.append(elapsed)
+
+    def append(self, reading: Reading) -> None:
+        """Appends a Reading."""
+        self.add(reading.elapsedMin, reading.pressures)
+
+    def extend(self, readings: Iterable[Reading]) -> None:
+        """Appends each of the passed Readings."""
+        if isinstance(readings, ReadingSeries):
+            other = readings.snapshot()
+            if len(other) == 0:
+                return
+            if len(self) == 0:
+                self.width = other.width
+            elif other.width != self.width:
+                raise ValueError(f"Expected {self.width} pressures, got {other.width}")
+            addition = other.pressures
+            if self.pressures.typecode != addition.typecode:  # one was widened
+                self.pressures = array("d", self.pressures)
+                addition = array("d", addition)
+            self.pressures.extend(addition)
+            self.elapsed.extend(other.elapsed)
+            return
+        for reading in readings:
+            self.append(reading)
+
+    def clear(self) -> None:
+        """Removes every reading."""
+        del self.elapsed[:]
+        del self.pressures[:]
+
+    def matrix(self, start: int = 0, stop: int = None) -> np.ndarray:
+        """Returns a copy of the pressures as a 2-D array, with a row per reading.
+
+        Args:
+            start (int, optional): the first reading. Defaults to 0.
+            stop (int, optional): the reading to stop before. Defaults to the end.
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        rows = self.pressures[start * self.width : stop * self.width]  # noqa: E203
+        dtype = np.int32 if rows.typecode == "i" else np.float64
+        return np.array(rows, dtype=dtype).reshape(-1, self.width)
+
+    def column(self, name: str, start: int = 0, stop: int = None) -> array:
+        """Returns a pump's pressures, an aggregate of them, or the elapsed times.
+
+        The elapsed times are returned without copying them. Every other column is
+        computed into a new array.
+
+        Args:
+            name (str): eg. "pump 1", "pump1", "average", "max", "median", "elapsed",
+                or "elapsedMin"
+            start (int, optional): the first reading. Defaults to 0.
+            stop (int, optional): the reading to stop before. Defaults to the end.
+        """
+        if name in ("elapsed", "elapsedMin"):
+            if start == 0 and stop is None:
+                return self.elapsed
+            return self.elapsed[start:stop]
+        matrix = self.matrix(start, stop)
+        index = pump_index(name)
+        if index is not None:
+            values = matrix[:, index]
+        elif name == "average":
+            values = np.rint(matrix.mean(axis=1)).astype(np.int32)
+        elif name == "max":
+            values = matrix.max(axis=1)
+        elif name == "median":
+            values = np.rint(np.median(matrix, axis=1)).astype(np.int32)
+        else:
+            raise KeyError(name)
+        typecode = "i" if values.dtype == np.int32 else "d"
+        return array(typecode, np.ascontiguousarray(values).tobytes())
+
+    def snapshot(self) -> ReadingSeries:
+        """Returns a copy of the complete readings, safe to use while this grows."""
+        count = len(self)
+        copy = ReadingSeries(width=self.width)
+        copy.pressures = self.pressures[: count * self.width]
+        copy.elapsed = self.elapsed[:count]
+        return copy
+
+    def __len__(self) -> int:
+        return len(self.elapsed)
+
+    def __iter__(self) -> Iterator[Reading]:
+        """Yields a Reading for each row, for code that expects a list of them."""
+        for elapsed, pressures in self.rows():
+            yield Reading(elapsed, pressures)
+
+    def __getitem__(self, i: int) -> Reading:
+        i = range(len(self))[i]
+        start, stop = i * self.width, (i + 1) * self.width
+        return Reading(self.elapsed[i], tuple(self.pressures[start:stop]))
+
+    def __repr__(self) -> str:
+        return f"ReadingSeries({len(self)} readings of {self.width} pumps)"
+
+    def to_dicts(self) -> List[Dict[str, Union[float, int]]]:
+        """Returns the readings as dicts, as they are stored in a project file.
+
+        The average is stored too, for older versions that expect it.
+        """
+        names = pump_columns(self.width)
+        averages = self.column("average")
+        return [
+            {
+                **dict(zip(names, pressures)),
+                "average": average,
+                "elapsedMin": elapsed,
+            }
+            for (elapsed, pressures), average in zip(self.rows(), averages)
+        ]
+
+    def load_dicts(self, entries: Iterable[Dict[str, Union[float, int]]]) -> None:
+        """Appends readings from dicts, as they are stored in a project file."""
+        entries = list(entries)
+        if len(entries) == 0:
+            return
+        # every reading in a test has the same pumps
+        names = [key for key in entries[0] if pump_index(key) is not None]
+        names.sort(key=pump_index)
+        # converted all at once, rather than a reading at a time with add
+        matrix = np.array(
+            [[entry[name] for name in names] for entry in entries], dtype=np.float64
+        )
+        if not np.isfinite(matrix).all():  # eg. a null, which converts to nan
+            raise ValueError("Every pressure must be a number")
+        loaded = ReadingSeries(width=len(names))
+        loaded.elapsed = array("d", [entry["elapsedMin"] for entry in entries])
+        if np.array_equal(matrix, np.trunc(matrix)):
+            loaded.pressures = array("i", matrix.astype(np.int32).tobytes())
+        else:
+            loaded.pressures = array("d", matrix.tobytes())
+        self.extend(loaded)
+
+    def weights(self, interval: float) -> List[float]:
+        """Returns how many reading intervals each reading stands for.
+
+        Each reading stands for the time until the next one was taken, and the last
+        one for as long as the one before it. Readings taken on a fixed interval each
+        stand for about 1, so they score the same as they would by counting them.
+
+        Args:
+            interval (float): the project's reading interval, in seconds
+        """
+        count = len(self)
+        if count == 0:
+            return []
+        minutes = interval / 60
+        weights = []
+        for i in range(count - 1):
+            gap = self.elapsed[i + 1] - self.elapsed[i]
+            # readings from before timestamps were reliable count as one interval
+            weights.append(gap / minutes if gap > 0 else 1.0)
+        weights.append(weights[-1] if weights else 1.0)
+        return weights
+
+    def rows(self) -> Iterator[Tuple[float, Tuple[Union[float, int], ...]]]:
+        """Yields each reading as a tuple of (elapsed, pressures)."""
+        count, width = len(self), self.width
+        pressures = self.pressures[: count * width]
+        for i in range(count):
+            start, stop = i * width, (i + 1) * width
+            yield self.elapsed[i], tuple(pressures[start:stop])
+
+
+class InlineReadings:
+    """A test's readings as the JSON text they were saved as, parsed on first use.
+
+    The readings are a span of a larger text, usually their test's, which is shared
+    rather than copied. Each reading is a JSON object of numbers, so counting the
+    braces counts them without parsing anything.
+    """
+
+    __slots__ = ("text", "start", "stop", "count")
+
+    def __init__(
+        self, text: str, start: int = 0, stop: int = None, count: int = None
+    ) -> None:
+        """Initializes InlineReadings.
+
+        Args:
+            text (str): text holding the readings' JSON array
+            start (int, optional): the index of the array's [. Defaults to 0.
+            stop (int, optional): the index after its ]. Defaults to the end.
+            count (int, optional): how many readings there are, if already known.
+                Defaults to None, which counts them.
+        """
+        self.text = text
+        self.start = start
+        self.stop = len(text) if stop is None else stop
+        if count is None:
+            count = text.count("{", self.start, self.stop)
+        self.count: int = count
+
+    def load(self) -> ReadingSeries:
+        """Parses the readings.
+
+        Raises:
+            ValueError: if the text isn't a JSON array of readings
+        """
+        readings = ReadingSeries()
+        text = self.text[self.start : self.stop]  # noqa: E203
+        try:
+            readings.load_dicts(json.loads(text))
+        except (KeyError, TypeError, AttributeError) as err:
+            raise ValueError(f"Couldn't parse the readings: {err!r}") from err
+        return readings
+
+    def __repr__(self) -> str:
+        return f"InlineReadings({self.count} readings)"
@@ -0,0 +1,115 @@
+"""A ring buffer of Readings in shared memory, for passing them between processes."""
+
+from __future__ import annotations
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING
+
+from scalewiz.models.reading import Reading
+
+if TYPE_CHECKING:
+    from typing import List, Tuple, Union
+
+# int64 status fields at the start of the block
+HEADER = ("count", "state", "uptake", "completed")
+
+# values of the "state" field
+STARTING, UPTAKE, READING, DONE, FAILED = range(5)
+
+
+class ReadingRing:
+    """A fixed number of Reading slots in a block of shared memory.
+
+    Meant for exactly one writer and one reader. Reading `n` is stored in slot
+    `n % capacity`, and the writer fills the slot before bumping the `count` field, so
+    the reader only ever copies finished slots. A reader that falls a whole ring behind
+    loses the oldest readings, whose slots may be being refilled, and is told how many.
+
+    Each slot holds a reading's elapsedMin followed by each pump's pressure, all as
+    float64.
+
+    The shared memory can't be mapped read-only from Python, so the reading side
+    simply never writes to the slots.
+    """
+
+    def __init__(self, capacity: int = 1024, name: str = None, width: int = 2) -> None:
+        """Makes a new ring, or attaches to an existing one if a name is passed.
+
+        Args:
+            capacity (int, optional): number of slots. Must match the writer's when
+                attaching. Defaults to 1024.
+            name (str, optional): name of the shared memory to attach to.
+                Defaults to None.
+            width (int, optional): number of pumps in each reading. Must match the
+                writer's when attaching. Defaults to 2.
+        """
+        self.capacity = capacity
+        self.width = width
+        self.fields = width + 1  # the elapsed time, then the pressures
+        header_size = 8 * len(HEADER)
+        size = header_size + 8 * self.fields * capacity
+        self.owner = name is None
+        self.shm = SharedMemory(name=name, create=self.owner, size=size)
+        self.header = self.shm.buf[:header_size].cast("q")
+        self.slots = self.shm.buf[header_size:size].cast("d")
+        self.read_count: int = 0  # readings the reader has taken so far
+
+    @property
+    def name(self) -> str:
+        """Returns the name that other processes can attach with."""
+        return self.shm.name
+
+    def get(self, field: str) -> int:
+        """Returns the value of a header field."""
+        return self.header[HEADER.index(field)]
+
+    def set(self, field: str, value: int) -> None:
+        """Sets the value of a header field."""
+        self.header[HEADER.index(field)] = value
+
+    def append(self, reading: Reading) -> None:
+        """Writes a Reading to the next slot."""
+        count = self.header[0]
+        i = (count % self.capacity) * self.fields
+        self.slots[i] = reading.elapsedMin
+        for j, psi in enumerate(reading.pressures, start=i + 1):
+            self.slots[j] = psi
+        self.header[0] = count + 1  # publish the slot
+
+    def read_new(self) -> Tuple[List[Reading], int]:
+        """Returns the Readings written since the last call, and how many were lost."""
+        count = self.header[0]
+        lost = 0
+        # the writer fills the slot of reading `count - capacity` before it publishes
+        # reading `count`, so that one may be half written already
+        if count - self.read_count >= self.capacity:  # the writer lapped us
+            lost = count + 1 - self.capacity - self.read_count
+            self.read_count = count + 1 - self.capacity
+        readings = []
+        for n in range(self.read_count, count):
+            i = (n % self.capacity) * self.fields
+            elapsed, *pressures = self.slots[i : i + self.fields]  # noqa: E203
+            readings.append(
+                Reading(elapsedMin=elapsed, pressures=tuple(map(_number, pressures)))
+            )
+        # anything overwritten while we were copying is torn, so drop it, as well as
+        # the slot being written now
+        overwritten = self.header[0] + 1 - self.capacity - self.read_count
+        if overwritten > 0:
+            readings = readings[overwritten:]
+            lost += overwritten
+        self.read_count = count
+        return readings, lost
+
+    def close(self) -> None:
+        """Releases this process's view of the shared memory."""
+        self.header.release()
+        self.slots.release()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _number(value: float) -> Union[float, int]:
+    """Returns whole numbers as ints, since the pressures usually are."""
+    return int(value) if value.is_integer() else value
@@ -0,0 +1,134 @@
+"""Adaptive sampling, which spends a test's readings where the pressure is changing.
+
+With `sampling.mode = "adaptive"`, readings are taken less often while the pressure is
+flat near where the test started, and more often while it is climbing. The test never
+takes more readings than it would at the project's fixed interval, and the interval is
+never shortened so far that the readings would run out before the time limit.
+
+Since the readings are no longer evenly spaced, tests are scored by weighting each
+reading by the time it stands for; see `ReadingSeries.weights`.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import scalewiz
+
+if TYPE_CHECKING:
+    from typing import Sequence
+
+    from scalewiz.models.reading import ReadingSeries
+
+MODES = ("fixed", "adaptive")
+
+
+def get_sampling_mode() -> str:
+    """Returns the configured sampling mode."""
+    mode = str(scalewiz.CONFIG["sampling"]["mode"]).strip().lower()
+    return mode if mode in MODES else "fixed"
+
+
+class AdaptiveSampler:
+    """Picks the interval until the next reading from how the pressure is changing."""
+
+    BASELINE_READINGS: int = 4  # readings averaged for the test's starting pressure
+    SLOPE_MINUTES: float = 1.0  # how far back the rate of change is fitted over
+
+    def __init__(
+        self,
+        interval: float,
+        limit_minutes: float,
+        max_readings: int,
+        slow_factor: float = 4.0,
+        fast_factor: float = 0.5,
+        rising_psi_per_min: float = 50.0,
+        baseline_band_psi: float = 25.0,
+    ) -> None:
+        """Initializes an AdaptiveSampler.
+
+        Args:
+            interval (float): the project's reading interval, in seconds
+            limit_minutes (float): the test's time limit
+            max_readings (int): the most readings the test may take
+            slow_factor (float, optional): multiplies the interval while the pressure
+                is flat near its baseline. Defaults to 4.0.
+            fast_factor (float, optional): multiplies the interval while the pressure
+                is rising. Defaults to 0.5.
+            rising_psi_per_min (float, optional): the rate of change that counts as
+                rising. Defaults to 50.0.
+            baseline_band_psi (float, optional): how far above its starting pressure a
+                test still counts as near its baseline. Defaults to 25.0.
+        """
+        self.interval = interval
+        self.limit_minutes = limit_minutes
+        self.max_readings = max_readings
+        self.slow_factor = max(1.0, slow_factor)
+        self.fast_factor = min(1.0, max(0.01, fast_factor))
+        self.rising_psi_per_min = rising_psi_per_min
+        self.baseline_band_psi = baseline_band_psi
+        self.baseline: float = None  # found from the first few readings
+
+    @classmethod
+    def from_config(
+        cls, interval: float, limit_minutes: float, max_readings: int
+    ) -> AdaptiveSampler:
+        """Returns an AdaptiveSampler using the settings from the config file."""
+        settings = scalewiz.CONFIG["sampling"]
+        return cls(
+            interval,
+            limit_minutes,
+            max_readings,
+            slow_factor=float(settings["slow_factor"]),
+            fast_factor=float(settings["fast_factor"]),
+            rising_psi_per_min=float(settings["rising_psi_per_min"]),
+            baseline_band_psi=float(settings["baseline_band_psi"]),
+        )
+
+    def next_interval(self, readings: ReadingSeries) -> float:
+        """Returns the seconds to wait before the next reading.
+
+        Args:
+            readings (ReadingSeries): the test's readings so far
+        """
+        count = len(readings)
+        if count < self.BASELINE_READINGS:
+            return self.interval
+        elapsed = readings.elapsed
+        if self.baseline is None:
+            first = readings.column("max", stop=self.BASELINE_READINGS)
+            self.baseline = sum(first) / len(first)
+
+        # fit the readings from the last SLOPE_MINUTES, or at least the last three
+        start = count - 1
+        since = elapsed[count - 1] - self.SLOPE_MINUTES
+        while start > 0 and elapsed[start - 1] >= since:
+            start -= 1
+        start = min(start, count - 3)
+        times = elapsed[start:count]
+        # any pump scaling up is what we want to catch
+        pressures = readings.column("max", start, count)
+
+        if slope(times, pressures) >= self.rising_psi_per_min:
+            interval = self.interval * self.fast_factor
+        elif pressures[-1] <= self.baseline + self.baseline_band_psi:
+            interval = self.interval * self.slow_factor
+        else:
+            interval = self.interval
+
+        # spread whatever readings are left over the time that's left
+        remaining_readings = self.max_readings - count
+        remaining_seconds = (self.limit_minutes - elapsed[count - 1]) * 60
+        if remaining_readings > 0 and remaining_seconds > 0:
+            interval = max(interval, remaining_seconds / remaining_readings)
+        return interval
+
+
+def slope(times: Sequence[float], values: Sequence[float]) -> float:
+    """Returns the least squares slope of some values over time."""
+    mean_t = sum(times) / len(times)
+    mean_v = sum(values) / len(values)
+    spread = sum((t - mean_t) ** 2 for t in times)
+    if spread == 0:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / spread
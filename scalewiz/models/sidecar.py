@@ -0,0 +1,239 @@
+"""Stores tests' readings in a compact binary file beside their project file.
+
+A project saved with `readingsFile` set keeps each test's metadata in its JSON as
+usual, but swaps the test's `readings` array for a `readingsRef` to a block of the
+sidecar file. Each block is laid out to be memory mapped and decoded with numpy:
+
+- a 16 byte header: the magic `SWRB`, a format version, the number of pumps, the
+  type code of the pressures, a pad byte, the number of readings, and a CRC-32 of the
+  rest of the block
+- the elapsed minutes of each reading, as little-endian doubles
+- the pressures, row by row. Whole pressures are delta-encoded down each pump's
+  column, in the narrowest of int8, int16, or int32 that fits the deltas. Fractional
+  pressures are stored as doubles.
+- zeros, up to a multiple of 8 bytes
+
+Blocks are only ever appended, and never changed, so the file is fsynced before the
+project that points into it is written, and an interrupted save can't harm the tests
+that were already stored. A test whose readings change gets a new block, and the
+old one is left behind until the project is converted to JSON and back.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from array import array
+from logging import getLogger
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from scalewiz.models.reading import ReadingSeries
+
+if TYPE_CHECKING:
+    from typing import Dict, Union
+
+LOGGER = getLogger("scalewiz.sidecar")
+
+SUFFIX = ".readings"
+MAGIC = b"SWRB"
+VERSION = 1
+# magic, version, pumps, type code, pad byte, readings, CRC-32
+HEADER = struct.Struct("<4sBBcxII")
+ALIGN = 8  # every block starts on a multiple of this
+# little-endian numpy dtypes for the pressures, by type code
+DTYPES = {b"b": "<i1", b"h": "<i2", b"i": "<i4", b"d": "<f8"}
+
+
+def sidecar_for(project_path: Union[str, Path]) -> Path:
+    """Returns the default path of a project's sidecar file."""
+    return Path(project_path).with_suffix(SUFFIX)
+
+
+def encode(readings: ReadingSeries) -> bytes:
+    """Returns a block storing the passed readings."""
+    readings = readings.snapshot()
+    count, width = len(readings), readings.width
+    elapsed = np.frombuffer(readings.elapsed, dtype=np.float64).astype("<f8")
+    matrix = readings.matrix()
+    values = matrix.astype("<f8")
+    code = b"d"
+    if matrix.dtype.kind == "i":
+        # the first row is stored as is, and each after it as the change from the last
+        first = np.zeros((1, width), dtype=np.int64)
+        deltas = np.diff(matrix.astype(np.int64), axis=0, prepend=first)
+        low, high = (deltas.min(), deltas.max()) if count else (0, 0)
+        for candidate in (b"b", b"h", b"i"):
+            limits = np.iinfo(DTYPES[candidate])
+            if limits.min <= low and high <= limits.max:
+                code, values = candidate, deltas.astype(DTYPES[candidate])
+                break
+    payload = elapsed.tobytes() + values.tobytes()
+    header = HEADER.pack(MAGIC, VERSION, width, code, count, zlib.crc32(payload))
+    return header + payload + bytes(-len(payload) % ALIGN)
+
+
+def decode(buffer: mmap, offset: int, count: int, width: int) -> ReadingSeries:
+    """Returns the readings stored in the block at an offset of a sidecar file.
+
+    Raises:
+        ValueError: if the block is missing, damaged, or isn't the one expected
+    """
+    if offset < 0 or offset + HEADER.size > len(buffer):
+        raise ValueError(f"No block at offset {offset}")
+    magic, version, stored_width, code, stored_count, crc = HEADER.unpack_from(
+        buffer, offset
+    )
+    if magic != MAGIC or version > VERSION or code not in DTYPES:
+        raise ValueError(f"No block at offset {offset}")
+    if (stored_count, stored_width) != (count, width):
+        raise ValueError(
+            f"Expected {count} readings of {width} pumps at offset {offset}, "
+            f"found {stored_count} of {stored_width}"
+        )
+    start = offset + HEADER.size
+    dtype = np.dtype(DTYPES[code])
+    end = start + 8 * count + dtype.itemsize * count * width
+    if end > len(buffer):
+        raise ValueError(f"The block at offset {offset} was cut short")
+    with memoryview(buffer) as view:
+        if zlib.crc32(view[start:end]) != crc:
+            raise ValueError(f"The block at offset {offset} is damaged")
+        elapsed = np.frombuffer(view, dtype="<f8", count=count, offset=start)
+        rows = np.frombuffer(
+            view, dtype=dtype, count=count * width, offset=start + 8 * count
+        ).reshape(count, width)
+        # both are copied out of the mapping, which may be closed after this returns
+        series = ReadingSeries(width=width)
+        series.elapsed = array("d", elapsed.astype(np.float64).tobytes())
+        if code == b"d":
+            series.pressures = array("d", rows.astype(np.float64).tobytes())
+        else:
+            pressures = np.cumsum(rows, axis=0, dtype=np.int64).astype(np.int32)
+            series.pressures = array("i", pressures.tobytes())
+        del elapsed, rows  # release the view before the mapping goes
+    return series
+
+
+class StoredReadings:
+    """Where a test's readings are stored in a sidecar file."""
+
+    __slots__ = ("path", "offset", "count", "width")
+
+    def __init__(self, path: Path, offset: int, count: int, width: int) -> None:
+        self.path = Path(path)
+        self.offset = offset
+        self.count = count
+        self.width = width
+
+    @classmethod
+    def from_ref(cls, path: Path, ref: Dict[str, int]) -> StoredReadings:
+        """Returns StoredReadings from a test's `readingsRef` in a project file."""
+        return cls(path, int(ref["offset"]), int(ref["count"]), int(ref["width"]))
+
+    def to_ref(self) -> Dict[str, int]:
+        """Returns the `readingsRef` to store with the test in its project file."""
+        return {"offset": self.offset, "count": self.count, "width": self.width}
+
+    def load(self) -> ReadingSeries:
+        """Reads the readings from the sidecar file.
+
+        Raises:
+            OSError: if the file couldn't be read
+            ValueError: if the readings aren't there, or are damaged
+        """
+        with self.path.open("rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:  # which can't be mapped
+                raise ValueError(f"{self.path} is empty")
+            with mmap(file.fileno(), 0, access=ACCESS_READ) as buffer:
+                return decode(buffer, self.offset, self.count, self.width)
+
+    def __repr__(self) -> str:
+        return (
+            f"StoredReadings({self.path.name} @ {self.offset}, "
+            f"{self.count} readings of {self.width} pumps)"
+        )
+
+
+def append(path: Union[str, Path], readings: ReadingSeries) -> StoredReadings:
+    """Appends a block of readings to a sidecar file, syncing it to the disk."""
+    path = Path(path)
+    block = encode(readings)
+    with path.open("ab") as file:
+        pad = -file.seek(0, os.SEEK_END) % ALIGN  # eg. after an interrupted write
+        file.write(bytes(pad) + block)
+        file.flush()
+        os.fsync(file.fileno())
+        offset = file.tell() - len(block)
+    _, _, width, _, count, _ = HEADER.unpack_from(block)
+    return StoredReadings(path, offset, count, width)
+
+
+def store_test(test: dict, sidecar: Path) -> None:
+    """Moves a test dict's `readings` into the sidecar, in place."""
+    if "readings" not in test:
+        return
+    readings = ReadingSeries()
+    readings.load_dicts(test.pop("readings"))
+    if len(readings) > 0:  # as Test.update_obs_baseline, so they can be shown unread
+        pressures = readings.column(test.get("toConsider", "pump 1"))
+        test["obsBaseline"] = round(sum(pressures[0:4]) / 4)
+        test["maxPsi"] = max(pressures)
+    test["readingsRef"] = append(sidecar, readings).to_ref()
+
+
+def inline_test(test: dict, sidecar: Path) -> None:
+    """Moves a test dict's readings out of the sidecar and into it, in place."""
+    if "readingsRef" not in test:
+        return
+    stored = StoredReadings.from_ref(sidecar, test.pop("readingsRef"))
+    test["readings"] = stored.load().to_dicts()
+
+
+def convert(path: Union[str, Path], to: str) -> int:
+    """Converts a project file to store its readings as "binary" or "json".
+
+    Converting to binary appends each test's readings to a sidecar file beside the
+    project. Converting to JSON puts them back in the project file, leaving the
+    sidecar where it is. Either way, the project file is only replaced once every
+    test has been converted.
+
+    Returns:
+        int: the number of tests converted
+
+    Raises:
+        OSError: if a file couldn't be read or written
+        ValueError: if `to` isn't known, or some stored readings were damaged
+    """
+    path = Path(path).resolve()
+    with path.open("r") as file:
+        project = json.load(file)
+    name = project.get("readingsFile")
+    if to == "binary":
+        sidecar = path.with_name(name) if name else sidecar_for(path)
+        project["readingsFile"] = sidecar.name
+        key, move = "readings", store_test
+    elif to == "json":
+        if not name:
+            return 0
+        sidecar = path.with_name(name)
+        del project["readingsFile"]
+        key, move = "readingsRef", inline_test
+    else:
+        raise ValueError(f'Convert to "binary" or "json", not "{to}"')
+    converted = 0
+    for test in project["tests"]:
+        if key in test:
+            move(test, sidecar)
+            converted += 1
+    temp = path.with_name(f"{path.name}.tmp")
+    with temp.open("w") as file:
+        json.dump(project, file, indent=4)
+    os.replace(temp, path)
+    LOGGER.info("Converted %s tests in %s to %s", converted, path, to)
+    return converted
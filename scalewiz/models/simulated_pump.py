@@ -0,0 +1,251 @@
+"""A simulated MX-class pump, for running ScaleWiz without any hardware attached.
+
+The simulation speaks the same serial protocol as the real pumps, so it is driven
+through an unmodified `py_hplc.NextGenPump`. It can be attached in-process, by
+handing the pump a `SimulatedSerial`, or over a pseudo-terminal with `PtyPumpServer`,
+which exercises the operating system's serial stack as well.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from logging import getLogger
+from math import exp
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+from typing import TYPE_CHECKING
+
+from serial.serialutil import PortNotOpenError, SerialBase
+
+if TYPE_CHECKING:
+    from typing import Optional
+
+LOGGER = getLogger("scalewiz.simulation")
+
+
+class SimulatedPump:
+    """The state and pressure curve of a simulated pump.
+
+    While running, the pressure holds near a baseline until `onset_minutes` have
+    passed, then climbs exponentially as scale builds up in the capillary.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.03,
+        baseline: int = 30,
+        noise: float = 2.0,
+        onset_minutes: float = 5.0,
+        growth: float = 0.5,
+        failure_rate: float = 0.0,
+        stall_rate: float = 0.0,
+        stall_seconds: float = 5.0,
+        max_pressure: int = 10000,
+    ) -> None:
+        self.name = name
+        self.latency = latency
+        self.baseline = baseline
+        self.noise = noise
+        self.growth = growth
+        self.failure_rate = failure_rate
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.max_pressure = max_pressure
+        self.rng = random.Random(name)  # reproducible per port
+        # stagger the onset a little so that every pump isn't identical
+        self.onset_minutes = onset_minutes * self.rng.uniform(0.8, 1.2)
+        self.flowrate: float = 0.01
+        self.is_running: bool = False
+        self.run_started: float = None
+        self.lock = Lock()
+
+    @classmethod
+    def from_config(cls, name: str, settings: dict) -> SimulatedPump:
+        """Makes a SimulatedPump using the config's `simulation` table."""
+        return cls(
+            name,
+            latency=float(settings["latency"]),
+            baseline=int(settings["baseline"]),
+            noise=float(settings["noise"]),
+            onset_minutes=float(settings["onset_minutes"]),
+            growth=float(settings["growth"]),
+            failure_rate=float(settings["failure_rate"]),
+            stall_rate=float(settings["stall_rate"]),
+            stall_seconds=float(settings["stall_seconds"]),
+        )
+
+    @property
+    def pressure(self) -> int:
+        """Returns the current pressure in psi."""
+        if not self.is_running:
+            return 0
+        minutes = (monotonic() - self.run_started) / 60
+        psi = self.baseline
+        if minutes > self.onset_minutes:
+            psi += 10 * (exp(self.growth * (minutes - self.onset_minutes)) - 1)
+        psi += self.rng.gauss(0, self.noise)
+        return max(0, min(round(psi), self.max_pressure))
+
+    def delay(self) -> float:
+        """Returns how long the pump should take to respond to the next command."""
+        if self.stall_rate > 0 and self.rng.random() < self.stall_rate:
+            LOGGER.debug("%s: injecting a %s s stall", self.name, self.stall_seconds)
+            return self.stall_seconds
+        return self.latency
+
+    def respond(self, command: str) -> Optional[str]:
+        """Returns the pump's response to a command, or None if it was dropped."""
+        if self.failure_rate > 0 and self.rng.random() < self.failure_rate:
+            LOGGER.debug("%s: dropping command %s", self.name, command)
+            return None
+        with self.lock:
+            return self._respond(command.strip())
+
+    def _respond(self, command: str) -> str:
+        # pylint: disable=too-many-return-statements
+        running = int(self.is_running)
+        if command == "pr":
+            return f"OK,{self.pressure}/"
+        if command == "cc":
+            return f"OK,{self.pressure},{self.flowrate:.2f}/"
+        if command == "cs":
+            return f"OK,{self.flowrate:.2f},{self.max_pressure},0,psi,0,{running},0/"
+        if command == "pi":
+            return f"OK,{self.flowrate:.2f},{running},0,SS,0,1,0,0,0,0,0,1,0,0,0,0,0/"
+        if command == "ru":
+            if not self.is_running:
+                self.is_running = True
+                self.run_started = monotonic()
+            return "OK/"
+        if command == "st":
+            self.is_running = False
+            return "OK/"
+        if command.startswith("fi"):
+            # mirrors NextGenPump.flowrate, which sends mL/min * 100 as an int
+            self.flowrate = int(command[2:]) / 100
+            return "OK/"
+        if command == "mf":
+            return "OK,MF:10.00/"
+        if command == "mp":
+            return f"OK,MP:{self.max_pressure}/"
+        if command == "pu":
+            return "OK,psi/"
+        if command == "id":
+            return f"OK,SIM Version 1.0 {self.name}/"
+        if command == "#":
+            return ""
+        return "OK/" if command else "Er/"
+
+
+class SimulatedSerial(SerialBase):
+    """An in-process serial port with a SimulatedPump on the other end."""
+
+    def __init__(self, pump: SimulatedPump, **kwargs) -> None:
+        self.pump = pump
+        self._buffer = bytearray()
+        self._pending = bytearray()
+        self._ready_at: float = 0.0
+        super().__init__(**kwargs)
+        self.port = pump.name
+
+    def open(self) -> None:
+        """Opens the port."""
+        self.is_open = True
+
+    def close(self) -> None:
+        """Closes the port."""
+        self.is_open = False
+
+    def _reconfigure_port(self, force_update: bool = False) -> None:
+        pass  # there are no real port settings to apply
+
+    @property
+    def in_waiting(self) -> int:
+        """Returns the number of bytes the pump has sent that haven't been read."""
+        return len(self._buffer) if monotonic() >= self._ready_at else 0
+
+    def reset_input_buffer(self) -> None:
+        """Discards anything the pump sent that hasn't been read."""
+        self._buffer.clear()
+
+    def reset_output_buffer(self) -> None:
+        """Discards any partial command."""
+        self._pending.clear()
+
+    def write(self, data: bytes) -> int:
+        """Sends bytes to the simulated pump."""
+        if not self.is_open:
+            raise PortNotOpenError()
+        self._pending.extend(data)
+        while b"\r" in self._pending:
+            command, _, rest = bytes(self._pending).partition(b"\r")
+            self._pending = bytearray(rest)
+            response = self.pump.respond(command.decode())
+            if response is not None:
+                self._buffer.extend(response.encode())
+                self._ready_at = monotonic() + self.pump.delay()
+        return len(data)
+
+    def read(self, size: int = 1) -> bytes:
+        """Reads up to `size` bytes, waiting for the pump to respond if need be."""
+        if not self.is_open:
+            raise PortNotOpenError()
+        if not self._buffer:
+            if self.timeout:
+                sleep(self.timeout)  # nothing is coming, so behave like a timeout
+            return b""
+        wait = self._ready_at - monotonic()
+        if wait > 0:
+            sleep(wait)  # deliberately ignores the timeout, like a hung driver would
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+class PtyPumpServer:
+    """Serves a SimulatedPump on a pseudo-terminal, which acts as a virtual serial port.
+
+    Only available on POSIX systems. The `port` attribute is the path of the slave
+    end, which can be opened like any other serial device.
+    """
+
+    def __init__(self, pump: SimulatedPump) -> None:
+        import pty  # pylint: disable=import-outside-toplevel
+        import tty  # pylint: disable=import-outside-toplevel
+
+        self.pump = pump
+        self.master, self.slave = pty.openpty()
+        tty.setraw(self.slave)  # no echo, no line discipline
+        self.port: str = os.ttyname(self.slave)
+        self.stopped = Event()
+        self.thread = Thread(target=self.serve, name=f"pty-{pump.name}", daemon=True)
+        self.thread.start()
+        LOGGER.info("Serving %s at %s", pump.name, self.port)
+
+    def serve(self) -> None:
+        """Answers commands from the master end until stopped."""
+        pending = b""
+        while not self.stopped.is_set():
+            try:
+                pending += os.read(self.master, 1024)
+            except OSError:
+                break
+            while b"\r" in pending:
+                command, _, pending = pending.partition(b"\r")
+                response = self.pump.respond(command.decode())
+                if response:
+                    sleep(self.pump.delay())
+                    os.write(self.master, response.encode())
+
+    def close(self) -> None:
+        """Stops serving and releases the pseudo-terminal."""
+        self.stopped.set()
+        for descriptor in (self.slave, self.master):
+            try:
+                os.close(descriptor)
+            except OSError:
+                pass
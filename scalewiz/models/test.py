@@ -4,53 +4,104 @@ from __future__ import annotations
 
 # util
 import logging
-import tkinter as tk
-from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
+from scalewiz.models.reading import InlineReadings, ReadingSeries, score_column
+from scalewiz.models.sidecar import StoredReadings
+from scalewiz.models.value import BooleanValue, DoubleValue, IntValue, StringValue
+
 if TYPE_CHECKING:
-    from typing import List, Tuple, Union
+    from array import array
+    from pathlib import Path
+    from typing import List, Optional, Union
 
 LOGGER = logging.getLogger("scalewiz")
 
 
-@dataclass
-class Reading:
-    elapsedMin: float
-    pump1: int
-    pump2: int
-    average: int
-
-
 class Test:
-    """Object for holding all the data associated with a Test."""
+    """Object for holding all the data associated with a Test.
+
+    Made of Values rather than tkinter variables, so it can be used without a Tk
+    interpreter, from any thread. See `scalewiz.helpers.tk_binding` to show one.
+    """
 
     # pylint: disable=too-many-instance-attributes
 
-    def __init__(self, data: dict = None) -> None:
-        self.is_blank = tk.BooleanVar()  # boolean for blank vs chemical trial
-        self.name = tk.StringVar()  # identifier for the test
-        self.chemical = tk.StringVar()  # chemical, if any, to be tested
-        self.rate = tk.DoubleVar()  # the treating rate of the test
-        self.label = tk.StringVar()  # how the test will be labeled on the report/plot
-        self.clarity = tk.StringVar()  # the clarity of the treated water
-        self.notes = tk.StringVar()  # misc notes on the experiment
-        self.pump_to_score = tk.StringVar()  # which series of PSIs to use
-        self.result = tk.DoubleVar()  # represents the test's performance vs the blank
-        self.include_on_report = tk.BooleanVar()  # condition for scoring
-        self.readings: List[Reading] = []  # list of flat reading dicts
-        self.max_psi = tk.IntVar()  # the highest psi of the test
-        self.observed_baseline = tk.IntVar()  # a guess at the baseline for the test
+    __slots__ = (
+        "is_blank",
+        "name",
+        "chemical",
+        "rate",
+        "label",
+        "clarity",
+        "notes",
+        "pump_to_score",
+        "result",
+        "include_on_report",
+        "_readings",
+        "source",
+        "max_psi",
+        "observed_baseline",
+        "summarized",
+        "projected_fail_min",
+        "gaps",
+    )
+
+    def __init__(self, data: dict = None, sidecar: Path = None) -> None:
+        self.is_blank = BooleanValue()  # boolean for blank vs chemical trial
+        self.name = StringValue()  # identifier for the test
+        self.chemical = StringValue()  # chemical, if any, to be tested
+        self.rate = DoubleValue()  # the treating rate of the test
+        self.label = StringValue()  # how the test will be labeled on the report/plot
+        self.clarity = StringValue()  # the clarity of the treated water
+        self.notes = StringValue()  # misc notes on the experiment
+        self.pump_to_score = StringValue()  # which series of PSIs to use
+        self.result = DoubleValue()  # represents the test's performance vs the blank
+        self.include_on_report = BooleanValue()  # condition for scoring
+        # the pressures over time, or None until they're read from their source
+        self._readings: Optional[ReadingSeries] = ReadingSeries()
+        # where the readings were loaded from, to be read once they're needed
+        self.source: Union[InlineReadings, StoredReadings] = None
+        self.max_psi = IntValue()  # the highest psi of the test
+        self.observed_baseline = IntValue()  # a guess at the baseline for the test
+        # whether the two above are up to date, without reading the readings
+        self.summarized: bool = True
+        # when the test was projected to fail, if it was stopped early for it
+        self.projected_fail_min = DoubleValue()
+        self.gaps: List[float] = []  # when readings were skipped, in elapsed minutes
         # set defaults
         self.pump_to_score.set("pump 1")
         self.is_blank.set(True)
-        self.add_traces()  # will need to clean these up later for the GC
+        self.add_traces()  # can be removed later with remove_traces
 
         if isinstance(data, dict):
-            self.load_json(data)
+            self.load_json(data, sidecar)
+
+    @property
+    def readings(self) -> ReadingSeries:
+        """Returns the Test's readings, reading them from their source if needed."""
+        if self._readings is None:
+            try:
+                self._readings = self.source.load()
+            except (OSError, ValueError) as err:
+                LOGGER.error(
+                    "Couldn't read the readings of %s: %s", self.name.get(), err
+                )
+                return ReadingSeries()  # try again next time
+            if not self.summarized:
+                self.summarized = True
+                self.update_obs_baseline()
+        return self._readings
+
+    @property
+    def reading_count(self) -> int:
+        """Returns how many readings the Test has, without reading them."""
+        if self._readings is None:
+            return self.source.count
+        return len(self._readings)
 
     def add_traces(self) -> None:
-        """Adds tkVar traces. Need to be removed with remove_traces."""
+        """Adds Value traces. Can be removed with remove_traces."""
         self.chemical.trace_add("write", self.update_test_name)
         self.rate.trace_add("write", self.update_test_name)
         self.name.trace_add("write", self.update_label)
@@ -58,19 +109,13 @@ class Test:
 
     def to_dict(self) -> dict[str, Union[bool, float, int, str]]:
         """Returns a dict representation of a Test."""
-        self.clean_test()  # strip whitespaces from relevant fields
-        # cast all readings from dataclasses to dicts
-        readings = []
-        for reading in self.readings:
-            readings.append(
-                {
-                    "pump 1": reading.pump1,
-                    "pump 2": reading.pump2,
-                    "average": reading.average,
-                    "elapsedMin": reading.elapsedMin,
-                }
-            )
+        test = self.metadata()
+        test["readings"] = self.readings.to_dicts()
+        return test
 
+    def metadata(self) -> dict[str, Union[bool, float, int, str]]:
+        """Returns a dict representation of a Test, without its readings."""
+        self.clean_test()  # strip whitespaces from relevant fields
         return {
             "name": self.name.get(),
             "isBlank": self.is_blank.get(),
@@ -83,11 +128,19 @@ class Test:
             "includeOnRep": self.include_on_report.get(),
             "result": self.result.get(),
             "obsBaseline": self.observed_baseline.get(),
-            "readings": readings,
+            "maxPsi": self.max_psi.get(),
+            "projectedFailMin": self.projected_fail_min.get(),
+            "gaps": self.gaps,
         }
 
-    def load_json(self, obj: dict[str, Union[bool, float, int, str]]) -> None:
-        """Load a Test with values from a JSON object."""
+    def load_json(
+        self, obj: dict[str, Union[bool, float, int, str]], sidecar: Path = None
+    ) -> None:
+        """Load a Test with values from a JSON object.
+
+        Readings left as text by `parse_project`, or kept in a sidecar file, aren't
+        read until they're needed. Until then, the stored summary fields are shown.
+        """
         self.name.set(obj["name"])
         self.is_blank.set(obj["isBlank"])
         self.chemical.set(obj["chemical"])
@@ -98,23 +151,29 @@ class Test:
         self.pump_to_score.set(obj["toConsider"])
         self.include_on_report.set(obj["includeOnRep"])
         self.result.set(obj["result"])
-        readings = obj["readings"]
-        for reading in readings:
-            self.readings.append(
-                Reading(
-                    pump1=reading["pump 1"],
-                    pump2=reading["pump 2"],
-                    average=reading["average"],
-                    elapsedMin=reading["elapsedMin"],
-                )
-            )
-        self.update_obs_baseline()
-
-    def get_readings(self) -> Tuple[int]:
-        """Returns a list of the pump_to_score's pressure readings."""
-        pump = self.pump_to_score.get()
-        pump = pump.replace(" ", "")  # legacy accomodation for spaces in keys
-        return [getattr(reading, pump) for reading in self.readings]
+        self.projected_fail_min.set(obj.get("projectedFailMin", 0.0))
+        self.gaps = list(obj.get("gaps", []))
+        if "readingsRef" in obj and sidecar is not None:
+            self.source = StoredReadings.from_ref(sidecar, obj["readingsRef"])
+        elif isinstance(obj["readings"], InlineReadings):
+            self.source = obj["readings"]
+        else:
+            self.readings.load_dicts(obj["readings"])
+            self.update_obs_baseline()
+            return
+        self._readings = None
+        self.observed_baseline.set(obj.get("obsBaseline", 0))
+        self.max_psi.set(obj.get("maxPsi", 0))
+        # older versions didn't store maxPsi, or always keep obsBaseline up to date
+        self.summarized = "maxPsi" in obj
+
+    def get_readings(self) -> array:
+        """Returns the pump_to_score's pressures, or the aggregate of them it names.
+
+        If the Test has no such pump, its average pressures are returned instead.
+        """
+        readings = self.readings
+        return readings.column(score_column(self.pump_to_score.get(), readings.width))
 
     def update_test_name(self, *args) -> None:
         """Makes a name by concatenating the chemical name and rate."""
@@ -144,7 +203,7 @@ class Test:
             self.observed_baseline.set(round(sum(baselines) / 4))
 
     def remove_traces(self) -> None:
-        """Remove tkVar traces to allow the GC to do its thing."""
+        """Removes the Value traces added by add_traces."""
         variables = (self.chemical, self.rate, self.name, self.pump_to_score)
         for var in variables:
             try:
@@ -2,25 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 import tkinter as tk
-from concurrent.futures import ThreadPoolExecutor
-from datetime import date
-from logging import DEBUG, FileHandler, Formatter, getLogger
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from logging import FileHandler, getLogger
 from pathlib import Path
-from queue import Queue
-from time import sleep, time
 from tkinter import filedialog, messagebox
 from typing import TYPE_CHECKING
 
-from py_hplc import NextGenPump
-
 import scalewiz
+from scalewiz.helpers.background_logging import drain, log_in_background
+from scalewiz.helpers.pump_identity import remember
+from scalewiz.helpers.scheduler import Scheduler
+from scalewiz.helpers.update_bus import UpdateBus
+from scalewiz.models.acquisition import Acquisition, make_log_handler, wait_for
+from scalewiz.models.acquisition_process import ProcessAcquisition
+from scalewiz.models.connections import PumpConnections
+from scalewiz.models.engine import AcquisitionEngine, get_engine_name
+from scalewiz.models.journal import (
+    ReadingJournal,
+    discard,
+    find_unfinished,
+    read_journal,
+)
+from scalewiz.models.prediction import FailurePredictor
 from scalewiz.models.project import Project
-from scalewiz.models.test import Reading, Test
+from scalewiz.models.reading import ReadingSeries, score_column
+from scalewiz.models.test import Test
 
 if TYPE_CHECKING:
     from logging import Logger
-    from typing import List, Set, Union
+    from typing import Callable, List, Set, Union
+
+    from scalewiz.models.pump_worker import PumpWorker
+    from scalewiz.models.reading import Reading
+
+MAX_PUMPS: int = 8  # the most pumps a system can be set up with
 
 
 class TestHandler:
@@ -31,63 +48,116 @@ class TestHandler:
     def __init__(self, name: str = "Nemo") -> None:
         self.name = name
         self.root: tk.Tk = scalewiz.ROOT
+        self.bus = UpdateBus.get()  # how the workers update the UI
         self.logger: Logger = getLogger(f"scalewiz.{name}")
+        # the logger only queues records, and its twin writes them out on another
+        # thread, so the readings loop never waits on the disk or the console
+        self.log_output, self.log_listener = log_in_background(self.logger)
         self.project: Project = Project()
         self.test: Test = None
-        self.readings: List[Reading] = []
+        self.readings = ReadingSeries()
         self.max_readings: int = None  # max # of readings to collect
         self.limit_psi: int = None
-        self.max_psi_1: int = None
-        self.max_psi_2: int = None
         self.limit_minutes: float = None
         self.log_handler: FileHandler = None  # handles logging to log window
-        self.log_queue: Queue[str] = Queue()  # view pulls from this queue
-        self.dev1 = tk.StringVar()
-        self.dev2 = tk.StringVar()
-        self.stop_requested: bool = bool()
+        # views showing the test's log, passed new lines on the Tk thread
+        self.log_views: List[Callable[[List[str]], None]] = []
         self.progress = tk.IntVar()
         self.progress_msg = tk.StringVar()
-        self.elapsed_min: float = float()  # current duration
-        self.pump1: NextGenPump = None
-        self.pump2: NextGenPump = None
+        self.acquisition: Acquisition = None  # runs the uptake and readings loop
+        self.journal: ReadingJournal = None  # a crash-safe copy of the readings
+        self.pumps: List[PumpWorker] = []  # each pump's port is owned by its worker
+        # keeps the pumps' ports open between tests and rinses
+        self.connections = PumpConnections.from_config(self.logger)
+        self.is_rinsing: bool = False
+        self.is_starting: bool = False  # while the pumps are set up for a test
+        self.closing: Future = None  # stopping the pumps after the last test
         self.pool = ThreadPoolExecutor(max_workers=3)
 
         # UI concerns
         self.views: List[tk.Widget] = []  # list of views displaying the project
         self.is_running: bool = bool()
         self.is_done: bool = bool()
+        # the port selected for each of the system's pumps
+        self.devices: List[tk.StringVar] = []
+        self.pump_count = tk.IntVar(value=int(scalewiz.CONFIG["pumps"]["per_system"]))
+        self.pump_count.trace_add("write", self.update_devices)
+        self.update_devices()
         self.new_test()
 
     @property
-    def can_run(self) -> bool:
-        """Returns a bool indicating whether or not the test can run."""
-        return (
-            (self.max_psi_1 < self.limit_psi or self.max_psi_2 < self.limit_psi)
-            and self.elapsed_min < self.limit_minutes
-            and len(self.readings) < self.max_readings
-            and not self.stop_requested
-        )
+    def max_psi(self) -> List[int]:
+        """Returns the highest pressure each pump has reached during the test."""
+        if self.acquisition is None:
+            return [0] * len(self.devices)
+        return list(self.acquisition.max_psi)
+
+    @property
+    def ports(self) -> List[str]:
+        """Returns the port selected for each pump."""
+        return [device.get() for device in self.devices]
+
+    def update_devices(self, *args) -> None:
+        """Adds or removes port selections to match the pump count."""
+        # extra unused args are passed in by tkinter
+        try:
+            count = min(max(self.pump_count.get(), 1), MAX_PUMPS)
+        except tk.TclError:  # eg. the box was left blank
+            return
+        busy = self.is_running or self.is_rinsing or self.is_starting
+        if count == len(self.devices) or busy:
+            return
+        while len(self.devices) < count:
+            device = tk.StringVar()
+            device.trace_add("write", self.release_ports)
+            self.devices.append(device)
+        for device in self.devices[count:]:
+            for mode, callback in device.trace_info():
+                device.trace_remove(mode, callback)
+        del self.devices[count:]
+        self.release_ports()
+        if self.test is not None and not self.is_done:
+            self.choose_pump_to_score()
+        self.rebuild_views()
 
     def new_test(self) -> None:
         """Initialize a new test."""
         self.logger.info("Initializing a new test")
-        if isinstance(self.test, Test):
+        # a saved test now belongs to the Project, which cleans up its traces
+        if isinstance(self.test, Test) and self.test not in self.project.tests:
             self.test.remove_traces()
         self.test = Test()
         self.limit_psi = self.project.limit_psi.get()
         self.limit_minutes = self.project.limit_minutes.get()
-        self.max_psi_1, self.max_psi_2 = 0, 0
+        self.acquisition = None
         self.is_running, self.is_done = False, False
         self.progress.set(0)
         self.progress_msg.set("Starting a new test ...")
         self.max_readings = round(
             self.project.limit_minutes.get() * 60 / self.project.interval_seconds.get()
         )
-        self.test.pump_to_score.set(self.project.default_pump.get().lower())
+        self.choose_pump_to_score()
         self.rebuild_views()
 
+    def choose_pump_to_score(self) -> None:
+        """Scores the test on the project's default pump, if the system has it."""
+        default = self.project.default_pump.get().lower()
+        column = score_column(default, len(self.devices))
+        if column != default:
+            self.logger.info(
+                "This system has no %s, so the test will be scored on the %s",
+                default,
+                column,
+            )
+        self.test.pump_to_score.set(column)
+
     def start_test(self) -> None:
-        """Perform a series of checks to make sure the test can run, then start it."""
+        """Perform a series of checks to make sure the test can run, then start it.
+
+        The pumps are set up on a worker, and the test is started once they're ready.
+        """
+        if self.is_starting:
+            return
         issues = []
         if not Path(self.project.path.get()).is_file():
             msg = "Select an existing project file first"
@@ -105,108 +175,305 @@ class TestHandler:
             msg = "Water clarity cannot be blank"
             issues.append(msg)
 
+        ports = self.ports
+        column = self.test.pump_to_score.get()
+        if score_column(column, len(ports)) != column:
+            msg = f"This system has no {column} to score the test on"
+            issues.append(msg)
+
         # these methods will append issue messages if any occur
         self.update_log_handler(issues)
-        self.setup_pumps(issues)
+        self.check_ports(issues, ports)
         if len(issues) > 0:
             messagebox.showwarning("Couldn't start the test", "\n".join(issues))
-            for pump in (self.pump1, self.pump2):
-                pump.close()
-        else:
-            self.readings.clear()
-            self.stop_requested = False
-            self.is_done = False
-            self.is_running = True
-            self.rebuild_views()
-            self.pool.submit(self.uptake_cycle)
+            return
+        self.is_starting = True
+        self.progress_msg.set("Connecting to the pumps ...")
+        self.pool.submit(self.prepare_pumps, ports)
 
-    def uptake_cycle(self) -> None:
-        """Get ready to take readings.
+    def prepare_pumps(self, ports: List[str]) -> None:
+        """Gets the pumps ready for a test on a worker, then has it launched."""
+        issues = []
+        try:
+            if get_engine_name() == "processes":
+                self.wait_until_closed()
+                self.connections.close()  # the child process opens the pumps itself
+            else:
+                self.setup_pumps(issues, ports)
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.exception(err)
+            issues.append(f"Couldn't set up the pumps: {err}")
+        if issues:
+            self.close_pumps()
+        self.bus.call(self.launch_test, ports, issues)
+
+    def launch_test(self, ports: List[str], issues: List[str]) -> None:
+        """Starts the test once its pumps are ready. Runs on the Tk thread."""
+        self.is_starting = False
+        if len(issues) > 0:
+            self.progress_msg.set("Couldn't start the test")
+            messagebox.showwarning("Couldn't start the test", "\n".join(issues))
+            return
+        engine = get_engine_name()
+        self.readings.clear()
+        settings = {
+            "interval": self.project.interval_seconds.get(),
+            "uptake": self.project.uptake_seconds.get(),
+            "limit_minutes": self.limit_minutes,
+            "limit_psi": self.limit_psi,
+            "logger": self.logger,
+            "readings": self.readings,
+        }
+        if engine == "processes":
+            self.acquisition = ProcessAcquisition(
+                ports,
+                self.project.flowrate.get(),
+                **settings,
+            )
+        else:
+            self.acquisition = Acquisition(self.pumps, **settings)
+        self.acquisition.on_uptake = self.update_uptake
+        self.acquisition.on_reading = self.update_readings
+        self.acquisition.reconnect = self.connections.reconnect
+        if not self.test.is_blank.get():  # blanks always run to their limits
+            self.acquisition.predictor = FailurePredictor.from_config(
+                self.test.pump_to_score.get(), self.limit_psi, self.limit_minutes
+            )
+        if engine != "processes":
+            self.pool.submit(self.remember_pumps)
+        self.start_journal()
+        self.is_done = False
+        self.is_running = True
+        self.rebuild_views()
+        if engine == "asyncio":
+            AcquisitionEngine.get().submit(self.run_async())
+        else:
+            self.pool.submit(self.run)
+
+    def start_journal(self) -> None:
+        """Starts journaling the Acquisition's readings, if enabled."""
+        if not scalewiz.CONFIG["journal"]["enabled"]:
+            return
+        try:
+            self.journal = ReadingJournal(
+                self.project.path.get(),
+                self.test.to_dict(),
+                self.project.interval_seconds.get(),
+            )
+        except OSError as err:
+            self.logger.warning("Couldn't start a journal for the test: %s", err)
+            return
+        self.acquisition.journal = self.journal
+
+    def update_uptake(self, i: int) -> None:
+        """Reports progress through the uptake cycle."""
+        uptake = self.acquisition.uptake
+        self.bus.post(self.progress.set, i)
+        self.bus.post(
+            self.progress_msg.set, f"Uptake: {round(i * uptake / 100)}/{uptake} s"
+        )
 
-        Meant to be run from a worker thread.
+    def run(self) -> None:
+        """Runs the Acquisition. Meant to be run from a worker thread."""
+        try:
+            completed = self.acquisition.run()
+        except Exception as err:  # pylint: disable=broad-except
+            completed = self.fail(err)
+        self.finish(completed)
+
+    async def run_async(self) -> None:
+        """Runs the Acquisition on the AcquisitionEngine."""
+        try:
+            completed = await self.acquisition.run_async()
+        except Exception as err:  # pylint: disable=broad-except
+            completed = self.fail(err)
+        self.finish(completed)
+
+    def fail(self, err: Exception) -> bool:
+        """Reports an error that stopped the Acquisition, so the test can be stopped.
+
+        Returns:
+            bool: False, since the test didn't complete
         """
-        self.logger.info("Starting an uptake cycle")
-        uptake = self.project.uptake_seconds.get()
-        step = uptake / 100  # we will sleep for 100 steps
-        self.pump1.run()
-        self.pump2.run()
-        rinse_start = time()
-        for i in range(100):
-            if self.can_run:
-                self.progress.set(i)
-                self.progress_msg.set(f"Uptake: {round(i*step)}/{uptake} s")
-                sleep(step - ((time() - rinse_start) % step))
-            else:
-                self.stop_test(save=False)
-                break
-        self.take_readings()  # still in the Future's thread
+        self.logger.exception("The test stopped unexpectedly: %s", err)
+        self.acquisition.issues.append(f"The test stopped unexpectedly: {err}")
+        return False
+
+    def update_readings(self, reading: Reading) -> None:
+        """Reports a new Reading to the log and progress bar."""
+        # make a message for the log in the test handler view
+        msg = "@ {:.2f} min; {}, avg: {}".format(
+            reading.elapsedMin,
+            ", ".join(
+                f"pump{number}: {psi}"
+                for number, psi in enumerate(reading.pressures, start=1)
+            ),
+            reading.average,
+        )
+        self.bus.extend(self.show_log, msg)
+        self.logger.debug(msg)
+        # readings may not be evenly spaced, so go by whichever limit is closer
+        prog = round(
+            max(
+                len(self.readings) / self.max_readings,
+                reading.elapsedMin / self.limit_minutes,
+            )
+            * 100
+        )
+        self.bus.post(self.progress.set, prog)
+        self.bus.post(
+            self.progress_msg.set,
+            "{:.2f} / {:.2f} min, {} / {} readings".format(
+                reading.elapsedMin,
+                self.limit_minutes,
+                len(self.readings),
+                self.max_readings,
+            ),
+        )
+
+    def show_log(self, lines: List[str]) -> None:
+        """Passes new lines to the views showing the test's log."""
+        for view in self.log_views:
+            view(lines)
+
+    def finish(self, completed: bool) -> None:
+        """Asks the main thread to stop the test, saving it unless it never started."""
+        if self.acquisition.issues:
+            self.bus.call(
+                messagebox.showwarning,
+                "Couldn't run the test",
+                "\n".join(self.acquisition.issues),
+            )
+        self.bus.call(self.stop_test, completed)
+
+    def start_rinse(
+        self,
+        seconds: int,
+        on_tick: Callable[[int], None],
+        should_stop: Callable[[], bool],
+        on_done: Callable[[], None],
+    ) -> None:
+        """Runs the pumps for a number of seconds on a worker.
 
-    def take_readings(self) -> None:
-        """Collects Readings by messaging the pumps.
+        The pumps are stopped once the rinse ends.
 
-        Meant to be run from a worker thread.
+        Args:
+            seconds (int): how long to rinse for
+            on_tick (Callable[[int], None]): called on the Tk thread with the seconds
+                elapsed, at most once a frame
+            should_stop (Callable[[], bool]): polled from the worker to end the rinse
+                early, so mustn't touch Tk
+            on_done (Callable[[], None]): called on the Tk thread when the rinse ends
         """
-        self.logger.info("Starting readings collection")
+        self.is_rinsing = True
 
-        def get_pressure(pump: NextGenPump) -> Union[float, int]:
-            t0 = time()
-            p = pump.pressure
-            self.logger.info(
-                "collected a reading from %s in %s", pump.serial.name, time() - t0
+        def done() -> None:
+            self.is_rinsing = False
+            on_done()
+
+        if get_engine_name() == "asyncio":
+            AcquisitionEngine.get().submit(
+                self.rinse_async(seconds, on_tick, should_stop, done, self.ports)
             )
-            return p
-
-        interval = self.project.interval_seconds.get()
-        start_time = time()
-        # readings loop ----------------------------------------------------------------
-        while self.can_run:
-            self.elapsed_min = (time() - start_time) / 60
-            t0 = time()
-            psi1 = self.pool.submit(get_pressure, self.pump1)
-            psi2 = self.pool.submit(get_pressure, self.pump2)
-            psi1, psi2 = psi1.result(), psi2.result()
-            t1 = time()
-            self.logger.info("got both in %s s", t1 - t0)
-            average = round(((psi1 + psi2) / 2))
-            reading = Reading(
-                elapsedMin=self.elapsed_min, pump1=psi1, pump2=psi2, average=average
+        else:
+            self.pool.submit(
+                self.rinse, seconds, on_tick, should_stop, done, self.ports
             )
-            # make a message for the log in the test handler view
-            msg = "@ {:.2f} min; pump1: {}, pump2: {}, avg: {}".format(
-                self.elapsed_min, psi1, psi2, average
+
+    def rinse(
+        self,
+        seconds: int,
+        on_tick: Callable[[int], None],
+        should_stop: Callable[[], bool],
+        on_done: Callable[[], None],
+        ports: List[str] = None,
+    ) -> None:
+        """Runs a rinse. Meant to be run from a worker thread."""
+        issues = []
+        try:
+            self.setup_pumps(issues, ports)
+            if issues:
+                return
+            started = [pump.run() for pump in self.pumps]
+            wait_for(*started)
+            issues.extend(
+                f"Couldn't start the pump on {pump.port}: {future.exception()}"
+                for pump, future in zip(self.pumps, started)
+                if future.done() and future.exception() is not None
             )
-            self.readings.append(reading)
-            self.log_queue.put(msg)
-            self.logger.debug(msg)
-            prog = round((len(self.readings) / self.max_readings) * 100)
-            self.progress.set(prog)
-            self.progress_msg.set(
-                "{:.2f} / {:.2f} min, {} / {} readings".format(
-                    self.elapsed_min,
-                    self.limit_minutes,
-                    len(self.readings),
-                    self.max_readings,
-                )
+            if issues:
+                return
+            scheduler = Scheduler(1)
+            scheduler.start()
+            for i in range(seconds):
+                if should_stop():
+                    break
+                self.bus.post(on_tick, i + 1)
+                scheduler.wait(should_stop)
+        finally:
+            self.close_pumps()
+            self.finish_rinse(issues, on_done)
+
+    async def rinse_async(
+        self,
+        seconds: int,
+        on_tick: Callable[[int], None],
+        should_stop: Callable[[], bool],
+        on_done: Callable[[], None],
+        ports: List[str] = None,
+    ) -> None:
+        """Runs a rinse on the AcquisitionEngine."""
+        engine = AcquisitionEngine.get()
+        issues = []
+        try:
+            await engine.call(self.setup_pumps, issues, ports)
+            if issues:
+                return
+            results = await asyncio.gather(
+                *(asyncio.wrap_future(pump.run()) for pump in self.pumps),
+                return_exceptions=True,
             )
-
-            if psi1 > self.max_psi_1:
-                self.max_psi_1 = psi1
-            if psi2 > self.max_psi_2:
-                self.max_psi_2 = psi2
-
-            # TYSM https://stackoverflow.com/a/25251804
-            sleep(interval - ((time() - start_time) % interval))
+            issues.extend(
+                f"Couldn't start the pump on {pump.port}: {result}"
+                for pump, result in zip(self.pumps, results)
+                if isinstance(result, Exception)
+            )
+            if issues:
+                return
+            scheduler = Scheduler(1)
+            scheduler.start()
+            for i in range(seconds):
+                if should_stop():
+                    break
+                self.bus.post(on_tick, i + 1)
+                await scheduler.wait_async(should_stop)
+        finally:
+            await engine.call(self.close_pumps)
+            self.finish_rinse(issues, on_done)
+
+    def finish_rinse(self, issues: List[str], on_done: Callable[[], None]) -> None:
+        """Ends a rinse from a worker, warning of why it couldn't start if it didn't."""
+        if issues:
+            self.warn_rinse(issues, on_done)
         else:
-            self.root.after(0, self.stop_test, {"save": True})
+            self.bus.call(on_done)
+
+    def warn_rinse(self, issues: List[str], on_done: Callable[[], None]) -> None:
+        """Reports why a rinse couldn't start, from a worker."""
+        self.logger.warning("Couldn't start a rinse: %s", "; ".join(issues))
+        self.bus.call(
+            messagebox.showwarning, "Couldn't start the rinse", "\n".join(issues)
+        )
+        self.bus.call(on_done)
 
     def request_stop(self) -> None:
         """Requests that the Test stop."""
-        if self.is_running:
-            self.stop_requested = True
+        if self.is_running and self.acquisition is not None:
+            self.acquisition.request_stop()
 
     def stop_test(self, save: bool = False, rinsing: bool = False) -> None:
-        """Stops the pumps, closes their ports."""
-        self.close_pumps()
+        """Stops the pumps on a worker, and saves the test if asked to."""
+        self.closing = self.pool.submit(self.close_pumps)
         if not rinsing:
             self.is_done = True
             self.is_running = False
@@ -214,6 +481,17 @@ class TestHandler:
                 self.views[0].bell()
         if save:
             self.save_test()
+        elif self.journal is not None:
+            if len(self.readings) > 0:  # eg. the acquisition failed partway through
+                self.journal.close()  # so it's offered for recovery on the next load
+                self.logger.warning(
+                    "Kept the readings of %s in %s, to be recovered",
+                    self.test.name.get(),
+                    self.journal.path,
+                )
+            else:  # nothing worth keeping was collected
+                self.journal.remove()
+            self.journal = None
         self.progress.set(100)
         self.rebuild_views()
 
@@ -223,48 +501,93 @@ class TestHandler:
             "Saving %s to %s", self.test.name.get(), self.project.name.get()
         )
         self.test.readings.extend(self.readings)
+        self.test.update_obs_baseline()  # stored, for readings that are read lazily
+        self.test.projected_fail_min.set(self.acquisition.projected_fail_min)
+        self.test.gaps = list(self.acquisition.gaps)
         self.project.tests.append(self.test)
-        self.project.dump_json()
-        # refresh data / UI
-        self.load_project(path=self.project.path.get(), new_test=False)
-
-    def setup_pumps(self, issues: List[str] = None) -> None:
+        # only the new test gets encoded, and the Project is already up to date in
+        # memory, so there's no need to load it again
+        saved = self.project.dump_json()
+        if self.journal is not None:
+            if saved:
+                self.journal.remove()
+            else:  # keep it around to recover from
+                self.journal.close()
+            self.journal = None
+
+    def check_ports(self, issues: List[str], ports: List[str] = None) -> bool:
+        """Appends errors to the passed list if the selected ports can't be used.
+
+        Args:
+            issues (List[str]): a list of problems to append to
+            ports (List[str], optional): the ports to check. Defaults to the selected
+                ports, which can only be read on the Tk thread.
+
+        Returns:
+            bool: False if the ports aren't unique, so no pumps could be opened
+        """
+        if ports is None:
+            ports = self.ports
+        for number, port in enumerate(ports, start=1):
+            if port in ("", "None found"):
+                issues.append(f"Select a port for pump {number}")
+
+        if len(set(ports)) < len(ports):
+            issues.append("Select a unique port for each pump")
+            return False
+        return True
+
+    def setup_pumps(self, issues: List[str] = None, ports: List[str] = None) -> None:
         """Set up the pumps with some default values.
         Appends errors to the passed list
+
+        Blocks while the ports are opened, so it's meant to be run from a worker.
         """
         if issues is None:
             issues = []
+        if ports is None:
+            ports = self.ports
 
-        if self.dev1.get() in ("", "None found"):
-            issues.append("Select a port for pump 1")
+        if not self.check_ports(issues, ports):
+            return
 
-        if self.dev2.get() in ("", "None found"):
-            issues.append("Select a port for pump 2")
-
-        if self.dev1.get() == self.dev2.get():
-            issues.append("Select two unique ports")
-        else:
-            self.pump1 = NextGenPump(self.dev1.get(), self.logger)
-            self.pump2 = NextGenPump(self.dev2.get(), self.logger)
+        self.wait_until_closed()  # so the pumps aren't stopped once they've started
+        # pumps that are already open are reused, rather than opened again
+        self.pumps = list(
+            self.connections.connect(ports, self.project.flowrate.get(), issues)
+        )
 
-        flowrate = self.project.flowrate.get()
-        for pump in (self.pump1, self.pump2):
-            if pump is None or not pump.is_open:
-                issues.append(f"Couldn't connect to {pump.serial.name}")
-                continue
-            pump.flowrate = flowrate
-        self.logger.info("Set flowrates to %s", pump.flowrate)
+    def wait_until_closed(self) -> None:
+        """Waits for the pumps to be stopped after the last test, if they're not."""
+        closing = self.closing
+        if closing is not None:
+            wait((closing,))
+
+    def remember_pumps(self) -> None:
+        """Records the pumps in use, so they're selected for this system next time."""
+        try:
+            remember(
+                self.name,
+                {pump.port: pump.pump.version for pump in self.pumps},
+            )
+        except Exception as err:  # pylint: disable=broad-except
+            self.logger.warning("Couldn't record which pumps are in use: %s", err)
 
     def close_pumps(self) -> None:
-        """Tears down the pumps."""
-        for pump in (self.pump1, self.pump2):
-            if pump.is_open:
-                pump.stop()
-                pump.close()
-                self.logger.info(
-                    "Stopped and closed the device @ %s",
-                    pump.serial.name,
-                )
+        """Stops the pumps, closing their ports unless they're to be kept open."""
+        if scalewiz.CONFIG["pumps"]["keep_open"]:
+            wait_for(*self.connections.stop())
+            self.connections.release()  # so they're checked on while idle
+            self.logger.info("Stopped the pumps")
+        else:
+            self.connections.close()
+        self.pumps = []
+
+    def release_ports(self, *args) -> None:
+        """Closes any open ports that are no longer selected."""
+        # extra unused args are passed in by tkinter
+        if not (self.is_running or self.is_rinsing or self.is_starting):
+            self.connections.keep(self.ports)
 
     def load_project(
         self,
@@ -298,8 +621,32 @@ class TestHandler:
                 if new_test:
                     self.new_test()
                 self.logger.info("Loaded %s", self.project.name.get())
+                self.recover_journals()
                 self.rebuild_views()
 
+    def recover_journals(self) -> None:
+        """Offers to recover any tests on this Project that were lost in a crash."""
+        for path in find_unfinished(self.project.path.get()):
+            try:
+                data = read_journal(path)
+            except (OSError, ValueError, KeyError) as err:
+                self.logger.warning("Couldn't read journal %s: %s", path, err)
+                continue
+            msg = (
+                f"{data['name']} wasn't saved to {self.project.name.get()}, "
+                f"but {len(data['readings'])} of its readings were journaled "
+                f"to {path.name}.\n\nRecover it into the project?"
+            )
+            if not messagebox.askyesno("Recover an unsaved test?", msg):
+                discard(path)
+                continue
+            note = f"(recovered from {path.name})"
+            data["notes"] = " ".join((data["notes"], note)).strip()
+            self.project.tests.append(Test(data=data))
+            if self.project.dump_json():
+                path.unlink()
+                self.logger.info("Recovered %s from %s", data["name"], path)
+
     def rebuild_views(self) -> None:
         """Rebuild all open Widgets that display or modify the Project file."""
         for widget in self.views:
@@ -314,23 +661,13 @@ class TestHandler:
 
     def update_log_handler(self, issues: List[str]) -> None:
         """Sets up the logging FileHandler to the passed path."""
-        id = "".join(char for char in self.test.name.get() if char.isalnum())
-        log_file = f"{time():.0f}_{id}_{date.today()}.txt"
-        parent_dir = Path(self.project.path.get()).parent.resolve()
-        logs_dir = parent_dir.joinpath("logs").resolve()
-        if not logs_dir.is_dir():
-            logs_dir.mkdir()
-        log_path = Path(logs_dir).joinpath(log_file).resolve()
-        self.log_handler = FileHandler(log_path)
-
-        formatter = Formatter(
-            "%(asctime)s - %(thread)d - %(levelname)s - %(message)s",
-            "%Y-%m-%d %H:%M:%S",
+        if self.log_handler in self.log_output.handlers:  # remove the old one
+            drain(self.log_listener)  # let it finish writing the last test's records
+            self.log_output.removeHandler(self.log_handler)
+            self.log_handler.close()
+        self.log_handler = make_log_handler(
+            self.project.path.get(), self.test.name.get()
         )
-        if self.log_handler in self.logger.handlers:  # remove the old one
-            self.logger.removeHandler(self.log_handler)
-        self.log_handler.setFormatter(formatter)
-        self.log_handler.setLevel(DEBUG)
-        self.logger.addHandler(self.log_handler)
-        self.logger.info("Set up a log file at %s", log_file)
+        self.log_output.addHandler(self.log_handler)
+        self.logger.info("Set up a log file at %s", self.log_handler.baseFilename)
         self.logger.info("Starting a test for %s", self.project.name.get())
@@ -0,0 +1,148 @@
+"""Plain Python stand-ins for tkinter's variables, for the data models.
+
+Projects and Tests used to be made of tkinter variables, each one a Tcl variable that
+needs a live Tk interpreter, and can only be used safely from the Tk thread. Their
+fields are Values instead, which have the same `get`, `set`, and `trace_add` methods,
+but hold their value as a Python attribute. The models can then be loaded, scored,
+and saved without tkinter, from any thread, and cost no Tcl memory.
+
+Widgets show a Value through a tkinter variable from `scalewiz.helpers.tk_binding`,
+which only exists for as long as the widget does.
+"""
+
+from __future__ import annotations
+
+from itertools import count
+from threading import Lock
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, List, Tuple
+
+TRUTHY = ("1", "true", "yes", "on")
+FALSY = ("0", "false", "no", "off")
+
+
+class Value:
+    """A value that calls back its traces whenever it's set, like a tk.Variable.
+
+    Setting a Value from one thread while another gets it is safe. Its traces are
+    called on the thread that set it.
+    """
+
+    __slots__ = ("_value", "_traces")
+
+    _default: Any = ""
+    _names = count()  # for naming traces, shared by every Value
+    _lock = Lock()  # for changing traces, shared too since it's seldom done
+
+    def __init__(self, value: Any = None) -> None:
+        self._value = self._default if value is None else self.coerce(value)
+        self._traces: Dict[str, Callable[..., None]] = {}
+
+    @staticmethod
+    def coerce(value: Any) -> Any:
+        """Returns a value converted to this Value's type.
+
+        Raises:
+            ValueError: if it can't be converted
+        """
+        return value
+
+    def get(self) -> Any:
+        """Returns the value."""
+        return self._value
+
+    def set(self, value: Any) -> None:
+        """Sets the value, then calls each trace as (name, "", "write").
+
+        Raises:
+            ValueError: if the value can't be converted to this Value's type
+        """
+        self._value = self.coerce(value)
+        with self._lock:
+            traces = list(self._traces.items())
+        for name, callback in traces:
+            callback(name, "", "write")
+
+    def trace_add(self, mode: str, callback: Callable[..., None]) -> str:
+        """Has `callback` called whenever the value is set, returning its name.
+
+        Only the "write" mode is supported.
+        """
+        if mode not in ("write", "w"):
+            raise ValueError(f'Values can only be traced on "write", not "{mode}"')
+        name = f"trace{next(self._names)}"
+        with self._lock:
+            self._traces[name] = callback
+        return name
+
+    def trace_remove(self, mode: str, name: str) -> None:
+        """Removes the trace with the passed name, if there is one."""
+        with self._lock:
+            self._traces.pop(name, None)
+
+    def trace_info(self) -> List[Tuple[Tuple[str], str]]:
+        """Returns a (("write",), name) tuple for each trace, in the order added."""
+        with self._lock:
+            return [(("write",), name) for name in self._traces]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._value!r})"
+
+
+class StringValue(Value):
+    """A Value holding a str, like a tk.StringVar."""
+
+    __slots__ = ()
+
+    _default = ""
+
+    @staticmethod
+    def coerce(value: Any) -> str:
+        return str(value)
+
+
+class IntValue(Value):
+    """A Value holding an int, like a tk.IntVar."""
+
+    __slots__ = ()
+
+    _default = 0
+
+    @staticmethod
+    def coerce(value: Any) -> int:
+        try:
+            return int(value)
+        except ValueError:  # eg. "3.0", which a tk.IntVar would take too
+            return int(float(value))
+
+
+class DoubleValue(Value):
+    """A Value holding a float, like a tk.DoubleVar."""
+
+    __slots__ = ()
+
+    _default = 0.0
+
+    @staticmethod
+    def coerce(value: Any) -> float:
+        return float(value)
+
+
+class BooleanValue(Value):
+    """A Value holding a bool, like a tk.BooleanVar."""
+
+    __slots__ = ()
+
+    _default = False
+
+    @staticmethod
+    def coerce(value: Any) -> bool:
+        if isinstance(value, str):
+            if value.strip().lower() in TRUTHY:
+                return True
+            if value.strip().lower() in FALSY:
+                return False
+            raise ValueError(f"{value!r} isn't a boolean")
+        return bool(value)
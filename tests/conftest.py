@@ -0,0 +1,9 @@
+"""Keeps the tests from reading or changing the user's own config and caches."""
+
+import os
+import tempfile
+
+# scalewiz loads its config file as it's imported, so this has to come first
+_HOME = tempfile.mkdtemp(prefix="scalewiz-tests-")
+os.environ["XDG_CONFIG_HOME"] = os.path.join(_HOME, "config")
+os.environ["XDG_CACHE_HOME"] = os.path.join(_HOME, "cache")
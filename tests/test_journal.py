@@ -0,0 +1,73 @@
+"""Round trips of readings through a ReadingJournal and `read_journal`."""
+
+from __future__ import annotations
+
+import os
+from time import time
+
+from scalewiz.models.journal import ReadingJournal, find_unfinished, read_journal
+from scalewiz.models.reading import Reading
+
+TEST = {"name": "Trial 1", "chemical": "A", "rate": 5, "readings": []}
+
+
+def make_readings(count: int):
+    return [
+        Reading(elapsedMin=round(i / 60, 4), pressures=(100 + i, 200 + 2 * i))
+        for i in range(count)
+    ]
+
+
+def test_round_trip(tmp_path):
+    journal = ReadingJournal(tmp_path.joinpath("p.json"), TEST, 1)
+    readings = make_readings(25)
+    for reading in readings[:5]:
+        journal.write(reading)
+    for reading in readings[5:]:
+        journal.submit(reading)  # written in order, by the journal's thread
+    journal.close()
+    test = read_journal(journal.path)
+    assert test["name"] == "Trial 1"
+    assert test["chemical"] == "A"
+    assert test["readings"] == [
+        {
+            "pump 1": reading.pressures[0],
+            "pump 2": reading.pressures[1],
+            "average": reading.average,
+            "elapsedMin": reading.elapsedMin,
+        }
+        for reading in readings
+    ]
+
+
+def test_torn_line_is_skipped(tmp_path):
+    journal = ReadingJournal(tmp_path.joinpath("p.json"), TEST, 1)
+    for reading in make_readings(3):
+        journal.write(reading)
+    journal.close()
+    with journal.path.open("a", encoding="utf-8") as file:
+        file.write("[0.05, 10")  # as if the power went out mid-write
+    assert len(read_journal(journal.path)["readings"]) == 3
+
+
+def test_names_are_unique(tmp_path):
+    journals = [ReadingJournal(tmp_path.joinpath("p.json"), TEST, 1) for _ in range(3)]
+    assert len({journal.path for journal in journals}) == 3
+    for journal in journals:
+        journal.remove()
+    assert not any(journal.path.exists() for journal in journals)
+
+
+def test_find_unfinished(tmp_path):
+    project = tmp_path.joinpath("p.json")
+    running = ReadingJournal(project, TEST, 1)
+    left = ReadingJournal(project, TEST, 1)
+    left.close()
+    other = ReadingJournal(tmp_path.joinpath("other.json"), TEST, 1)
+    other.close()
+    assert find_unfinished(project) == []  # too recent to be sure it was left
+    old = time() - 3600
+    for journal in (running, left, other):
+        os.utime(journal.path, (old, old))
+    assert find_unfinished(project) == [left.path]
+    running.close()
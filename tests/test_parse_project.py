@@ -0,0 +1,90 @@
+"""Checks `parse_project` against parsing the whole file with `json`."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from scalewiz.models.project import parse_project
+from scalewiz.models.reading import InlineReadings
+
+
+def readings(count: int, offset: int = 0) -> list:
+    return [
+        {
+            "pump 1": 100 + i + offset,
+            "pump 2": 120 + 2 * i,
+            "average": round((220 + 3 * i + offset) / 2),
+            "elapsedMin": round(i * 0.05, 2),
+        }
+        for i in range(count)
+    ]
+
+
+PROJECT = {
+    "info": {"customer": "Acme", "notes": 'brackets ] and } and "quotes" in text'},
+    "params": {"bicarbs": 1000, "temperature": 150.5},
+    "tests": [
+        {
+            "name": "Blank 1",
+            "isBlank": True,
+            "readings": readings(40),
+            "notes": "unicode ✓, a [list] and {braces}",
+        },
+        {"name": "Trial ]", "chemical": "A", "rate": 5, "readings": readings(3, 7)},
+        {"name": "No readings", "readings": []},
+        {"name": "Unsaved", "readings": None},
+        {"name": "Stored", "readingsRef": {"offset": 0, "count": 3, "width": 2}},
+        {"name": "Nested", "extra": {"a": [1, [2, 3]]}, "readings": readings(2)},
+    ],
+    "outputFormat": "pump 1",
+}
+
+
+def resolve(obj: dict) -> dict:
+    """Parses the readings left as InlineReadings, as `json` would have."""
+    for test in obj["tests"]:
+        value = test.get("readings")
+        if isinstance(value, InlineReadings):
+            parsed = json.loads(value.text[value.start : value.stop])  # noqa: E203
+            assert value.count == len(parsed)
+            test["readings"] = parsed
+    return obj
+
+
+@pytest.mark.parametrize(
+    "dump",
+    [
+        lambda obj: json.dumps(obj, indent=4),
+        lambda obj: json.dumps(obj, separators=(",", ":")),
+        lambda obj: json.dumps(obj, indent="\t", ensure_ascii=False),
+        lambda obj: " \n" + json.dumps(obj, indent=1, separators=(" ,", " : ")),
+    ],
+)
+def test_matches_json(dump):
+    text = dump(PROJECT)
+    obj, texts = parse_project(text)
+    assert resolve(obj) == json.loads(text)
+    assert [json.loads(text) for text in texts] == PROJECT["tests"]
+
+
+def test_readings_point_into_their_test_text():
+    obj, texts = parse_project(json.dumps(PROJECT, indent=4))
+    inline = obj["tests"][0]["readings"]
+    assert isinstance(inline, InlineReadings)
+    assert inline.text is texts[0]
+    assert inline.load().to_dicts() == PROJECT["tests"][0]["readings"]
+
+
+def test_no_tests():
+    text = json.dumps({"info": {"customer": "Acme"}})
+    assert parse_project(text) == (json.loads(text), [])
+
+
+@pytest.mark.parametrize(
+    "text", ['{"tests": [{"name": "cut short"', "[]", '{"tests": [] ', ""]
+)
+def test_not_a_project(text):
+    with pytest.raises(ValueError):
+        parse_project(text)
@@ -0,0 +1,104 @@
+"""Checks the Scheduler keeps to its deadlines and counts the slots it misses."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from scalewiz.helpers import scheduler as scheduler_module
+from scalewiz.helpers.scheduler import NS_PER_S, Scheduler
+
+
+class Clock:
+    """A monotonic clock that only moves when it's slept on or advanced."""
+
+    def __init__(self, overshoot: float = 0.0) -> None:
+        self.now_ns = 1_000 * NS_PER_S
+        self.overshoot = overshoot  # seconds each sleep runs over by
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def advance(self, seconds: float) -> None:
+        self.now_ns += round(seconds * NS_PER_S)
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds + self.overshoot)
+
+    async def sleep_async(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(scheduler_module, "monotonic_ns", clock.monotonic_ns)
+    monkeypatch.setattr(scheduler_module, "sleep", clock.sleep)
+    return clock
+
+
+def test_ticks_on_time(clock):
+    scheduler = Scheduler(1)
+    scheduler.start()
+    for _ in range(5):
+        clock.advance(0.25)  # the work of each tick
+        assert scheduler.wait()
+    assert (scheduler.ticks, scheduler.missed) == (5, 0)
+    assert clock.now_ns == scheduler.start_ns + 5 * NS_PER_S
+
+
+def test_overshoot_does_not_drift(clock):
+    clock.overshoot = 0.1
+    scheduler = Scheduler(1)
+    scheduler.start()
+    for _ in range(10):
+        scheduler.wait()
+    assert scheduler.missed == 0
+    assert scheduler.deadline_ns == scheduler.start_ns + 10 * NS_PER_S
+    assert scheduler.jitter.mean == pytest.approx(0.1)
+
+
+def test_overrun_skips_missed_slots(clock):
+    scheduler = Scheduler(1)
+    scheduler.start()
+    clock.advance(3.5)  # overruns the slots due at 1, 2 and 3 s
+    assert scheduler.wait()
+    assert scheduler.missed == 3
+    assert clock.now_ns == scheduler.start_ns + 4 * NS_PER_S
+    clock.advance(0.5)
+    scheduler.wait()  # back on schedule
+    assert (scheduler.ticks, scheduler.missed) == (2, 3)
+    assert clock.now_ns == scheduler.start_ns + 5 * NS_PER_S
+
+
+def test_changed_interval_follows_the_last_deadline(clock):
+    scheduler = Scheduler(1)
+    scheduler.start()
+    scheduler.wait()
+    scheduler.interval = 0.5
+    clock.advance(1.2)  # overruns the slots due at 1.5 and 2 s
+    scheduler.wait()
+    assert scheduler.missed == 2
+    assert clock.now_ns == scheduler.start_ns + round(2.5 * NS_PER_S)
+
+
+def test_wait_can_be_stopped(clock):
+    scheduler = Scheduler(10)
+    scheduler.start()
+    assert not scheduler.wait(lambda: clock.now_ns > scheduler.start_ns)
+    assert scheduler.ticks == 0
+
+
+def test_wait_async_skips_missed_slots(clock, monkeypatch):
+    monkeypatch.setattr(scheduler_module.asyncio, "sleep", clock.sleep_async)
+    scheduler = Scheduler(2)
+
+    async def run() -> None:
+        scheduler.start()
+        clock.advance(5)  # overruns the slots due at 2 and 4 s
+        await scheduler.wait_async()
+
+    asyncio.run(run())
+    assert (scheduler.ticks, scheduler.missed) == (1, 2)
+    assert clock.now_ns == scheduler.start_ns + 6 * NS_PER_S
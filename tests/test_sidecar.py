@@ -0,0 +1,79 @@
+"""Round trips of readings through the binary sidecar format."""
+
+from __future__ import annotations
+
+import pytest
+
+from scalewiz.models import sidecar
+from scalewiz.models.reading import Reading, ReadingSeries
+
+
+def make_series(rows, width=2) -> ReadingSeries:
+    """Returns a series with a reading of the passed pressures every 3 seconds."""
+    series = ReadingSeries(width=width)
+    for i, pressures in enumerate(rows):
+        series.append(Reading(elapsedMin=i * 0.05, pressures=tuple(pressures)))
+    return series
+
+
+def round_trip(series: ReadingSeries) -> ReadingSeries:
+    """Encodes a series and decodes it again."""
+    block = sidecar.encode(series)
+    return sidecar.decode(block, 0, len(series), series.width)
+
+
+@pytest.mark.parametrize(
+    "rows, code",
+    [
+        ([(10, 12), (14, 15), (13, 20)], b"b"),  # small changes fit in a byte
+        ([(0, 0), (1000, 20), (2500, 4000)], b"h"),
+        ([(0, 0), (100_000, 5), (-100_000, 70_000)], b"i"),
+        ([(10.5, 12), (14.25, 15), (13, 20.125)], b"d"),  # any fraction keeps floats
+    ],
+)
+def test_round_trip(rows, code):
+    series = make_series(rows)
+    block = sidecar.encode(series)
+    assert sidecar.HEADER.unpack_from(block)[3] == code
+    assert len(block) % sidecar.ALIGN == 0
+    assert round_trip(series).to_dicts() == series.to_dicts()
+
+
+def test_round_trip_empty():
+    series = ReadingSeries(width=3)
+    decoded = round_trip(series)
+    assert len(decoded) == 0
+    assert decoded.width == 3
+
+
+def test_round_trip_wide():
+    rows = [(i, 2 * i, 3 * i, 1500 - i) for i in range(300)]
+    series = make_series(rows, width=4)
+    assert round_trip(series).to_dicts() == series.to_dicts()
+
+
+def test_decode_checks_the_block():
+    series = make_series([(10, 12), (14, 15)])
+    block = bytearray(sidecar.encode(series))
+    with pytest.raises(ValueError):
+        sidecar.decode(bytes(block), 0, 3, 2)  # more readings than were stored
+    with pytest.raises(ValueError):
+        sidecar.decode(bytes(block), sidecar.ALIGN, 2, 2)  # not where a block starts
+    with pytest.raises(ValueError):
+        sidecar.decode(bytes(block[: -sidecar.ALIGN]), 0, 2, 2)  # cut short
+    block[sidecar.HEADER.size] ^= 0xFF
+    with pytest.raises(ValueError):
+        sidecar.decode(bytes(block), 0, 2, 2)  # damaged
+
+
+def test_append_and_load(tmp_path):
+    path = tmp_path.joinpath("project.readings")
+    first = make_series([(10, 12), (14, 15), (13, 20)])
+    second = make_series([(10.5, 1), (2, 3)])
+    stored = [sidecar.append(path, first), sidecar.append(path, second)]
+    assert stored[1].offset % sidecar.ALIGN == 0
+    ref = stored[1].to_ref()
+    assert sidecar.StoredReadings.from_ref(path, ref).load().to_dicts() == (
+        second.to_dicts()
+    )
+    assert stored[0].load().to_dicts() == first.to_dicts()